@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+from AigerParser import *
+
+
+#Tseitin encoding of the and gates of an aiger file into the clauses of a
+#CdclSolver, the solver negates literals like aiger does (lit ^ 1) so
+#literals are translated variable by variable
+#an encoder stands for one copy of the circuit: the caller sets the solver
+#literals of its inputs and latches, the and gates are encoded on request,
+#only those in the cone of the requested literals
+class AigerCnfEncoder(object):
+
+    def __init__(self, aiger, solver, trueLit):
+        self._aig = aiger
+        self._solver = solver
+        self._satLits = dict()  # aiger variable -> solver literal
+        self._satLits[0] = trueLit ^ 1  # the constant 0
+
+    #the solver literal standing for the aiger literal aigLit
+    def setLiteral(self, aigLit, satLit):
+        self._satLits[aigLit >> 1] = satLit ^ (aigLit & 1)
+
+    #the solver literal of aigLit, encoding its cone first if needed
+    def getLiteral(self, aigLit):
+        if aigLit >> 1 not in self._satLits:
+            self.encodeCone(aigLit)
+        return self._satLits[aigLit >> 1] ^ (aigLit & 1)
+
+    #g = a & b is (!g | a) & (!g | b) & (g | !a | !b)
+    def encodeCone(self, root):
+        aig = self._aig
+        satLits = self._satLits
+        solver = self._solver
+        stack = [root >> 1]
+        visiting = set()  # the gates on the stack
+        while stack:
+            var = stack[-1]
+            if var in satLits:
+                stack.pop()
+                continue
+            if aig.getVarKind(var << 1) != VAR_AND:
+                raise ValueError('undefined literal ' + str(var << 1))
+            visiting.add(var)
+            index = aig.varPositions[var]
+            rhs0 = aig.andRhs0[index]
+            rhs1 = aig.andRhs1[index]
+            for child in (rhs0 >> 1, rhs1 >> 1):
+                if child not in satLits:
+                    if child in visiting:
+                        raise ValueError('cycle through and gate '
+                            + str(child << 1))
+                    stack.append(child)
+                    break
+            else:
+                left = satLits[rhs0 >> 1] ^ (rhs0 & 1)
+                right = satLits[rhs1 >> 1] ^ (rhs1 & 1)
+                gate = solver.newVar()
+                solver.addClause([gate ^ 1, left])
+                solver.addClause([gate ^ 1, right])
+                solver.addClause([gate, left ^ 1, right ^ 1])
+                satLits[var] = gate
+                visiting.discard(var)
+                stack.pop()
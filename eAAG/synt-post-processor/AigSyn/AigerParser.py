@@ -1,6 +1,13 @@
 #!/usr/bin/env python
-from FileHelper import FileHelper
-from collections import deque
+from array import array
+import mmap
+
+#kinds of the variables stored in AigerFile.varKinds,
+#the constant 0 and unused variables are VAR_CONSTANT
+VAR_CONSTANT = 0
+VAR_INPUT = 1
+VAR_LATCH = 2
+VAR_AND = 3
 
 class Literal(object):
 
@@ -105,33 +112,226 @@ class AndGate(object):
         return False
 
 
+#the object API of AigerFile (latches, and gates and their literals) is
+#only a thin view over the integer arrays below, the objects are created
+#on access and never stored
+class LatchList(object):
+
+    def __init__(self, aigFile):
+        self._aigFile = aigFile
+
+    def __len__(self):
+        return len(self._aigFile.latchLits)
+
+    def __getitem__(self, index):
+        return Latch(self._aigFile.latchLits[index],
+            self._aigFile.latchNexts[index])
+
+    def __iter__(self):
+        latchNexts = self._aigFile.latchNexts
+        for i, left in enumerate(self._aigFile.latchLits):
+            yield Latch(left, latchNexts[i])
+
+
+class AndGateList(object):
+
+    def __init__(self, aigFile):
+        self._aigFile = aigFile
+
+    def __len__(self):
+        return len(self._aigFile.andLhs)
+
+    def __getitem__(self, index):
+        return self._aigFile.getAndGateAt(index)
+
+    def __iter__(self):
+        for i in range(len(self._aigFile.andLhs)):
+            yield self._aigFile.getAndGateAt(i)
+
+
+#maps an and gate variable to the literals of its inputs
+class AndGateMap(object):
+
+    def __init__(self, aigFile):
+        self._aigFile = aigFile
+
+    def __len__(self):
+        return len(self._aigFile.andLhs)
+
+    def __contains__(self, var):
+        return self._aigFile.getAndGateIndex(var) >= 0
+
+    def __getitem__(self, var):
+        index = self._aigFile.getAndGateIndex(var)
+        if index < 0:
+            raise KeyError(var)
+        andGate = self._aigFile.getAndGateAt(index)
+        return (andGate.getLeft(), andGate.getRight())
+
+    def get(self, var, default=None):
+        if var in self:
+            return self[var]
+        return default
+
+
 class AigerFile(object):
 
     def __init__(self):
-        self.inputVars = []
-        self.outputVars = []
-        self.andGatesVars = []
-        self.latches = []
-        self.andGates = []
         self.nbOfInputs = 0
         self.nbOfOutputs = 0
         self.nbOfLatches = 0
         self.nbOfAndGates = 0
         self.maxVarIndex = 0
-        self._cInputIndices = []
-        self._ucInputIndices = []
-        self.andSet = None
-        self.andGatesDict = None
-        self.variables = []
+        #literals of the inputs, latches, outputs and and gates
+        #in the order of the file
+        self.inputLits = array('i')
+        self.latchLits = array('i')
+        self.latchNexts = array('i')
+        self.outputLits = array('i')
+        self.andLhs = array('i')
+        self.andRhs0 = array('i')
+        self.andRhs1 = array('i')
+        #indexed by variable (literal / 2): the kind of the variable and its
+        #position in the inputs, latches or and gates arrays
+        self.varKinds = array('b')
+        self.varPositions = array('i')
+        self._outputVarSet = set()
+        self._cInputIndices = None
+        self._ucInputIndices = None
+        #the lines of the symbol table (i<n>, l<n>, o<n> entries), they are
+        #read from the symbolTable on the first request only
+        self._symbols = None
+        self.symbolTable = None
+        #views kept for the users of the object API
+        self.inputVars = self.inputLits
+        self.outputVars = self.outputLits
+        self.variables = self.latchLits
+        self.andGatesVars = self.andLhs
+        self.latches = LatchList(self)
+        self.andGates = AndGateList(self)
+        self.andGatesDict = AndGateMap(self)
         self.outputBddContainsInputVar = False
 
-    def getAndSet(self):
-        return self.andSet
+    #allocate the variable tables once the header is known
+    def initVarTables(self):
+        size = self.maxVarIndex + 1
+        self.varKinds = array('b', [VAR_CONSTANT]) * size
+        self.varPositions = array('i', [-1]) * size
+
+    def addInput(self, lit):
+        self.varPositions[lit >> 1] = len(self.inputLits)
+        self.varKinds[lit >> 1] = VAR_INPUT
+        self.inputLits.append(lit)
+
+    def addLatch(self, lit, nextLit):
+        self.varPositions[lit >> 1] = len(self.latchLits)
+        self.varKinds[lit >> 1] = VAR_LATCH
+        self.latchLits.append(lit)
+        self.latchNexts.append(nextLit)
+
+    def addOutput(self, lit):
+        self.outputLits.append(lit)
+        self._outputVarSet.add(lit & ~1)
+
+    def addAndGate(self, lhs, rhs0, rhs1):
+        self.varPositions[lhs >> 1] = len(self.andLhs)
+        self.varKinds[lhs >> 1] = VAR_AND
+        self.andLhs.append(lhs)
+        self.andRhs0.append(rhs0)
+        self.andRhs1.append(rhs1)
+
+    #the number of and gates using each and gate, indexed like the and
+    #gates arrays, a gate using another one twice counts twice
+    def getFanoutCounts(self):
+        fanouts = array('i', [0]) * len(self.andLhs)
+        for rhsArray in (self.andRhs0, self.andRhs1):
+            for rhs in rhsArray:
+                index = self.getAndGateIndex(rhs)
+                if index >= 0:
+                    fanouts[index] += 1
+        return fanouts
+
+    #the indices of the and gates in an order where every gate comes after
+    #the gates defining its inputs, raises ValueError on a cycle
+    def getTopologicalOrder(self):
+        nbOfGates = len(self.andLhs)
+        order = array('i')
+        #0 not visited, 1 inputs being visited, 2 done
+        state = array('b', [0]) * nbOfGates
+        for root in range(nbOfGates):
+            if state[root] != 0:
+                continue
+            stack = [root]
+            while stack:
+                index = stack[-1]
+                if state[index] == 0:
+                    state[index] = 1
+                    for rhs in (self.andRhs0[index], self.andRhs1[index]):
+                        child = self.getAndGateIndex(rhs)
+                        if child < 0 or state[child] == 2:
+                            continue
+                        if state[child] == 1:
+                            raise ValueError('cycle through and gate '
+                                + str(self.andLhs[child]))
+                        stack.append(child)
+                else:
+                    if state[index] == 1:
+                        state[index] = 2
+                        order.append(index)
+                    stack.pop()
+        return order
+
+    def getSymbols(self):
+        if self._symbols is None:
+            self._symbols = []
+            if self.symbolTable is not None:
+                self._symbols = self.symbolTable.load()
+        return self._symbols
+
+    def setSymbols(self, symbols):
+        self._symbols = symbols
+
+    symbols = property(getSymbols, setSymbols)
+
+    #the names of the latches in the symbol table by position, None for
+    #the latches without a name
+    def getLatchNames(self):
+        names = [None] * self.nbOfLatches
+        for line in self.getSymbols():
+            if line.startswith('l') and line[1:2].isdigit():
+                position, _, name = line[1:].partition(' ')
+                if int(position) < len(names):
+                    names[int(position)] = name
+        return names
+
+    #Get controllable and uncontrollable input indices
+    def indexInputSymbols(self):
+        cInputIndices = []
+        ucInputIndices = []
+        found = 0
+        for line in self.getSymbols():
+            if line.startswith('i') and line[1:2].isdigit():
+                found = 1
+                array = line.split(' ')
+                if 'controllable' in line.lower():
+                    cInputIndices.append(
+                        (int(array[0].replace('i', '')) + 1) * 2)
+                else:
+                    ucInputIndices.append(
+                        (int(array[0].replace('i', '')) + 1) * 2)
+            elif found:
+                break
+        self._cInputIndices = cInputIndices
+        self._ucInputIndices = ucInputIndices
 
     def getcInputIndices(self):
+        if self._cInputIndices is None:
+            self.indexInputSymbols()
         return self._cInputIndices
 
     def getucInputIndices(self):
+        if self._ucInputIndices is None:
+            self.indexInputSymbols()
         return self._ucInputIndices
 
     def getInputVars(self):
@@ -168,47 +368,56 @@ class AigerFile(object):
         var = int(var)
         return var > 1 and var % 2 == 1
 
+    def getVarKind(self, var):
+        index = int(var) >> 1
+        if index < len(self.varKinds):
+            return self.varKinds[index]
+        return VAR_CONSTANT
+
     def isInput(self, var):
-        if self.isVarNegated(var):
-            var = var - 1
-        if self.inputVars is not None:
-            if var in self.inputVars:
-                return 1
+        if self.getVarKind(var) == VAR_INPUT:
+            return 1
         return 0
 
     def isVariable(self, var):
-        if self.isVarNegated(var):
-            var = var - 1
-        if self.variables is not None:
-            if var in self.variables:
-                return 1
+        if self.getVarKind(var) == VAR_LATCH:
+            return 1
         return 0
 
     def isOutput(self, var):
         if self.isVarNegated(var):
             var = var - 1
-        if self.outputVars is not None:
-            if var in self.outputVars:
-                return 1
+        if var in self._outputVarSet:
+            return 1
         return 0
 
     def isAndGate(self, var):
-        if self.isVarNegated(var):
-            var = var - 1
-        return self.andGates is not None\
-         and self.andGates.contains(AndGate(var, None, None))
+        return self.getVarKind(var) == VAR_AND
+
+    #position of the and gate defining var in the and gates arrays, -1 if
+    #var is not defined by an and gate
+    def getAndGateIndex(self, var):
+        if self.getVarKind(var) != VAR_AND:
+            return -1
+        return self.varPositions[int(var) >> 1]
+
+    def getLiteral(self, lit):
+        return Literal(lit, self.isInput(lit), self.isOutput(lit),
+            self.isAndGate(lit))
+
+    def getAndGateAt(self, index):
+        return AndGate(self.andLhs[index],
+            self.getLiteral(self.andRhs0[index]),
+            self.getLiteral(self.andRhs1[index]))
 
     def getAndGate(self, ag):
-        for andGate in self.andGates:
-            if andGate.getAgVariable() == ag:
-                return andGate
-        return None
+        index = self.getAndGateIndex(ag)
+        if index < 0 or self.andLhs[index] != ag:
+            return None
+        return self.getAndGateAt(index)
 
     def getAndGate_Literal(self, lt):
-        for andGate in self.andGates:
-            if andGate.getAgVariable() == lt.getVariable():
-                return andGate
-        return None
+        return self.getAndGate(lt.getVariable())
 
     def __str__(self):
         return "[aag " + str(self.maxVarIndex) + " " + str(self.nbOfInputs)\
@@ -243,36 +452,142 @@ class AigerFile(object):
             i += 1
         return indicies
 
+    #whether the output depends on an input, every gate of its cone is
+    #visited once
     def checkOutputForInput(self):
         outputVar = self.outputVars[0]
         if(outputVar % 2 == 1):
                 outputVar = outputVar - 1
         if(outputVar == 1 or outputVar == 0):
             return False
-        queue = deque([outputVar])
-        while(len(queue) > 0):
-            andValue = queue.popleft()
-            literals = self.andGatesDict[andValue]
-            if(literals[0].isInput() or literals[1].isInput()):
-                return True
-            else:
-                if(literals[0].isAndGate()):
-                    queue.append(literals[0].getVariable())
-                if(literals[1].isAndGate()):
-                    queue.append(literals[1].getVariable())
+        if not self.isAndGate(outputVar):
+            return self.isInput(outputVar) == 1
+        visited = bytearray(len(self.andLhs))
+        stack = [self.getAndGateIndex(outputVar)]
+        visited[stack[0]] = 1
+        while(len(stack) > 0):
+            index = stack.pop()
+            for rhs in (self.andRhs0[index], self.andRhs1[index]):
+                if self.isInput(rhs):
+                    return True
+                child = self.getAndGateIndex(rhs)
+                if child >= 0 and not visited[child]:
+                    visited[child] = 1
+                    stack.append(child)
         return False
 
 
+#the symbol table of a parsed file, the lines are only read
+#when somebody asks for them
+class SymbolTable(object):
+
+    def __init__(self, filePath, offset):
+        self._filePath = filePath
+        self._offset = offset
+
+    #the symbol table follows the and gates and ends at the comment
+    #section, each symbol is on a single line
+    def load(self):
+        symbols = []
+        f = open(self._filePath, 'rb')
+        try:
+            f.seek(self._offset)
+            for line in f:
+                line = line.decode('ascii', 'replace').strip()
+                if line == 'c':
+                    break
+                if line:
+                    symbols.append(line)
+        finally:
+            f.close()
+        return symbols
+
+
+#reads an aiger file once from the beginning to the end, through a
+#memory map when the file can be mapped
+class AigerTokenizer(object):
+
+    def __init__(self, filePath):
+        self._file = open(filePath, 'rb')
+        try:
+            self._buf = mmap.mmap(self._file.fileno(), 0,
+                access=mmap.ACCESS_READ)
+        except (ValueError, mmap.error):
+            #empty files and pipes cannot be mapped
+            self._buf = self._file
+
+    def close(self):
+        if self._buf is not self._file:
+            self._buf.close()
+        self._file.close()
+
+    def tell(self):
+        return self._buf.tell()
+
+    def readLine(self):
+        return self._buf.readline()
+
+    #the integers of the next line, at least count of them
+    def readInts(self, count):
+        tokens = self._buf.readline().split()
+        if len(tokens) < count:
+            raise ValueError('expected ' + str(count) + ' integers at byte '
+                + str(self.tell()))
+        return [int(token) for token in tokens]
+
+    #the pairs of 7 bit variable length integers of binary and gates,
+    #decoded from one bounded chunk of the file at a time
+    def readDeltaPairs(self, count):
+        chunkSize = 1 << 20
+        chunk = bytearray(self._buf.read(chunkSize))
+        i = 0
+        try:
+            for _ in range(count):
+                #two deltas take at most 20 bytes for 64 bit literals
+                if len(chunk) - i < 20:
+                    chunk = chunk[i:] + bytearray(self._buf.read(chunkSize))
+                    i = 0
+                deltas = [0, 0]
+                for k in (0, 1):
+                    delta = 0
+                    shift = 0
+                    ch = 0x80
+                    while ch & 0x80:
+                        if i >= len(chunk):
+                            raise ValueError(
+                                'unexpected end of binary and gates')
+                        ch = chunk[i]
+                        i += 1
+                        delta |= (ch & 0x7f) << shift
+                        shift += 7
+                    deltas[k] = delta
+                yield deltas
+        finally:
+            #give back what was read ahead
+            self._buf.seek(i - len(chunk), 1)
+
+
+#the integers M I L O A of the header of an aiger file, without parsing
+#the rest of it
+def readAigerHeader(filePath):
+    with open(filePath, 'rb') as aigerFile:
+        header = aigerFile.readline().split()
+    if len(header) < 6 or header[0] not in (b'aag', b'aig'):
+        raise ValueError('invalid aiger header in ' + filePath)
+    return [int(field) for field in header[1:6]]
+
+
 class AigerFileParser(object):
 
     def __init__(self, filePath):
-        self._fileText = FileHelper.readAllLinesFromFile(filePath)
-        self._fileLength = len(self._fileText)
+        self._filePath = filePath
+        self._tokenizer = None
+        self._binary = False
         self.aigFile = AigerFile()
 
     #aiger header is the first line in aiger file
     #and has the following format: aag M I L O A
-    #where aag stands for ascii AIG
+    #where aag stands for ascii AIG, binary files start with aig
     #The interpretation of the integers is as follows
     #M = maximum variable index
     #I = number of inputs=
@@ -281,170 +596,181 @@ class AigerFileParser(object):
     #A = number of AND gates
     #the function set the class member
     def getAigerHeader(self):
-        header = []
-        if self._fileLength > 0:
-            header = self._fileText[0].split(' ')
-        if len(header) == 6:
-            self.aigFile.maxVarIndex = int(header[1])
-            self.aigFile.nbOfInputs = int(header[2])
-            self.aigFile.nbOfLatches = int(header[3])
-            self.aigFile.nbOfOutputs = int(header[4])
-            self.aigFile.nbOfAndGates = int(header[5])
+        header = self._tokenizer.readLine().split()
+        if len(header) < 6 or header[0] not in (b'aag', b'aig'):
+            raise ValueError('invalid aiger header in ' + self._filePath)
+        self._binary = header[0] == b'aig'
+        self.aigFile.maxVarIndex = int(header[1])
+        self.aigFile.nbOfInputs = int(header[2])
+        self.aigFile.nbOfLatches = int(header[3])
+        self.aigFile.nbOfOutputs = int(header[4])
+        self.aigFile.nbOfAndGates = int(header[5])
+        self.aigFile.initVarTables()
 
     #the inputs literals start directly after the header line
     #, which are represented as integers
     #where each integer is on a single line
-    #@return List<Integer> set of inputs
+    #binary files leave them out, they are 2, 4, ..., 2 * I
     def getInputs(self):
-        inputs = []
-        if self.aigFile.nbOfInputs > 0:
-            stopIndex = self.aigFile.nbOfInputs
-            startIndex = 1
-            if self._fileLength >= stopIndex:
-                forRange = list(range(startIndex, stopIndex + 1))
-                for i in forRange:
-                    inputs.append(int(self._fileText[i].strip()))
-            self.aigFile.inputVars = inputs
+        for i in range(self.aigFile.nbOfInputs):
+            if self._binary:
+                self.aigFile.addInput(2 * (i + 1))
+            else:
+                self.aigFile.addInput(self._tokenizer.readInts(1)[0])
 
     #the Latches start directly after the inputs ,
     # where each latch is represented as 2 integers seperated
     #by a single white space where each latch is on a single line
-    #@return List<Integer> set of outputs
+    #binary files leave out the latch literal
     def getLatches(self):
-        latches = []
-        variables = []
-        if self.aigFile.nbOfLatches > 0:
-            stopIndex = self.aigFile.nbOfInputs + self.aigFile.nbOfLatches
-            startIndex = 1 + self.aigFile.nbOfInputs
-            if self._fileLength >= stopIndex:
-                for1Range = list(range(startIndex, stopIndex + 1))
-                for i in for1Range:
-                    latchStr = self._fileText[i].strip().split(' ')
-                    latches.append(
-                    Latch(int(latchStr[0].strip()), int(latchStr[1].strip()))
-                    )
-                    variables.append(int(latchStr[0].strip()))
-            self.aigFile.latches = latches
-            self.aigFile.variables = variables
+        for i in range(self.aigFile.nbOfLatches):
+            if self._binary:
+                self.aigFile.addLatch(2 * (self.aigFile.nbOfInputs + i + 1),
+                    self._tokenizer.readInts(1)[0])
+            else:
+                latch = self._tokenizer.readInts(2)
+                self.aigFile.addLatch(latch[0], latch[1])
 
     #the outputs literals start directly after the latches ,
     #which are represented as integers
     #where each integer is on a single line
-    #@return List<Integer> set of outputs
     def getOutputs(self):
-        outputs = []
-        if self.aigFile.nbOfOutputs > 0:
-            stopIndex = self.aigFile.nbOfInputs + self.aigFile.nbOfOutputs\
-            + self.aigFile.nbOfLatches
-            startIndex = 1 + self.aigFile.nbOfInputs + self.aigFile.nbOfLatches
-            for2Range = list(range(startIndex, stopIndex + 1))
-            for i in for2Range:
-                outputs.append(int(self._fileText[i].strip()))
-            self.aigFile.outputVars = outputs
-
-    #Get controllable and uncontrollable input indices
-    def getcontAnduncontInputIndices(self):
-        cInputIndices = []
-        ucInputIndices = []
-        startIndex = 1 + self.aigFile.nbOfInputs + self.aigFile.nbOfOutputs +\
-        self.aigFile.nbOfLatches + self.aigFile.nbOfAndGates
-        found = 0
-        textSize = len(self._fileText)
-        while startIndex < textSize:
-            line = self._fileText[startIndex].strip()
-            if line.startswith('i') and line[1].isdigit():
-                found = 1
-                array = line.split(' ')
-                if 'controllable' in line.lower():
-                    cInputIndices.append(
-                        (int(array[0].replace('i', '')) + 1) * 2)
-                else:
-                    ucInputIndices.append(
-                        (int(array[0].replace('i', '')) + 1) * 2)
-            elif found:
-                break
-            startIndex += 1
-        self.aigFile._cInputIndices = cInputIndices
-        self.aigFile._ucInputIndices = ucInputIndices
+        for i in range(self.aigFile.nbOfOutputs):
+            self.aigFile.addOutput(self._tokenizer.readInts(1)[0])
 
-    #the andGates start directly after the latches ,
+    #the andGates start directly after the outputs ,
     #where each andgate is represented as 3 integers seperated
     #by a single white space
     #the first integer is the result of the andgate and the remaining
     #2 integers are the inputs of the andgate
     #each and gate is on a seperate line
-    #@return List<Integer> set of outputs
+    #binary files store each gate as two delta encoded integers,
+    #lhs - rhs0 and rhs0 - rhs1, where lhs is implicit
     def getAndGates(self):
-        andGates = []
-        andGatesDict = dict()
-        if self.aigFile.nbOfAndGates > 0:
-            stopIndex = self.aigFile.nbOfInputs + self.aigFile.nbOfOutputs +\
-            self.aigFile.nbOfLatches + self.aigFile.nbOfAndGates
-            startIndex = 1 + self.aigFile.nbOfInputs + self.aigFile.nbOfOutputs\
-             + self.aigFile.nbOfLatches
-            andGateStr = self._fileText[startIndex].strip().split(' ')
-            startAnd = int(andGateStr[0])
-            self.aigFile.andSet = dict()  # new HashMap<Integer, List<Integer>>
-            if self._fileLength >= stopIndex:
-                for3Range = list(range(startIndex, stopIndex + 1))
-                for i in for3Range:
-                    andGateStr = self._fileText[i].strip().split(' ')
-                    andGateVar = int(andGateStr[0].strip())
-                    self.aigFile.andSet[andGateVar] = []
-                    left = int(andGateStr[1].strip())
-                    ntngLeft = (left - 1) if (left % 2 == 1) else left
-                    isInput = self.aigFile.isInput(left)
-                    isOutput = self.aigFile.isOutput(left)
-                    leftLiteral = Literal(left, isInput, isOutput,
-                         (ntngLeft in andGatesDict))
-                    right = int(andGateStr[2].strip())
-                    ntngRight = (right - 1) if (right % 2 == 1) else right
-                    isInput = self.aigFile.isInput(right)
-                    isOutput = self.aigFile.isOutput(right)
-                    rightLiteral = Literal(right, isInput, isOutput,
-                     (ntngRight in andGatesDict))
-                    andGate = AndGate(andGateVar, leftLiteral, rightLiteral)
-                    #check if it contains input
-                    #tobedone
-                    #to be done
-                    #end of check if it contains input
-                    andGates.append(andGate)
-                    andGatesDict[andGateVar] = (leftLiteral, rightLiteral)
-                    #the below is to be used in garbage collection
-                    if left >= startAnd:
-                        left = (left - 1) if (left % 2 == 1) else left
-                        indicesList = self.aigFile.andSet.get(left)
-                        indicesList.append(i - startIndex)
-                        self.aigFile.andSet[left] = indicesList
-                    if right >= startAnd:
-                        right = (right - 1) if (right % 2 == 1) else right
-                        indicesList = self.aigFile.andSet.get(right)
-                        indicesList.append(i - startIndex)
-                        self.aigFile.andSet[right] = indicesList
-                #remember that an and variable may be used in the latches
-                #therefore add them to the andSet with a higher index than any
-                for lch in self.aigFile.latches:
-                    tempR = lch.getRightVar()
-                    right = tempR - 1 if tempR % 2 == 1 else tempR
-                    if right >= startAnd:
-                        indicesList = self.aigFile.andSet.get(right)
-                        indicesList.append(stopIndex + 1)
-                        self.aigFile.andSet[right] = indicesList
-                #or outputs
-                for outp in self.aigFile.outputVars:
-                    outp = outp - 1 if outp % 2 == 1 else outp
-                    indicesList = self.aigFile.andSet.get(outp)
-                    indicesList.append(stopIndex + 1)
-                    self.aigFile.andSet[outp] = indicesList
-        self.aigFile.andGates = andGates
-        self.aigFile.andGatesDict = andGatesDict
+        addAndGate = self.aigFile.addAndGate
+        if self._binary:
+            lhs = 2 * (self.aigFile.nbOfInputs + self.aigFile.nbOfLatches)
+            deltaPairs = self._tokenizer.readDeltaPairs(
+                self.aigFile.nbOfAndGates)
+            try:
+                for deltas in deltaPairs:
+                    lhs += 2
+                    rhs0 = lhs - deltas[0]
+                    addAndGate(lhs, rhs0, rhs0 - deltas[1])
+            finally:
+                #the pairs read ahead are given back while the file is
+                #still open, also when a gate is rejected
+                deltaPairs.close()
+        else:
+            readInts = self._tokenizer.readInts
+            for i in range(self.aigFile.nbOfAndGates):
+                andGate = readInts(3)
+                addAndGate(andGate[0], andGate[1], andGate[2])
 
+    #Get controllable and uncontrollable input indices
+    def getcontAnduncontInputIndices(self):
+        self.aigFile.indexInputSymbols()
+
+    #a single pass over the file, the symbol table is only located here
+    #and read when needed
     def parse(self):
-        self.getAigerHeader()
-        self.getInputs()
-        self.getOutputs()
-        self.getLatches()
-        self.getAndGates()
-        self.getcontAnduncontInputIndices()
+        self._tokenizer = AigerTokenizer(self._filePath)
+        try:
+            self.getAigerHeader()
+            self.getInputs()
+            self.getLatches()
+            self.getOutputs()
+            self.getAndGates()
+            self.aigFile.symbolTable = SymbolTable(self._filePath,
+                self._tokenizer.tell())
+        finally:
+            self._tokenizer.close()
+            self._tokenizer = None
         self.aigFile.outputBddContainsInputVar = self.aigFile.checkOutputForInput()
         return self.aigFile
+
+
+class AigerFileWriter(object):
+
+    def __init__(self, aigFile):
+        self.aigFile = aigFile
+
+    #write the circuit in binary format if binary is set,
+    #by default files ending with .aig are binary
+    def write(self, filePath, binary=None):
+        if binary is None:
+            binary = filePath.endswith('.aig')
+        f = open(filePath, 'wb')
+        try:
+            if binary:
+                self.writeBinary(f)
+            else:
+                self.writeAscii(f)
+            for line in self.aigFile.symbols:
+                f.write((line + '\n').encode('ascii'))
+        finally:
+            f.close()
+
+    def writeAscii(self, f):
+        aigFile = self.aigFile
+        lines = ['aag %d %d %d %d %d' % (aigFile.maxVarIndex,
+            len(aigFile.inputLits), len(aigFile.latchLits),
+            len(aigFile.outputLits), len(aigFile.andLhs))]
+        lines.extend(str(lit) for lit in aigFile.inputLits)
+        lines.extend('%d %d' % latch for latch in
+            zip(aigFile.latchLits, aigFile.latchNexts))
+        lines.extend(str(lit) for lit in aigFile.outputLits)
+        f.write(('\n'.join(lines) + '\n').encode('ascii'))
+        for i in range(len(aigFile.andLhs)):
+            f.write(('%d %d %d\n' % (aigFile.andLhs[i], aigFile.andRhs0[i],
+                aigFile.andRhs1[i])).encode('ascii'))
+
+    #the binary format needs inputs, latches and and gates numbered
+    #consecutively in this order, with every and gate after its inputs,
+    #so the variables are renumbered on the way
+    def writeBinary(self, f):
+        aigFile = self.aigFile
+        nbOfInputs = len(aigFile.inputLits)
+        nbOfLatches = len(aigFile.latchLits)
+        nbOfAndGates = len(aigFile.andLhs)
+        varMap = array('i', [-1]) * (aigFile.maxVarIndex + 1)
+        varMap[0] = 0
+        newVar = 1
+        for lit in aigFile.inputLits:
+            varMap[lit >> 1] = newVar
+            newVar += 1
+        for lit in aigFile.latchLits:
+            varMap[lit >> 1] = newVar
+            newVar += 1
+        order = aigFile.getTopologicalOrder()
+        for index in order:
+            varMap[aigFile.andLhs[index] >> 1] = newVar
+            newVar += 1
+
+        def mapLit(lit):
+            var = varMap[lit >> 1]
+            if var < 0:
+                raise ValueError('undefined literal ' + str(lit))
+            return 2 * var + (lit & 1)
+
+        lines = ['aig %d %d %d %d %d' % (newVar - 1, nbOfInputs, nbOfLatches,
+            len(aigFile.outputLits), nbOfAndGates)]
+        lines.extend(str(mapLit(lit)) for lit in aigFile.latchNexts)
+        lines.extend(str(mapLit(lit)) for lit in aigFile.outputLits)
+        f.write(('\n'.join(lines) + '\n').encode('ascii'))
+        out = bytearray()
+        for index in order:
+            lhs = mapLit(aigFile.andLhs[index])
+            rhs0 = mapLit(aigFile.andRhs0[index])
+            rhs1 = mapLit(aigFile.andRhs1[index])
+            if rhs0 < rhs1:
+                rhs0, rhs1 = rhs1, rhs0
+            for delta in (lhs - rhs0, rhs0 - rhs1):
+                while delta & ~0x7f:
+                    out.append((delta & 0x7f) | 0x80)
+                    delta >>= 7
+                out.append(delta)
+            if len(out) >= 1 << 20:
+                f.write(out)
+                out = bytearray()
+        f.write(out)
@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+from AigerParser import *
+from array import array
+import numpy
+import time
+
+
+#bit-parallel simulation of an aiger file: every variable has a row of
+#nbOfWords 64 bit words, each bit of a row belongs to another trace
+#the and gates are grouped by their depth and each group is evaluated with
+#one numpy operation
+class AigerSimulator(object):
+
+    def __init__(self, aiger, nbOfWords):
+        self._aig = aiger
+        self.nbOfWords = nbOfWords
+        self._inputVars = self.getVarIndices(aiger.inputLits)
+        self._latchVars = self.getVarIndices(aiger.latchLits)
+        self._levels = self.levelize()
+        #row 0 is the constant 0 and is never written
+        self._values = numpy.zeros((aiger.maxVarIndex + 1, nbOfWords),
+            dtype=numpy.uint64)
+
+    def getVarIndices(self, lits):
+        return numpy.array([lit >> 1 for lit in lits], dtype=numpy.intp)
+
+    #all ones for negated literals, 0 otherwise
+    def getNegationMasks(self, lits):
+        return numpy.array([-(lit & 1) for lit in lits],
+            dtype=numpy.int64).view(numpy.uint64)
+
+    #the and gates grouped by depth, each group as the arrays of its left
+    #hand sides, inputs and input negations
+    def levelize(self):
+        aig = self._aig
+        depths = array('i', [0]) * len(aig.andLhs)
+        groups = []
+        for index in aig.getTopologicalOrder():
+            depth = 0
+            for rhs in (aig.andRhs0[index], aig.andRhs1[index]):
+                child = aig.getAndGateIndex(rhs)
+                if child >= 0 and depths[child] + 1 > depth:
+                    depth = depths[child] + 1
+            depths[index] = depth
+            while len(groups) <= depth:
+                groups.append([])
+            groups[depth].append(index)
+        levels = []
+        for group in groups:
+            lhs = [aig.andLhs[index] for index in group]
+            rhs0 = [aig.andRhs0[index] for index in group]
+            rhs1 = [aig.andRhs1[index] for index in group]
+            #the masks are columns to apply to every word of the rows
+            levels.append((self.getVarIndices(lhs),
+                self.getVarIndices(rhs0), self.getNegationMasks(rhs0)[:, None],
+                self.getVarIndices(rhs1),
+                self.getNegationMasks(rhs1)[:, None]))
+        return levels
+
+    #one row per input and per latch, in the order of the file
+    def evaluate(self, inputValues, latchValues):
+        values = self._values
+        if len(self._inputVars) > 0:
+            values[self._inputVars] = inputValues
+        if len(self._latchVars) > 0:
+            values[self._latchVars] = latchValues
+        for lhs, rhs0, masks0, rhs1, masks1 in self._levels:
+            values[lhs] = (values[rhs0] ^ masks0) & (values[rhs1] ^ masks1)
+
+    #the rows of the literals after the last evaluation
+    def getLiteralValues(self, lits):
+        return self._values[self.getVarIndices(lits)] ^\
+            self.getNegationMasks(lits)[:, None]
+
+    def getNextState(self):
+        return self.getLiteralValues(self._aig.latchNexts)
+
+    def getOutput(self):
+        return self.getLiteralValues(self._aig.outputLits[:1])[0]
+
+
+#random words for rows traces
+def randomWords(rng, rows, nbOfWords):
+    data = rng.bytes(rows * nbOfWords * 8)
+    return numpy.frombuffer(data, dtype=numpy.uint64).reshape(
+        (rows, nbOfWords)).copy()
+
+
+#the position (word, bit) of the first trace whose bit is set in row
+def firstTrace(row):
+    word = int(numpy.flatnonzero(row)[0])
+    value = int(row[word])
+    bit = 0
+    while not (value >> bit) & 1:
+        bit += 1
+    return word, bit
+
+
+#the bits of one trace in the rows, as a string
+def getTraceBits(rows, word, bit):
+    return ''.join(str((int(value) >> bit) & 1) for value in rows[:, word])
+
+
+#simulation of a strategy, and of its winning region if there is one,
+#it can only find errors: traces from the initial state raising the error
+#output, or leaving the winning region, and random states of the winning
+#region whose successor leaves it or which raise the error output
+#the results use the messages of CompetitionTrnsSys.ValidateWinningRegion
+class StrategySimulation(object):
+
+    def __init__(self, aiger, winRegAigFile=None, nbOfWords=16, seed=0):
+        self._aig = aiger
+        self.nbOfWords = nbOfWords
+        self._rng = numpy.random.RandomState(seed)
+        self._strategy = AigerSimulator(aiger, nbOfWords)
+        #a second simulator for the random states, so that the traces keep
+        #their values
+        self._sampler = None
+        self._winRegion = None
+        self._nbOfWrInputs = 0
+        if winRegAigFile is not None:
+            if len(winRegAigFile.inputLits) > len(aiger.latchLits):
+                raise ValueError('the winning region has more inputs than '
+                    'the strategy has latches')
+            if len(winRegAigFile.latchLits) > 0:
+                raise ValueError('the winning region has latches')
+            self._winRegion = AigerSimulator(winRegAigFile, nbOfWords)
+            self._nbOfWrInputs = len(winRegAigFile.inputLits)
+            self._sampler = AigerSimulator(aiger, nbOfWords)
+        self.steps = 0
+
+    #the rows of the winning region for the given latch rows
+    def inWinningRegion(self, latchValues):
+        self._winRegion.evaluate(latchValues[:self._nbOfWrInputs], None)
+        return self._winRegion.getOutput()
+
+    #None if nothing was found in steps steps, or before timeLimit seconds
+    #passed, otherwise a list of lines: False, the reason and the
+    #counterexample
+    def run(self, steps, timeLimit=None):
+        deadline = None
+        if timeLimit is not None:
+            deadline = time.time() + timeLimit
+        aig = self._aig
+        nbOfInputs = len(aig.inputLits)
+        nbOfLatches = len(aig.latchLits)
+        state = numpy.zeros((nbOfLatches, self.nbOfWords),
+            dtype=numpy.uint64)
+        trace = []  # input rows of each step
+        for step in range(steps):
+            if deadline is not None and time.time() > deadline:
+                break
+            self.steps = step + 1
+            if self._winRegion is not None:
+                outside = ~self.inWinningRegion(state)
+                if outside.any():
+                    word, bit = firstTrace(outside)
+                    reason = 'The winning region is not a fixed point!!'
+                    if step == 0:
+                        reason = 'initial state is not in the winning '\
+                            'region!'
+                    return ['False', reason] +\
+                        self.getWitness(trace, word, bit, nbOfLatches)
+            inputs = randomWords(self._rng, nbOfInputs, self.nbOfWords)
+            trace.append(inputs)
+            self._strategy.evaluate(inputs, state)
+            bad = self._strategy.getOutput()
+            if bad.any():
+                word, bit = firstTrace(bad)
+                return ['False', 'the error output is raised at step '
+                    + str(step)] + self.getWitness(trace, word, bit,
+                    nbOfLatches)
+            state = self._strategy.getNextState()
+            if self._winRegion is not None:
+                found = self.sampleWinningRegion()
+                if found is not None:
+                    return found
+        return None
+
+    #random states, those inside the winning region must not raise the
+    #error output and their successors must stay inside
+    def sampleWinningRegion(self):
+        aig = self._aig
+        states = randomWords(self._rng, len(aig.latchLits), self.nbOfWords)
+        inside = self.inWinningRegion(states)
+        if not inside.any():
+            return None
+        inputs = randomWords(self._rng, len(aig.inputLits), self.nbOfWords)
+        self._sampler.evaluate(inputs, states)
+        errors = inside & self._sampler.getOutput()
+        reason = None
+        if errors.any():
+            reason = 'Winning region contains an error state!'
+        else:
+            nextStates = self._sampler.getNextState()
+            errors = inside & ~self.inWinningRegion(nextStates)
+            if errors.any():
+                reason = 'The winning region is not a fixed point!!'
+        if reason is None:
+            return None
+        word, bit = firstTrace(errors)
+        return ['False', reason, 'state=' + getTraceBits(states, word, bit),
+            'input=' + getTraceBits(inputs, word, bit)]
+
+    #an aiger witness: the property, the initial state and the inputs of
+    #each step
+    def getWitness(self, trace, word, bit, nbOfLatches):
+        lines = ['1', 'b0', '0' * nbOfLatches]
+        for inputs in trace:
+            lines.append(getTraceBits(inputs, word, bit))
+        lines.append('.')
+        return lines
@@ -1,5 +1,6 @@
 #!/usr/bin/env python
 from abc import abstractmethod
+from itertools import product
 
 
 class BDDBase(object):
@@ -12,10 +13,30 @@ class BDDBase(object):
     def getFalse(self):
         pass
 
+    @abstractmethod
+    def getNotTrue(self):
+        pass
+
+    @abstractmethod
+    def getNotOne(self):
+        pass
+
     @abstractmethod
     def createVar(self):
         pass
 
+    @abstractmethod
+    def getVars(self):
+        pass
+
+    @abstractmethod
+    def setVarOrder(self, order):
+        pass
+
+    @abstractmethod
+    def groupVars(self, index, size):
+        pass
+
     @abstractmethod
     def andTo(self, left, right):
         pass
@@ -24,6 +45,10 @@ class BDDBase(object):
     def andAll(self, right):
         pass
 
+    @abstractmethod
+    def cube(self, bddVars, phases=None):
+        pass
+
     @abstractmethod
     def and_no_deref(self, left, right):
         pass
@@ -80,6 +105,10 @@ class BDDBase(object):
     def relProduct(self, leftBDD, rightBDD, cube):
         pass
 
+    @abstractmethod
+    def createDdArray(self, length):
+        pass
+
     @abstractmethod
     def createPermutation(self, from_, to):
         pass
@@ -92,6 +121,34 @@ class BDDBase(object):
     def ref(self, bdd):
         pass
 
+    @abstractmethod
+    def support(self, bdd):
+        pass
+
+    @abstractmethod
+    def getVarIndex(self, var):
+        pass
+
+    @abstractmethod
+    def nodeCount(self, bdd):
+        pass
+
+    @abstractmethod
+    def sharingSize(self, bdds):
+        pass
+
+    @abstractmethod
+    def getStats(self):
+        pass
+
+    @abstractmethod
+    def restrict(self, bdd, care):
+        pass
+
+    @abstractmethod
+    def vectorCompose(self, bdd, vector):
+        pass
+
     @abstractmethod
     def replace_no_deref(self, bdd, perm):
         pass
@@ -108,11 +165,68 @@ class BDDBase(object):
     def exists(self, bdd, cube):
         pass
 
+    @abstractmethod
+    def forAll_no_deref(self, bdd, cube):
+        pass
+
+    @abstractmethod
+    def forAll(self, bdd, cube):
+        pass
+
     @abstractmethod
     def getSatAssign(self, bdd):
         pass
 
+    @abstractmethod
+    def getMintermBDD(self, bdd):
+        pass
+
+    @abstractmethod
+    def getMintermBitVector(self, bdd):
+        pass
+
     @abstractmethod
     def satAssignCount(self, bdd):
         pass
 
+    #the cubes of the bdd, disjoint, as strings with per variable index '0',
+    #'1' or '-' for a variable the cube does not constrain, one at a time
+    #no bdd may be built while the generator is suspended, a reordering
+    #could move the nodes it walks
+    @abstractmethod
+    def iterCubes(self, bdd):
+        pass
+
+    #the bdd of a DDDMP dump with one root, in mode 'A' (text) or 'B'
+    #(binary), the variable of id k in the dump is replaced by the variable
+    #of index composeIndices[k]
+    def loadDddmp(self, filePath, mode, composeIndices):
+        raise NotImplementedError('the bdd engine cannot load DDDMP files')
+
+    #the minterms of the bdd over the variables of indices (all the
+    #variables by default) as strings of '0' and '1', at most limit of
+    #them, the bdd must not depend on other variables
+    def iterMinterms(self, bdd, indices=None, limit=None):
+        if limit is not None and limit <= 0:
+            return
+        count = 0
+        for cube in self.iterCubes(bdd):
+            if indices is not None:
+                cube = ''.join(cube[i] for i in indices)
+            free = [k for k, value in enumerate(cube) if value == '-']
+            if not free:
+                minterms = [cube]
+            else:
+                minterms = self.expandCube(cube, free)
+            for minterm in minterms:
+                yield minterm
+                count += 1
+                if limit is not None and count >= limit:
+                    return
+
+    def expandCube(self, cube, free):
+        values = list(cube)
+        for bits in product('01', repeat=len(free)):
+            for k, bit in zip(free, bits):
+                values[k] = bit
+            yield ''.join(values)
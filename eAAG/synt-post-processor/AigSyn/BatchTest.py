@@ -0,0 +1,437 @@
+#!/usr/bin/env python
+from CheckerDaemon import CheckJob, preload, setLimit, WALL_CLOCK_SLACK
+from AigerParser import *
+from CuddConfig import *
+from BddEngines import *
+from CompetitionTrnsSys import IMAGE_METHODS
+from DddmpParser import parseWinningRegion
+from VarOrdering import ORDERINGS
+from PhaseStats import PhaseStats
+from SharedTrnsSys import SharedBdds, SharedCompetitionTrnsSys
+import argparse
+import csv
+import json
+import os
+import resource
+import select
+import signal
+import sys
+import time
+
+#validates many (strategy, winning region) pairs, each one is a run of
+#CompetitionTest.py in its own forked process with its own CUDD manager
+#and limits, up to --jobs of them at the same time
+#the pairs come from a manifest, one pair of paths per line relative to
+#the manifest, or from a directory of StarExec outputs that are split as
+#process splits them
+#with --shared the pairs of a benchmark are checked one after the other by
+#one process with one manager, see SharedTrnsSys, the benchmark of a pair
+#is the third field of its manifest line, or else is told by the number of
+#inputs of its two files, a wrong guess only costs time
+#the results go to a csv file, a row per pair written as soon as it is
+#known, with --resume the pairs already in the csv file are not checked
+#again
+#the arguments after -- are passed to CompetitionTest.py, with --shared
+#only --image, --ordering, --engine, --preset and --stats are taken
+
+CSV_FIELDS = ['strategy', 'wregion', 'verdict', 'reason', 'status', 'time']
+
+#the statuses of a job killed by its cpu limit or by the wall clock
+TIMEOUT_STATUSES = (128 + signal.SIGXCPU, 128 + signal.SIGKILL)
+
+argParser = argparse.ArgumentParser(
+    description='Batch winning region checker for SYNTCOMP')
+source = argParser.add_mutually_exclusive_group(required=True)
+source.add_argument('--manifest',
+    help='file with a strategy and a winning region file per line, and '
+    'optionally the name of their benchmark')
+source.add_argument('--starexec', metavar='DIR',
+    help='directory of StarExec solver outputs')
+argParser.add_argument('--work-dir', default='batch-files',
+    help='where the files split from StarExec outputs are written '
+    '(default: batch-files)')
+argParser.add_argument('--output', default='batch.csv',
+    help='csv file of the results (default: batch.csv)')
+argParser.add_argument('--resume', action='store_true',
+    help='keep the results of the csv file and only check the other pairs')
+argParser.add_argument('--jobs', type=int, default=4,
+    help='number of checks run at the same time (default: 4)')
+argParser.add_argument('--time-limit', type=int, metavar='SECONDS',
+    help='cpu time limit of a check')
+argParser.add_argument('--memory-limit', type=int, metavar='MB',
+    help='memory limit of a check')
+argParser.add_argument('--shared', action='store_true',
+    help='check the pairs of a benchmark in one bdd manager')
+argParser.add_argument('checkArgs', nargs=argparse.REMAINDER,
+    help='-- and arguments of CompetitionTest.py')
+args = argParser.parse_args()
+checkArgs = args.checkArgs
+if checkArgs and checkArgs[0] == '--':
+    checkArgs = checkArgs[1:]
+
+sharedConfig = None
+if args.shared:
+    sharedParser = argparse.ArgumentParser(prog='BatchTest.py --shared --')
+    sharedParser.add_argument('--image', choices=IMAGE_METHODS,
+        default='monolithic')
+    sharedParser.add_argument('--ordering', choices=ORDERINGS,
+        default='interleave')
+    sharedParser.add_argument('--engine', choices=ENGINE_NAMES,
+        default='pycudd')
+    sharedParser.add_argument('--preset', choices=sorted(CUDD_PRESETS),
+        default='default')
+    sharedParser.add_argument('--stats', action='store_true')
+    sharedConfig = sharedParser.parse_args(checkArgs)
+    if not isEngineAvailable(sharedConfig.engine):
+        argParser.error('the bdd engine ' + sharedConfig.engine +
+            ' is not available')
+
+
+#the (strategy, winning region) pairs of a manifest, empty lines and lines
+#starting with # are skipped, and the benchmarks given on the lines
+def readManifest(fileName):
+    base = os.path.dirname(os.path.abspath(fileName))
+    pairs = []
+    benchmarks = dict()  # pair -> name
+    for line in open(fileName):
+        fields = line.split()
+        if not fields or fields[0].startswith('#'):
+            continue
+        if len(fields) not in (2, 3):
+            sys.exit(fileName + ': expected two files and a benchmark on '
+                'line: ' + line)
+        pair = tuple(os.path.join(base, field) for field in fields[:2])
+        pairs.append(pair)
+        if len(fields) == 3:
+            benchmarks[pair] = fields[2]
+    return pairs, benchmarks
+
+
+#the lines of a StarExec output without their time stamps, the text up to
+#the last tab
+def stripTimeStamps(lines):
+    return [line.rsplit('\t', 1)[-1] for line in lines]
+
+
+#splits a StarExec output into the strategy and the winning region files
+#as process does, returns the pair or None and the reason it has none
+def splitStarExecOutput(fileName, workDir, name):
+    lines = open(fileName).read().splitlines(True)
+    realizable = False
+    aagLine = None
+    wregionLine = None
+    for k, line in enumerate(lines):
+        upper = line.upper()
+        if '\tUNREALIZABLE' in upper:
+            return None, 'unrealizable'
+        if '\tREALIZABLE' in upper:
+            realizable = True
+        if aagLine is None and '\taag ' in line:
+            aagLine = k
+        if wregionLine is None and '\tWINNING_REGION' in line:
+            wregionLine = k
+    if not realizable:
+        return None, 'neither REALIZABLE nor UNREALIZABLE'
+    if aagLine is None:
+        return None, 'no aag header'
+    if wregionLine is None:
+        return None, 'no winning region'
+    strategy = os.path.join(workDir, name + '-prod.aag')
+    wregion = os.path.join(workDir, name + '-wregion.aag')
+    open(strategy, 'w').writelines(stripTimeStamps(
+        lines[aagLine:wregionLine]))
+    open(wregion, 'w').writelines(stripTimeStamps(lines[wregionLine + 1:]))
+    return (strategy, wregion), None
+
+
+#the pairs of the StarExec outputs under directory, and the rows of the
+#outputs that have none
+def readStarExecOutputs(directory, workDir):
+    if not os.path.isdir(workDir):
+        os.makedirs(workDir)
+    pairs = []
+    skipped = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for fileName in sorted(files):
+            if fileName.endswith('.aag'):
+                continue
+            path = os.path.join(root, fileName)
+            name = os.path.relpath(path, directory).replace(os.sep, '__')
+            pair, reason = splitStarExecOutput(path, workDir, name)
+            if pair is None:
+                skipped.append({'strategy': path, 'wregion': '',
+                    'verdict': 'SKIPPED', 'reason': reason, 'status': '',
+                    'time': ''})
+            else:
+                pairs.append(pair)
+    return pairs, skipped
+
+
+#the strategies of a benchmark have its uncontrollable inputs and their
+#winning regions read its latches, the pairs are grouped by the number of
+#inputs of their two files when the benchmark is not given
+def groupPairs(pairs, benchmarks):
+    groups = dict()  # benchmark -> pairs
+    for pair in pairs:
+        benchmark = benchmarks.get(pair)
+        if benchmark is None:
+            try:
+                benchmark = tuple(int(open(fileName).readline().split()[2])
+                    for fileName in pair)
+            except (IOError, IndexError, ValueError):
+                benchmark = pair
+        groups.setdefault(benchmark, []).append(pair)
+    return [groups[benchmark] for benchmark in sorted(groups)]
+
+
+#checks a pair in the manager of its benchmark, the answer is what
+#CompetitionTest.py would print and its exit status
+def checkSharedPair(shared, pair, config):
+    for fileName in pair:
+        if not os.path.isfile(fileName):
+            return {'stdout': 'False\n', 'stderr': fileName +
+                ' cannot be found!\n', 'status': 1}
+    stats = PhaseStats(shared.bddManager)
+    try:
+        stats.start('parse')
+        aig = AigerFileParser(pair[0]).parse()
+        stats.stop('parse')
+        trnsSys = SharedCompetitionTrnsSys(aig, shared, config.image,
+            config.ordering, stats)
+    except Exception:
+        return {'stdout': 'False\n', 'stderr': 'An Error happenned, it could '
+            'be that ' + pair[0] + ' is not in a correct fromat\n',
+            'status': 1}
+    try:
+        stats.start('parse')
+        winRegAig = parseWinningRegion(pair[1])
+        stats.stop('parse')
+        result = trnsSys.ValidateWinningRegion(winRegAig).split(':')
+    except Exception:
+        return {'stdout': 'False\n', 'stderr': 'An Error happenned, it could '
+            'be that ' + pair[1] + ' is not in a correct fromat\n',
+            'status': 1}
+    lines = result[:2]
+    if config.stats:
+        lines += stats.getLines()
+    return {'stdout': ''.join(line + '\n' for line in lines), 'stderr': '',
+        'status': 0}
+
+
+#the pairs of a benchmark checked one after the other in a forked process
+#with one manager, the answer of each pair is a json line written as soon
+#as it is known
+#the cpu time limit is for each pair, the memory limit for the process, a
+#job killed by a limit leaves the pairs after the one it was checking
+class SharedJob(object):
+
+    def __init__(self, pairs, config, timeLimit=None, memoryLimit=None):
+        self.pairs = pairs
+        self.timeLimit = timeLimit
+        self.lastTime = time.time()  # when the last answer was read
+        self.done = False
+        self.killed = False
+        self._data = ''
+        reader, writer = os.pipe()
+        self.pid = os.fork()
+        if self.pid == 0:
+            os.close(reader)
+            try:
+                self.checkPairs(os.fdopen(writer, 'w'), config, memoryLimit)
+            finally:
+                os._exit(0)
+        os.close(writer)
+        self._reader = reader
+        self._answered = 0
+
+    def checkPairs(self, answerFile, config, memoryLimit):
+        #what CUDD prints does not go to the batch output
+        devNull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devNull, 1)
+        os.dup2(devNull, 2)
+        setLimit(resource.RLIMIT_AS, memoryLimit)
+        hardLimit = resource.getrlimit(resource.RLIMIT_CPU)[1]
+        shared = SharedBdds(createBddEngine(config.engine,
+            CUDD_PRESETS[config.preset]))
+        for pair in self.pairs:
+            if self.timeLimit is not None:
+                usage = resource.getrusage(resource.RUSAGE_SELF)
+                limit = int(usage.ru_utime + usage.ru_stime) + 1 +\
+                    self.timeLimit
+                if hardLimit != resource.RLIM_INFINITY:
+                    limit = min(limit, hardLimit)
+                resource.setrlimit(resource.RLIMIT_CPU, (limit, hardLimit))
+            startTime = time.time()
+            answer = checkSharedPair(shared, pair, config)
+            answer['time'] = time.time() - startTime
+            shared.release()
+            answerFile.write(json.dumps(answer) + '\n')
+            answerFile.flush()
+
+    def fileno(self):
+        return self._reader
+
+    #seconds until the wall clock limit of the pair being checked, None
+    #without limit
+    def getTimeout(self):
+        if self.timeLimit is None:
+            return None
+        return max(0.0, self.lastTime + self.timeLimit + WALL_CLOCK_SLACK -
+            time.time())
+
+    #the pairs answered since the last read with their answers, done once
+    #the job closed the pipe
+    def read(self):
+        chunk = os.read(self._reader, 65536)
+        if not chunk:
+            self.done = True
+            return []
+        lines = (self._data + chunk).split('\n')
+        self._data = lines.pop()
+        answers = []
+        for line in lines:
+            answers.append((self.pairs[self._answered], json.loads(line)))
+            self._answered += 1
+        if answers:
+            self.lastTime = time.time()
+        return answers
+
+    def kill(self):
+        os.kill(self.pid, signal.SIGKILL)
+        self.killed = True
+        self.done = True
+
+    #waits for the job to exit, the pair it was checking when it was killed
+    #gets the status a shell reports, the pairs after it are returned to be
+    #checked again
+    def getAnswers(self):
+        os.close(self._reader)
+        status = os.waitpid(self.pid, 0)[1]
+        if self._answered == len(self.pairs):
+            return [], []
+        pair = self.pairs[self._answered]
+        rest = self.pairs[self._answered + 1:]
+        if self.killed or os.WIFSIGNALED(status):
+            signum = signal.SIGKILL if self.killed else os.WTERMSIG(status)
+            answer = {'stdout': '', 'stderr': 'the job was killed by signal '
+                + str(signum) + '\n', 'status': 128 + signum}
+        else:
+            answer = {'stdout': '', 'stderr': 'the job gave no answer\n',
+                'status': 1}
+        answer['time'] = time.time() - self.lastTime
+        return [(pair, answer)], rest
+
+
+#the csv row of the answer of a job
+def getRow(pair, answer):
+    lines = answer['stdout'].splitlines()
+    status = answer['status']
+    if status in TIMEOUT_STATUSES:
+        verdict = 'TIMEOUT'
+    elif lines and lines[0] in ('True', 'False'):
+        verdict = lines[0]
+    elif lines and lines[0] == 'Model_check_result=RESOURCE_OUT':
+        verdict = 'RESOURCE_OUT'
+    else:
+        verdict = 'UNKNOWN'
+    reason = ''
+    if verdict in ('False', 'RESOURCE_OUT') and len(lines) > 1\
+        and not lines[1].startswith('AigSyn_'):
+        reason = lines[1]
+    elif verdict != 'True':
+        reason = answer['stderr'].strip().replace('\n', ' ')
+    return {'strategy': pair[0], 'wregion': pair[1], 'verdict': verdict,
+        'reason': reason, 'status': status, 'time': '%.3f' % answer['time']}
+
+
+#the pairs of the csv file
+def readDone(fileName):
+    done = set()
+    if not os.path.isfile(fileName):
+        return done
+    for row in csv.DictReader(open(fileName, 'rb')):
+        done.add((row['strategy'], row['wregion']))
+    return done
+
+
+benchmarks = dict()
+skipped = []
+if args.manifest is not None:
+    pairs, benchmarks = readManifest(args.manifest)
+else:
+    pairs, skipped = readStarExecOutputs(args.starexec, args.work_dir)
+
+done = set()
+if args.resume:
+    done = readDone(args.output)
+appending = args.resume and os.path.isfile(args.output)
+outputFile = open(args.output, 'ab' if appending else 'wb')
+writer = csv.DictWriter(outputFile, CSV_FIELDS)
+if not appending:
+    writer.writeheader()
+for row in skipped:
+    if (row['strategy'], row['wregion']) not in done:
+        writer.writerow(row)
+outputFile.flush()
+
+memoryLimit = None
+if args.memory_limit is not None:
+    memoryLimit = args.memory_limit * 1024 * 1024
+todo = [pair for pair in pairs if pair not in done]
+resumed = len(pairs) - len(todo)
+#a task is a pair, or the pairs of a benchmark with --shared
+if args.shared:
+    todo = groupPairs(todo, benchmarks)
+todo.reverse()
+preload()
+running = []
+checkPairs = dict()  # CheckJob -> pair
+counts = dict()
+while todo or running:
+    while todo and len(running) < args.jobs:
+        task = todo.pop()
+        if args.shared:
+            running.append(SharedJob(task, sharedConfig, args.time_limit,
+                memoryLimit))
+        else:
+            job = CheckJob(checkArgs + list(task), os.getcwd(),
+                args.time_limit, memoryLimit)
+            checkPairs[job] = task
+            running.append(job)
+    timeouts = [job.getTimeout() for job in running
+        if job.getTimeout() is not None]
+    timeout = min(timeouts) if timeouts else None
+    answers = []
+    ready = select.select(running, [], [], timeout)[0]
+    for job in running:
+        if job in ready:
+            if args.shared:
+                answers += job.read()
+            else:
+                job.read()
+        if not job.done and job.getTimeout() == 0.0:
+            job.kill()
+    for job in [job for job in running if job.done]:
+        running.remove(job)
+        if args.shared:
+            jobAnswers, rest = job.getAnswers()
+            answers += jobAnswers
+            if rest:
+                todo.append(rest)
+        else:
+            answer = job.getAnswer()
+            answer['time'] = job.time
+            answers.append((checkPairs.pop(job), answer))
+    for pair, answer in answers:
+        row = getRow(pair, answer)
+        writer.writerow(row)
+        outputFile.flush()
+        counts[row['verdict']] = counts.get(row['verdict'], 0) + 1
+outputFile.close()
+
+print 'checked=' + str(sum(counts.values()))
+for verdict in sorted(counts):
+    print verdict + '=' + str(counts[verdict])
+print 'skipped=' + str(len(skipped))
+print 'resumed=' + str(resumed)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+import importlib
+
+#the bdd engines implementing BDDBase, by name: the module and the class
+#pycudd: CUDD through the SWIG binding in ../pycudd
+#dd: CUDD through the cython binding of the dd package
+#python: a plain python package, for tiny circuits
+BDD_ENGINES = {
+    'pycudd': ('PyCuddBDD', 'PyCuddBDD'),
+    'dd': ('DdBDD', 'DdBDD'),
+    'python': ('PythonBDD', 'PythonBDD')}
+
+#in the order they are tried and listed
+ENGINE_NAMES = ('pycudd', 'dd', 'python')
+
+
+#the class of an engine, the module is only imported now so that an engine
+#whose binding is missing does not stop the others
+#raises ImportError when the binding of the engine is missing
+def getEngineClass(name):
+    if name not in BDD_ENGINES:
+        raise ValueError('unknown bdd engine ' + str(name))
+    moduleName, className = BDD_ENGINES[name]
+    return getattr(importlib.import_module(moduleName), className)
+
+
+def isEngineAvailable(name):
+    try:
+        getEngineClass(name)
+    except ImportError:
+        return False
+    return True
+
+
+def getAvailableEngines():
+    return [name for name in ENGINE_NAMES if isEngineAvailable(name)]
+
+
+#a new manager of the engine, config is a CuddConfig, the python engine
+#ignores it
+#only one CUDD manager may exist at a time, the previous one must be
+#dropped before another CUDD engine is created
+def createBddEngine(name, config=None):
+    return getEngineClass(name)(config)
+
+
+#the abstract methods of BDDBase the class of an engine does not implement
+def getMissingMethods(engineClass):
+    from BDDBase import BDDBase
+    missing = []
+    for name in sorted(dir(BDDBase)):
+        if not getattr(getattr(BDDBase, name), '__isabstractmethod__', False):
+            continue
+        if getattr(getattr(engineClass, name), '__isabstractmethod__',
+            False):
+            missing.append(name)
+    return missing
@@ -0,0 +1,362 @@
+#!/usr/bin/env python
+import heapq
+
+
+#the Luby sequence 1 1 2 1 1 2 4 1 1 2 ..., the restart intervals
+def luby(index):
+    size = 1
+    seq = 0
+    while size < index + 1:
+        seq += 1
+        size = 2 * size + 1
+    while size - 1 != index:
+        size = (size - 1) >> 1
+        seq -= 1
+        index = index % size
+    return 1 << seq
+
+
+#an incremental CDCL SAT solver, written in plain python so that it works
+#wherever AigSyn does
+#literals are integers as in aiger files: variable v is 2v and its
+#negation 2v + 1, variable 0 is not used
+#clauses can be added between calls to solve, every call may be given
+#assumptions that only hold for that call
+class CdclSolver(object):
+
+    def __init__(self):
+        self.nbOfVars = 0
+        #per literal: 1 true, -1 false, 0 unassigned
+        self._values = [0, 0]
+        #per variable
+        self._levels = [0]
+        self._reasons = [None]  # clause, its first literal is the implied one
+        self._phases = [False]  # the last value, used for decisions
+        self._activity = [0.0]
+        self._seen = [False]
+        self._watches = [[], []]  # per literal, clauses watching it
+        self._trail = []  # literals in the order they were assigned
+        self._trailLims = []  # trail size when each decision level started
+        self._qhead = 0  # trail position of the next literal to propagate
+        self._clauses = []
+        self._learnts = []
+        self._lbds = dict()  # id(learnt clause) -> literal block distance
+        self._heap = []  # (-activity, var), may contain stale entries
+        self._varInc = 1.0
+        self._varDecay = 0.95
+        self._maxLearnts = 2000
+        self._ok = True  # false once the clauses are unsatisfiable
+        self.model = None
+        self.conflicts = 0
+        self.decisions = 0
+        self.propagations = 0
+
+    def newVar(self):
+        self.nbOfVars += 1
+        self._values.extend((0, 0))
+        self._levels.append(0)
+        self._reasons.append(None)
+        self._phases.append(False)
+        self._activity.append(0.0)
+        self._seen.append(False)
+        self._watches.extend(([], []))
+        heapq.heappush(self._heap, (0.0, self.nbOfVars))
+        return self.nbOfVars << 1
+
+    def getNbOfClauses(self):
+        return len(self._clauses)
+
+    def decisionLevel(self):
+        return len(self._trailLims)
+
+    #returns False once the clauses are known to be unsatisfiable
+    def addClause(self, lits):
+        if not self._ok:
+            return False
+        self.cancelUntil(0)
+        values = self._values
+        clause = []
+        for lit in lits:
+            if values[lit] == 1 or lit ^ 1 in clause:
+                return True
+            if values[lit] == 0 and lit not in clause:
+                clause.append(lit)
+        if not clause:
+            self._ok = False
+        elif len(clause) == 1:
+            self.enqueue(clause[0], None)
+            self._ok = self.propagate() is None
+        else:
+            self._watches[clause[0]].append(clause)
+            self._watches[clause[1]].append(clause)
+            self._clauses.append(clause)
+        return self._ok
+
+    def enqueue(self, lit, reason):
+        self._values[lit] = 1
+        self._values[lit ^ 1] = -1
+        self._levels[lit >> 1] = len(self._trailLims)
+        self._reasons[lit >> 1] = reason
+        self._trail.append(lit)
+
+    #unit propagation with two watched literals, the watched literals of a
+    #clause are its first two, returns the conflicting clause or None
+    def propagate(self):
+        values = self._values
+        watches = self._watches
+        trail = self._trail
+        while self._qhead < len(trail):
+            falseLit = trail[self._qhead] ^ 1
+            self._qhead += 1
+            self.propagations += 1
+            watchList = watches[falseLit]
+            n = len(watchList)
+            i = j = 0
+            while i < n:
+                clause = watchList[i]
+                i += 1
+                if clause[0] == falseLit:
+                    clause[0] = clause[1]
+                    clause[1] = falseLit
+                first = clause[0]
+                if values[first] == 1:
+                    watchList[j] = clause
+                    j += 1
+                    continue
+                for k in range(2, len(clause)):
+                    if values[clause[k]] != -1:
+                        clause[1] = clause[k]
+                        clause[k] = falseLit
+                        watches[clause[1]].append(clause)
+                        break
+                else:
+                    watchList[j] = clause
+                    j += 1
+                    if values[first] == -1:
+                        while i < n:
+                            watchList[j] = watchList[i]
+                            j += 1
+                            i += 1
+                        del watchList[j:]
+                        self._qhead = len(trail)
+                        return clause
+                    self.enqueue(first, clause)
+            del watchList[j:]
+        return None
+
+    def cancelUntil(self, level):
+        if len(self._trailLims) <= level:
+            return
+        values = self._values
+        activity = self._activity
+        limit = self._trailLims[level]
+        for k in range(len(self._trail) - 1, limit - 1, -1):
+            lit = self._trail[k]
+            var = lit >> 1
+            values[lit] = 0
+            values[lit ^ 1] = 0
+            self._reasons[var] = None
+            self._phases[var] = (lit & 1) == 0
+            heapq.heappush(self._heap, (-activity[var], var))
+        del self._trail[limit:]
+        del self._trailLims[level:]
+        self._qhead = limit
+
+    def bumpVar(self, var):
+        activity = self._activity
+        activity[var] += self._varInc
+        if activity[var] > 1e100:
+            for v in range(1, self.nbOfVars + 1):
+                activity[v] *= 1e-100
+            self._varInc *= 1e-100
+            self.rebuildHeap()
+        elif self._values[var << 1] == 0:
+            heapq.heappush(self._heap, (-activity[var], var))
+            if len(self._heap) > 8 * self.nbOfVars + 1024:
+                self.rebuildHeap()
+
+    #the heap without its stale entries
+    def rebuildHeap(self):
+        activity = self._activity
+        values = self._values
+        self._heap = [(-activity[v], v) for v in range(1, self.nbOfVars + 1)
+            if values[v << 1] == 0]
+        heapq.heapify(self._heap)
+
+    #the unassigned variable with the highest activity, None if there is
+    #none left
+    def pickBranchVar(self):
+        heap = self._heap
+        values = self._values
+        activity = self._activity
+        while heap:
+            negActivity, var = heapq.heappop(heap)
+            if values[var << 1] == 0 and -negActivity == activity[var]:
+                return var
+        #stale entries only, should not happen but is cheap to be sure of
+        for var in range(1, self.nbOfVars + 1):
+            if values[var << 1] == 0:
+                return var
+        return None
+
+    #first unique implication point learning, returns the learnt clause
+    #with the asserting literal first and the literal of the backjump
+    #level second, and the backjump level
+    def analyze(self, conflict):
+        seen = self._seen
+        levels = self._levels
+        reasons = self._reasons
+        trail = self._trail
+        level = len(self._trailLims)
+        learnt = [None]
+        pathCount = 0
+        lit = None
+        index = len(trail) - 1
+        clause = conflict
+        while True:
+            if id(clause) in self._lbds:
+                self._lbds[id(clause)] = min(self._lbds[id(clause)],
+                    self.computeLbd(clause))
+            start = 0 if lit is None else 1
+            for k in range(start, len(clause)):
+                q = clause[k]
+                var = q >> 1
+                if not seen[var] and levels[var] > 0:
+                    seen[var] = True
+                    self.bumpVar(var)
+                    if levels[var] >= level:
+                        pathCount += 1
+                    else:
+                        learnt.append(q)
+            while not seen[trail[index] >> 1]:
+                index -= 1
+            lit = trail[index]
+            index -= 1
+            clause = reasons[lit >> 1]
+            seen[lit >> 1] = False
+            pathCount -= 1
+            if pathCount == 0:
+                break
+        learnt[0] = lit ^ 1
+        #drop literals implied by the other literals of the clause
+        kept = [learnt[0]]
+        for q in learnt[1:]:
+            reason = reasons[q >> 1]
+            if reason is None:
+                kept.append(q)
+                continue
+            for r in reason[1:]:
+                if not seen[r >> 1] and levels[r >> 1] > 0:
+                    kept.append(q)
+                    break
+        for q in learnt[1:]:
+            seen[q >> 1] = False
+        backLevel = 0
+        if len(kept) > 1:
+            maxIndex = 1
+            for k in range(2, len(kept)):
+                if levels[kept[k] >> 1] > levels[kept[maxIndex] >> 1]:
+                    maxIndex = k
+            kept[1], kept[maxIndex] = kept[maxIndex], kept[1]
+            backLevel = levels[kept[1] >> 1]
+        return kept, backLevel
+
+    #the number of decision levels of the literals of a clause
+    def computeLbd(self, clause):
+        levels = self._levels
+        return len(set(levels[lit >> 1] for lit in clause))
+
+    #drop half of the learnt clauses, those with the highest literal block
+    #distance, clauses with a distance of 2 and reasons are kept
+    def reduceDb(self):
+        values = self._values
+        reasons = self._reasons
+        lbds = self._lbds
+        self._learnts.sort(key=lambda clause: lbds[id(clause)])
+        limit = len(self._learnts) // 2
+        kept = []
+        for k, clause in enumerate(self._learnts):
+            locked = values[clause[0]] == 1 and\
+                reasons[clause[0] >> 1] is clause
+            if k < limit or locked or lbds[id(clause)] <= 2:
+                kept.append(clause)
+            else:
+                del lbds[id(clause)]
+        self._learnts = kept
+        for watchList in self._watches:
+            del watchList[:]
+        for clause in self._clauses:
+            self._watches[clause[0]].append(clause)
+            self._watches[clause[1]].append(clause)
+        for clause in self._learnts:
+            self._watches[clause[0]].append(clause)
+            self._watches[clause[1]].append(clause)
+
+    #None when the conflict budget is used up, otherwise the result
+    def search(self, budget, assumptions):
+        values = self._values
+        conflicts = 0
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                conflicts += 1
+                if not self._trailLims:
+                    self._ok = False
+                    return False
+                learnt, backLevel = self.analyze(conflict)
+                self.cancelUntil(backLevel)
+                if len(learnt) == 1:
+                    self.enqueue(learnt[0], None)
+                else:
+                    self._watches[learnt[0]].append(learnt)
+                    self._watches[learnt[1]].append(learnt)
+                    self._learnts.append(learnt)
+                    self._lbds[id(learnt)] = self.computeLbd(learnt)
+                    self.enqueue(learnt[0], learnt)
+                self._varInc /= self._varDecay
+                continue
+            if conflicts >= budget:
+                self.cancelUntil(0)
+                return None
+            if len(self._learnts) >= self._maxLearnts + len(self._trail):
+                self.reduceDb()
+                self._maxLearnts = int(self._maxLearnts * 1.1)
+            level = len(self._trailLims)
+            if level < len(assumptions):
+                lit = assumptions[level]
+                if values[lit] == -1:
+                    return False
+                self._trailLims.append(len(self._trail))
+                if values[lit] == 0:
+                    self.enqueue(lit, None)
+                continue
+            var = self.pickBranchVar()
+            if var is None:
+                self.model = list(values)
+                return True
+            self.decisions += 1
+            self._trailLims.append(len(self._trail))
+            self.enqueue((var << 1) | (not self._phases[var]), None)
+
+    #whether the clauses and the assumptions are satisfiable, the model is
+    #kept when they are
+    def solve(self, assumptions=()):
+        self.model = None
+        if not self._ok:
+            return False
+        self.cancelUntil(0)
+        if self.propagate() is not None:
+            self._ok = False
+            return False
+        restarts = 0
+        result = None
+        while result is None:
+            result = self.search(luby(restarts) * 100, list(assumptions))
+            restarts += 1
+        self.cancelUntil(0)
+        return result
+
+    #the value of a literal in the last model
+    def getModelValue(self, lit):
+        return self.model[lit] == 1
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+from CheckerDaemon import DEFAULT_SOCKET, sendMessage, readMessage
+import argparse
+import os
+import resource
+import socket
+import stat
+import sys
+
+#sends the arguments of CompetitionTest.py to CheckerDaemon.py and prints
+#the answer as CompetitionTest.py would, with its exit status, so that it
+#can replace CompetitionTest.py in the scripts
+#the cpu time and memory limits of this process (ulimit -t, ulimit -v) are
+#passed on to the job
+#without a daemon CompetitionTest.py is run in this process instead
+argParser = argparse.ArgumentParser(add_help=False)
+argParser.add_argument('--socket', default=DEFAULT_SOCKET)
+args, checkArgs = argParser.parse_known_args()
+
+
+#the soft limit of a resource, None if there is none
+def getLimit(kind):
+    limit = resource.getrlimit(kind)[0]
+    if limit == resource.RLIM_INFINITY:
+        return None
+    return limit
+
+
+def runLocally():
+    competitionTest = os.path.join(os.path.dirname(
+        os.path.abspath(__file__)), 'CompetitionTest.py')
+    os.execv(sys.executable, [sys.executable, competitionTest] + checkArgs)
+
+
+#only a daemon of this user is trusted with the check
+def isOwnSocket(path):
+    try:
+        info = os.stat(path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(info.st_mode) and info.st_uid == os.getuid()
+
+
+if not isOwnSocket(args.socket):
+    runLocally()
+
+connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+try:
+    connection.connect(args.socket)
+except socket.error:
+    connection.close()
+    runLocally()
+
+sendMessage(connection, {'argv': checkArgs, 'cwd': os.getcwd(),
+    'timeLimit': getLimit(resource.RLIMIT_CPU),
+    'memoryLimit': getLimit(resource.RLIMIT_AS)})
+answer = readMessage(connection)
+connection.close()
+if answer is None:
+    sys.exit('the checker daemon closed the connection')
+sys.stdout.write(answer['stdout'].encode('latin-1'))
+sys.stderr.write(answer['stderr'].encode('latin-1'))
+sys.stdout.flush()
+sys.stderr.flush()
+#a job killed by a signal has the status a shell reports for it
+os._exit(answer['status'])
@@ -0,0 +1,345 @@
+#!/usr/bin/env python
+import argparse
+import errno
+import json
+import os
+import resource
+import select
+import signal
+import socket
+import stat
+import sys
+import tempfile
+import time
+import traceback
+
+#a long lived checker: the modules and the CUDD library are loaded once,
+#every job is run in a forked process, so that each job gets a new CUDD
+#manager and its own time and memory limits
+#a job is the argument list of CompetitionTest.py, the answer is what
+#CompetitionTest.py would have printed and its exit status, a job killed by
+#a limit answers nothing and the status of the signal, as a shell reports
+#a process killed by ulimit
+
+#anyone who can connect runs checks with the rights of the daemon, the
+#socket is only accessible to its user and by default in a directory only
+#its user can enter: $XDG_RUNTIME_DIR, or a directory named after the user
+#id in the temporary directory
+def getDefaultSocketDir():
+    runtimeDir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtimeDir:
+        return runtimeDir
+    return os.path.join(tempfile.gettempdir(), 'aigsyn-' + str(os.getuid()))
+
+
+DEFAULT_SOCKET = os.path.join(getDefaultSocketDir(), 'aigsyn-checker.sock')
+
+#the directory of CompetitionTest.py
+AIGSYN_DIR = os.path.dirname(os.path.abspath(__file__))
+
+#the time a job killed on the wall clock limit gets beyond its cpu limit
+WALL_CLOCK_SLACK = 10
+
+
+#the messages are json objects, one per line
+def sendMessage(connection, message):
+    connection.sendall(json.dumps(message) + '\n')
+
+
+def readMessage(connection):
+    data = []
+    while True:
+        chunk = connection.recv(65536)
+        if not chunk:
+            break
+        data.append(chunk)
+        if chunk.endswith('\n'):
+            break
+    if not data:
+        return None
+    return json.loads(''.join(data))
+
+
+#the lower of two limits, None is no limit
+def lowerLimit(left, right):
+    if left is None:
+        return right
+    if right is None:
+        return left
+    return min(left, right)
+
+
+#creates the directory of the default socket if needed, an existing one
+#must belong to the user and be closed to the others
+#raises ValueError otherwise
+def makePrivateDir(path):
+    try:
+        os.mkdir(path, 0o700)
+    except OSError as ex:
+        if ex.errno != errno.EEXIST:
+            raise
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or\
+        info.st_mode & 0o077:
+        raise ValueError(path + ' is not a directory private to this user')
+
+
+def setLimit(kind, limit, hardSlack=0):
+    if limit is not None:
+        resource.setrlimit(kind, (limit, limit + hardSlack))
+
+
+#load everything a job needs before the first fork, the bdd engines whose
+#binding is missing are left out, a job asking for one of them fails
+def preload():
+    sys.path.insert(0, AIGSYN_DIR)
+    import AigerParser
+    import BddEngines
+    import CompetitionTrnsSys
+    import SatCompetitionChecker
+    for name in BddEngines.ENGINE_NAMES:
+        BddEngines.isEngineAvailable(name)
+    try:
+        import ExplicitCompetitionChecker
+    except ImportError:
+        pass
+
+
+#runs CompetitionTest.py in this process and returns its output and exit
+#status, the standard output and error of the process are replaced by files
+#so that what the CUDD library prints is kept as well
+def runCompetitionTest(argv, cwd):
+    import runpy
+    output = tempfile.TemporaryFile()
+    errors = tempfile.TemporaryFile()
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os.dup2(output.fileno(), 1)
+    os.dup2(errors.fileno(), 2)
+    sys.argv = [os.path.join(AIGSYN_DIR, 'CompetitionTest.py')] + argv
+    status = 0
+    try:
+        os.chdir(cwd)
+        runpy.run_path(sys.argv[0], run_name='__main__')
+    except SystemExit as ex:
+        if ex.code is None:
+            status = 0
+        elif isinstance(ex.code, int):
+            status = ex.code
+        else:
+            sys.stderr.write(str(ex.code) + '\n')
+            status = 1
+    except Exception:
+        traceback.print_exc()
+        status = 1
+    sys.stdout.flush()
+    sys.stderr.flush()
+    output.seek(0)
+    errors.seek(0)
+    #latin-1 maps every byte to a character, json needs characters
+    return {'stdout': output.read().decode('latin-1'),
+        'stderr': errors.read().decode('latin-1'), 'status': status}
+
+
+class CheckerDaemon(object):
+
+    def __init__(self, socketPath, timeLimit=None, memoryLimit=None,
+        maxJobs=4):
+        self.socketPath = socketPath
+        self.timeLimit = timeLimit  # cpu seconds per job
+        self.memoryLimit = memoryLimit  # bytes per job
+        self.maxJobs = maxJobs
+        self._jobs = set()  # pids of the processes serving a connection
+        self._server = None
+
+    #raises ValueError when the socket path is taken by something else
+    #than a socket of this user, a stale socket is replaced
+    def listen(self):
+        if self.socketPath == DEFAULT_SOCKET:
+            makePrivateDir(os.path.dirname(self.socketPath))
+        try:
+            info = os.lstat(self.socketPath)
+        except OSError as ex:
+            if ex.errno != errno.ENOENT:
+                raise
+        else:
+            if not stat.S_ISSOCK(info.st_mode) or\
+                info.st_uid != os.getuid():
+                raise ValueError(self.socketPath + ' exists and is not a '
+                    'socket of this user')
+            os.unlink(self.socketPath)
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        #the socket is created with the permissions of the umask
+        umask = os.umask(0o077)
+        try:
+            self._server.bind(self.socketPath)
+        finally:
+            os.umask(umask)
+        os.chmod(self.socketPath, 0o600)
+        self._server.listen(64)
+
+    def close(self):
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        if os.path.exists(self.socketPath):
+            os.unlink(self.socketPath)
+
+    #reap the finished jobs, wait for one if there are too many
+    def reapJobs(self):
+        while self._jobs:
+            flags = 0 if len(self._jobs) >= self.maxJobs else os.WNOHANG
+            try:
+                pid, status = os.waitpid(-1, flags)
+            except OSError as ex:
+                if ex.errno == errno.EINTR:
+                    continue
+                self._jobs.clear()
+                return
+            if pid == 0:
+                return
+            self._jobs.discard(pid)
+
+    def serveForever(self):
+        while True:
+            self.reapJobs()
+            try:
+                connection, address = self._server.accept()
+            except socket.error as ex:
+                if ex.args[0] == errno.EINTR:
+                    continue
+                raise
+            pid = os.fork()
+            if pid == 0:
+                #only the daemon removes the socket when it is terminated
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                self._server.close()
+                status = 0
+                try:
+                    self.serveConnection(connection)
+                except Exception:
+                    traceback.print_exc()
+                    status = 1
+                finally:
+                    connection.close()
+                    os._exit(status)
+            connection.close()
+            self._jobs.add(pid)
+
+    #the process serving a connection forks the job, so that it can answer
+    #when the job is killed
+    def serveConnection(self, connection):
+        request = readMessage(connection)
+        if request is None:
+            return
+        job = CheckJob(request['argv'], request['cwd'],
+            lowerLimit(self.timeLimit, request.get('timeLimit')),
+            lowerLimit(self.memoryLimit, request.get('memoryLimit')))
+        while not job.done:
+            timeout = job.getTimeout()
+            if not select.select([job], [], [], timeout)[0]:
+                job.kill()
+            else:
+                job.read()
+        sendMessage(connection, job.getAnswer())
+
+
+#a run of CompetitionTest.py in a forked process with its own limits, the
+#answer is read from a pipe as it is written so that a large output does
+#not block the job, jobs can be passed to select
+class CheckJob(object):
+
+    def __init__(self, argv, cwd, timeLimit=None, memoryLimit=None):
+        self.argv = argv
+        self.startTime = time.time()
+        self.deadline = None
+        if timeLimit is not None:
+            self.deadline = self.startTime + timeLimit + WALL_CLOCK_SLACK
+        self.done = False
+        self.killed = False
+        self._data = []
+        reader, writer = os.pipe()
+        self.pid = os.fork()
+        if self.pid == 0:
+            os.close(reader)
+            try:
+                setLimit(resource.RLIMIT_CPU, timeLimit, 1)
+                setLimit(resource.RLIMIT_AS, memoryLimit)
+                answer = runCompetitionTest(argv, cwd)
+                answerFile = os.fdopen(writer, 'w')
+                answerFile.write(json.dumps(answer))
+                answerFile.close()
+            finally:
+                os._exit(0)
+        os.close(writer)
+        self._reader = reader
+
+    def fileno(self):
+        return self._reader
+
+    #seconds until the wall clock limit, None without limit
+    def getTimeout(self):
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.time())
+
+    #reads what the job wrote, done once it closed the pipe
+    def read(self):
+        chunk = os.read(self._reader, 65536)
+        if chunk:
+            self._data.append(chunk)
+        else:
+            self.done = True
+
+    def kill(self):
+        os.kill(self.pid, signal.SIGKILL)
+        self.killed = True
+        self.done = True
+
+    #waits for the job to exit, the answer of a killed job has the status
+    #a shell reports for it and no output
+    def getAnswer(self):
+        os.close(self._reader)
+        status = os.waitpid(self.pid, 0)[1]
+        self.time = time.time() - self.startTime
+        if self.killed or os.WIFSIGNALED(status):
+            signum = signal.SIGKILL if self.killed else os.WTERMSIG(status)
+            return {'stdout': '', 'stderr': 'the job was killed by signal '
+                + str(signum) + '\n', 'status': 128 + signum}
+        if not self._data:
+            return {'stdout': '', 'stderr': 'the job gave no answer\n',
+                'status': 1}
+        return json.loads(''.join(self._data))
+
+
+if __name__ == '__main__':
+    argParser = argparse.ArgumentParser(
+        description='Winning region checker service for SYNTCOMP, the jobs '
+        'are sent by CheckerClient.py')
+    argParser.add_argument('--socket', default=DEFAULT_SOCKET,
+        help='path of the unix socket (default: ' + DEFAULT_SOCKET + ')')
+    argParser.add_argument('--time-limit', type=int, metavar='SECONDS',
+        help='cpu time limit of a job')
+    argParser.add_argument('--memory-limit', type=int, metavar='MB',
+        help='memory limit of a job')
+    argParser.add_argument('--jobs', type=int, default=4,
+        help='number of jobs run at the same time (default: 4)')
+    args = argParser.parse_args()
+    memoryLimit = None
+    if args.memory_limit is not None:
+        memoryLimit = args.memory_limit * 1024 * 1024
+    preload()
+    daemon = CheckerDaemon(args.socket, args.time_limit, memoryLimit,
+        args.jobs)
+    try:
+        daemon.listen()
+    except ValueError as ex:
+        argParser.error(str(ex))
+    #a terminated daemon removes its socket
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        daemon.serveForever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.close()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+from AigerParser import *
+from ConeAnalysis import ConeAnalysis
+from DddmpParser import DddmpFile
+from ResourceGovernor import ResourceOut
+from VarOrdering import VarOrdering
+import errno
+import json
+import os
+import select
+import signal
+
+#CUDD uses one core, the fixed point check of a winning region W is split
+#over the valuations of k latches that W reads: the part of a cube c is
+#W & c & preimage(!W) = 0, where the next state functions are cofactored
+#by c, so that each part has k latches less
+#the 2 ** k parts are checked by forked workers, each with its own bdd
+#manager built from the circuit parsed by the parent, the parent must not
+#have a manager of its own
+#every worker checks the initial state and the error states of the whole
+#of W before its part, so that the reason of a failure is the one
+#ValidateWinningRegion gives, the first failure cancels the other workers
+
+
+#the positions of at most nbOfLatches latches the winning region reads,
+#from the top of the static variable order of the strategy
+def getSplitPositions(aig, winRegAig, ordering, nbOfLatches):
+    if isinstance(winRegAig, DddmpFile):
+        read = set(winRegAig.getLatchPositions(aig).values())
+    else:
+        wrCones = ConeAnalysis(winRegAig)
+        support = wrCones.getOutputSupport() & wrCones.getInputMask()
+        read = set(k for k in range(len(winRegAig.inputLits))
+            if (support >> k) & 1)
+    latchPositions = dict((lit, k) for k, lit in enumerate(aig.latchLits))
+    positions = []
+    for lit in VarOrdering(aig, ordering).getOrder():
+        k = latchPositions.get(lit)
+        if k is not None and k in read:
+            positions.append(k)
+    return positions[:nbOfLatches]
+
+
+#a part checked in a forked process, the answer is a json object read from
+#a pipe: the result of ValidateWinningRegion, or the reason of a resource
+#out or of an error
+class CofactorWorker(object):
+
+    def __init__(self, check, cofactor):
+        self.cofactor = cofactor
+        self.done = False
+        self._data = []
+        reader, writer = os.pipe()
+        self.pid = os.fork()
+        if self.pid == 0:
+            os.close(reader)
+            #the answer is the only output of a worker, what the CUDD
+            #library prints when its manager is deleted is dropped
+            devNull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devNull, 1)
+            os.dup2(devNull, 2)
+            os.close(devNull)
+            try:
+                try:
+                    answer = {'result': check(cofactor)}
+                except ResourceOut as ex:
+                    answer = {'resourceOut': str(ex)}
+                except Exception as ex:
+                    answer = {'error': str(ex)}
+                answerFile = os.fdopen(writer, 'w')
+                answerFile.write(json.dumps(answer))
+                answerFile.close()
+            finally:
+                os._exit(0)
+        os.close(writer)
+        self._reader = reader
+
+    def fileno(self):
+        return self._reader
+
+    def read(self):
+        chunk = os.read(self._reader, 65536)
+        if chunk:
+            self._data.append(chunk)
+        else:
+            self.done = True
+
+    def kill(self):
+        try:
+            os.kill(self.pid, signal.SIGKILL)
+        except OSError as ex:
+            if ex.errno != errno.ESRCH:
+                raise
+        self.getAnswer()
+
+    def getAnswer(self):
+        os.close(self._reader)
+        status = os.waitpid(self.pid, 0)[1]
+        if os.WIFSIGNALED(status):
+            return {'error': 'the worker was killed by signal ' +
+                str(os.WTERMSIG(status))}
+        if not self._data:
+            return {'error': 'the worker gave no answer'}
+        return json.loads(''.join(self._data))
+
+
+#checks the parts of the cubes over the latches at positions, at most
+#nbOfWorkers at the same time, check(cofactor) is called in each worker
+#with the dict of the latch values of its cube and returns the result of
+#ValidateWinningRegion for that part
+#returns that result: 'True' if every part holds, the first failure
+#otherwise, raises ResourceOut if a worker gave up
+class CofactorCheck(object):
+
+    def __init__(self, check, positions, nbOfWorkers):
+        self.check = check
+        self.positions = positions
+        self.nbOfWorkers = max(1, nbOfWorkers)
+        self.nbOfParts = 1 << len(positions)
+
+    #the latch values of the cube of part number index
+    def getCofactor(self, index):
+        return dict((position, (index >> j) & 1)
+            for j, position in enumerate(self.positions))
+
+    def run(self):
+        pending = list(range(self.nbOfParts))
+        running = []
+        try:
+            while pending or running:
+                while pending and len(running) < self.nbOfWorkers:
+                    running.append(CofactorWorker(self.check,
+                        self.getCofactor(pending.pop(0))))
+                try:
+                    ready = select.select(running, [], [])[0]
+                except select.error as ex:
+                    if ex.args[0] == errno.EINTR:
+                        continue
+                    raise
+                for worker in ready:
+                    worker.read()
+                    if not worker.done:
+                        continue
+                    running.remove(worker)
+                    answer = worker.getAnswer()
+                    if 'resourceOut' in answer:
+                        raise ResourceOut(answer['resourceOut'])
+                    if 'error' in answer:
+                        raise RuntimeError(answer['error'])
+                    if answer['result'] != 'True':
+                        return answer['result']
+            return 'True'
+        finally:
+            for worker in running:
+                worker.kill()
@@ -1,24 +1,105 @@
 #!/usr/bin/env python
 
 from AigerParser import *
-from PyCuddBDD import *
+from CuddConfig import *
+from BddEngines import *
 from CompetitionTrnsSys import *
+from PhaseStats import PhaseStats
+from ResourceGovernor import *
+from SatCompetitionChecker import SatCompetitionChecker
+from CofactorCheck import *
+from DddmpParser import *
+try:
+    from ExplicitCompetitionChecker import *
+except ImportError:
+    ExplicitCompetitionChecker = None
+import argparse
+import multiprocessing
 import sys
 import os.path
 
 
 location = "/home/mohamad/MSakr/AigSyn/tests/winning/"
 
-if len(sys.argv) == 3 :
-    winingRegion = sys.argv[2]
-    fileName = sys.argv[1]
-else:
-    winingRegion = "cnt4n.aag-wregion.aag"
-    fileName = "cnt4n.aag-result.aag"
-    winingRegion = location + winingRegion
-    fileName = location + fileName
-
-if not os.path.isfile(winingRegion):
+argParser = argparse.ArgumentParser(
+    description='Winning region checker for SYNTCOMP')
+argParser.add_argument('strategy', nargs='?',
+    default=location + "cnt4n.aag-result.aag")
+argParser.add_argument('wregion', nargs='?',
+    default=location + "cnt4n.aag-wregion.aag")
+argParser.add_argument('--image', choices=IMAGE_METHODS, default='monolithic',
+    help='how pre-images are computed (default: monolithic)')
+argParser.add_argument('--ordering', choices=ORDERINGS, default='interleave',
+    help='static variable order applied before building the bdds '
+    '(default: interleave)')
+argParser.add_argument('--model-check', action='store_true',
+    help='model check the strategy instead of validating the winning region')
+argParser.add_argument('--direction', choices=DIRECTIONS, default='auto',
+    help='search direction of the model check (default: auto)')
+argParser.add_argument('--backend', choices=('auto', 'bdd', 'sat', 'explicit'),
+    default='auto', help='check with BDDs, with SAT queries or on explicit '
+    'states, auto takes explicit states for the strategies with few latches '
+    'and inputs and BDDs otherwise (default: auto)')
+argParser.add_argument('--engine', choices=ENGINE_NAMES, default='pycudd',
+    help='bdd engine of the bdd backend (default: pycudd)')
+argParser.add_argument('--split', type=int, default=0, metavar='K',
+    help='split the fixed point check of the bdd backend over the values '
+    'of K latches of the winning region, the 2^K parts are checked by '
+    'separate processes (default: 0, no split)')
+argParser.add_argument('--workers', type=int,
+    default=multiprocessing.cpu_count(),
+    help='number of parts checked at the same time with --split '
+    '(default: the number of cores)')
+argParser.add_argument('--stats', action='store_true',
+    help='print per phase statistics as key=value lines after the result')
+budgetGroup = argParser.add_argument_group('budgets',
+    'past a budget the bdd and explicit backends give up and print '
+    'Model_check_result=RESOURCE_OUT, the exit status is ' +
+    str(RESOURCE_OUT_STATUS))
+budgetGroup.add_argument('--time-budget', type=float, metavar='SECONDS',
+    help='cpu time of the process')
+budgetGroup.add_argument('--node-budget', type=int, metavar='NODES',
+    help='live nodes of the bdd manager')
+budgetGroup.add_argument('--memory-budget', type=int, metavar='MB',
+    help='peak resident memory of the process')
+cuddGroup = argParser.add_argument_group('CUDD settings',
+    'the flags override the settings of the preset')
+cuddGroup.add_argument('--preset', choices=sorted(CUDD_PRESETS),
+    default='default', help='CUDD settings preset (default: default)')
+cuddGroup.add_argument('--unique-slots', type=int,
+    help='initial number of slots of each unique subtable')
+cuddGroup.add_argument('--cache-size', type=int,
+    help='initial number of entries of the computed table')
+cuddGroup.add_argument('--max-memory', type=int, metavar='MB',
+    help='memory CUDD aims to stay within, in MB')
+cuddGroup.add_argument('--reorder', choices=sorted(REORDER_METHODS),
+    help='dynamic reordering method')
+cuddGroup.add_argument('--next-reordering', type=int, metavar='NODES',
+    help='number of live nodes triggering the first reordering')
+cuddGroup.add_argument('--no-gc', action='store_true',
+    help='disable garbage collection')
+args = argParser.parse_args()
+if args.model_check and args.backend == 'sat':
+    argParser.error('--model-check needs the bdd or the explicit backend')
+if args.backend == 'explicit' and ExplicitCompetitionChecker is None:
+    argParser.error('the explicit backend needs numpy')
+
+maxMemory = None
+if args.max_memory is not None:
+    maxMemory = args.max_memory * 1024 * 1024
+garbageCollection = None
+if args.no_gc:
+    garbageCollection = False
+cuddConfig = CUDD_PRESETS[args.preset].override(
+    uniqueSlots=args.unique_slots, cacheSize=args.cache_size,
+    maxMemory=maxMemory, reorderMethod=args.reorder,
+    nextReordering=args.next_reordering,
+    garbageCollection=garbageCollection)
+
+winingRegion = args.wregion
+fileName = args.strategy
+
+if not args.model_check and not os.path.isfile(winingRegion):
     print "False"
     sys.exit(winingRegion + ' cannot be found!')
 
@@ -27,26 +108,122 @@ if not os.path.isfile(fileName):
     print "False"
     sys.exit(fileName + ' cannot be found!')
 
-_bdd = PyCuddBDD()
+#a winning region given as a DDDMP dump is loaded by CUDD
+dddmpRegion = not args.model_check and isDddmpFile(winingRegion)
+if dddmpRegion and (args.backend not in ('auto', 'bdd') or
+    args.engine != 'pycudd'):
+    argParser.error('a DDDMP winning region needs the bdd backend with '
+        'the pycudd engine')
+
+backend = args.backend
+if dddmpRegion:
+    backend = 'bdd'
+elif backend == 'auto':
+    backend = 'bdd'
+    try:
+        header = readAigerHeader(fileName)
+        if ExplicitCompetitionChecker is not None and\
+            prefersExplicit(header[2], header[1], header[4]):
+            backend = 'explicit'
+    except Exception:
+        #the parser reports the error
+        pass
+if backend == 'bdd' and not isEngineAvailable(args.engine):
+    argParser.error('the bdd engine ' + args.engine + ' is not available')
+
+#the parts of a split check build their managers in their own processes
+splitting = backend == 'bdd' and args.split > 0 and not args.model_check
+
+_bdd = None
+if backend == 'bdd' and not splitting:
+    _bdd = createBddEngine(args.engine, cuddConfig)
+stats = PhaseStats(_bdd)
+memoryBudget = None
+if args.memory_budget is not None:
+    memoryBudget = args.memory_budget * 1024 * 1024
+
+
+def createGovernor(bdd):
+    return ResourceGovernor(bdd, args.time_budget, args.node_budget,
+        memoryBudget)
+
+
+governor = createGovernor(_bdd)
+
+
+def printStats():
+    if args.stats:
+        for line in stats.getLines():
+            print line
+
+
+#the check gave up, the result is neither True nor False
+def resourceOut(ex):
+    print 'Model_check_result=RESOURCE_OUT'
+    print ex
+    printStats()
+    sys.exit(RESOURCE_OUT_STATUS)
+
+
+#the part of the fixed point check of a cube, in a worker
+def checkPart(cofactor):
+    bdd = createBddEngine(args.engine, cuddConfig)
+    trnsSys = CompetitionTrnsSys(aig, bdd, args.image, args.ordering,
+        governor=createGovernor(bdd))
+    return trnsSys.ValidateWinningRegion(winRegAig, cofactor)
+
+
+def validateByCofactors():
+    positions = getSplitPositions(aig, winRegAig, args.ordering, args.split)
+    check = CofactorCheck(checkPart, positions, args.workers)
+    stats.start('fixpoint')
+    try:
+        return check.run()
+    finally:
+        stats.stop('fixpoint')
+        stats.setValue('fixpoint', 'parts', check.nbOfParts)
+
 
 TrnsSys = None
 
 try:
     resultParser = AigerFileParser(fileName)
+    stats.start('parse')
     aig = resultParser.parse()
-    TrnsSys = CompetitionTrnsSys(aig, _bdd)
+    stats.stop('parse')
+    if backend == 'sat':
+        TrnsSys = SatCompetitionChecker(aig, stats)
+    elif backend == 'explicit':
+        TrnsSys = ExplicitCompetitionChecker(aig, stats, governor)
+    elif not splitting:
+        TrnsSys = CompetitionTrnsSys(aig, _bdd, args.image, args.ordering,
+            stats, governor)
+except ResourceOut as ex:
+    resourceOut(ex)
 except Exception as ex:
     print 'False'
     sys.exit('An Error happenned, it could be that ' + fileName + ' is not in a correct fromat')
 
 
 
-#mcResult = sys.ModelCheck()
+if args.model_check:
+    try:
+        print TrnsSys.ModelCheck(args.direction)
+    except ResourceOut as ex:
+        resourceOut(ex)
+    printStats()
+    sys.exit()
 
 try:
-    winRegParser = AigerFileParser(winingRegion)
-    winRegAig = winRegParser.parse()
-    result =  TrnsSys.ValidateWinningRegion(winRegAig).split(":")
+    stats.start('parse')
+    winRegAig = parseWinningRegion(winingRegion)
+    stats.stop('parse')
+    if splitting:
+        result = validateByCofactors().split(":")
+    else:
+        result =  TrnsSys.ValidateWinningRegion(winRegAig).split(":")
+except ResourceOut as ex:
+    resourceOut(ex)
 except Exception as ex:
     print 'False'
     sys.exit('An Error happenned, it could be that ' + winingRegion + ' is not in a correct fromat')
@@ -58,3 +235,4 @@ print result[0]
 if len(result) > 1:
     print result[1]
 
+printStats()
@@ -1,14 +1,31 @@
 #!/usr/bin/env python
 from AigerParser import *
+from PartitionedTrnsRel import PartitionedTrnsRel
+from VarOrdering import VarOrdering, ORDERINGS
+from PhaseStats import PhaseStats
+from ConeAnalysis import ConeAnalysis
+from ResourceGovernor import ResourceGovernor, ResourceOut
+from DddmpParser import DddmpFile
 import time
-import copy
+
+#how pre-images are computed: composing the next state functions into the
+#primed set, or with the partitioned transition relation
+IMAGE_METHODS = ('monolithic', 'partitioned')
+#the direction of ModelCheck, auto runs both searches in turns and stops
+#with the first one to finish
+DIRECTIONS = ('auto', 'forward', 'backward')
 
 #note that in this transition system we do not create a new variable
 #as we are just intrested in strategies and winning region
 #and the strategy contains no controllable inputs
 class CompetitionTrnsSys(object):
 
-    def __init__(self, aiger, bdd):
+    def __init__(self, aiger, bdd, imageMethod='monolithic',
+        ordering='interleave', stats=None, governor=None):
+        if imageMethod not in IMAGE_METHODS:
+            raise ValueError('unknown image method ' + str(imageMethod))
+        if ordering not in ORDERINGS:
+            raise ValueError('unknown variable ordering ' + str(ordering))
         #the number of variables is the number of inputs and latches,
         # *2 in order to create primed variables
         # bdd *2 in order to access var by index
@@ -27,18 +44,21 @@ class CompetitionTrnsSys(object):
         self._nbOfLatches = aiger.getNbOfLatches()
         self._nbOfInputs = aiger.getNbOfInputs()
         self._nbOfAndGates = aiger.getNbOfAndGates()
-        self._latches = aiger.getLatches()
+        self._latches = list(aiger.getLatches())
+        #only the latches the output depends on, directly or through other
+        #latches, or that the winning region reads are live, the bdds are
+        #built for their cone of influence only
+        self._cones = ConeAnalysis(aiger)
+        self._livePositions = []
+        self._liveLatches = []
+        self._nbOfConeGates = 0
         # vars mean the value from the aiger file
         self._inputVars = aiger.getInputVars()
         self._outputVar = aiger.getOutputVars()[0]  # must contain just one
         self._andGates = aiger.getAndGates()
         self._aig = aiger  # not used except for isVarNegated
-        #indicies in the _vars array
-        self._cInputIndices = aiger.getcInputIndices()  # int
-        self._ucInputIndices = aiger.getucInputIndices()  # int
         self.refList = set()  # int use add not append
         self.derefList = []  # int
-        self.andSet = aiger.andSet  # Map<Integer, List<Integer>>
         self.bddManager = bdd
         # in case the output bdd contains input
         #never create a new variable, because here we just have uncontrollable
@@ -49,7 +69,36 @@ class CompetitionTrnsSys(object):
         if self.hasNewOutputVar:
             nxtTimFctLength += 2
         self.nxtTimFct = self.bddManager.createDdArray(nxtTimFctLength)
+        self.imageMethod = imageMethod
+        self.ordering = ordering
+        self._trnsRel = None  # built on first use
+        self._monolithicTrnsRel = None  # built on first use
+        self._cubes = dict()  # name -> bdd, see getCachedCube
+        #per phase statistics, the caller may pass the one it timed
+        #parsing with
+        if stats is None:
+            stats = PhaseStats(bdd)
+        self.stats = stats
+        #gives up the check once its budgets are used up, without budgets
+        #by default
+        if governor is None:
+            governor = ResourceGovernor(bdd)
+        self.governor = governor
+        self.stats.start('gates')
         self.getBDDFromAigerFile()
+        self.stats.stop('gates')
+        self.stats.setValue('gates', 'output_nodes',
+            self.bddManager.nodeCount(self._outBdd))
+        self.stats.setValue('gates', 'next_state_nodes',
+            self.bddManager.sharingSize(self.getNextStateFcts()))
+
+    #the next state function of each live latch
+    def getNextStateFcts(self):
+        nextFcts = []
+        for lch in self._liveLatches:
+            prime = self._primedVars[lch.getLeftVar()]
+            nextFcts.append(self.nxtTimFct[self.bddManager.getVarIndex(prime)])
+        return nextFcts
 
     def isVarNegated(self, var):
         return self._aig.isVarNegated(var)
@@ -69,119 +118,84 @@ class CompetitionTrnsSys(object):
         self._outBdd = newOutputVar
         return newOutputVar
 
+    #the cubes of the live latches and of the inputs are built once, until
+    #the live latches change
+    def getCachedCube(self, name, bddVars, phases=None):
+        cube = self._cubes.get(name)
+        if cube is None:
+            cube = self.bddManager.cube(bddVars, phases)
+            self._cubes[name] = cube
+        return cube
+
     def getInitialPoint(self):
-        initialPointCube = self.bddManager.getTrue()
-        for lch in self._latches:
-            initialPointCube = self.bddManager.andTo(initialPointCube,
-                 self.bddManager.not_no_deref(self._vars[lch.getLeftVar()]))
-        return initialPointCube
+        return self.getCachedCube('initial', [self._vars[lch.getLeftVar()]
+            for lch in self._liveLatches], [0] * len(self._liveLatches))
 
     def getLatchesCube(self):
-        cube = self.bddManager.getTrue()
-        for lch in self._latches:
-            cube = self.bddManager.andTo(cube, self._vars[lch.getLeftVar()])
-        return cube
+        return self.getCachedCube('latches', [self._vars[lch.getLeftVar()]
+            for lch in self._liveLatches])
 
     def getPrimesCube(self):
-        cube = self.bddManager.getTrue()
-        for lch in self._latches:
-            cube = self.bddManager.andTo(
-                cube, self._primedVars[lch.getLeftVar()])
-        return cube
+        return self.getCachedCube('primes',
+            [self._primedVars[lch.getLeftVar()]
+            for lch in self._liveLatches])
 
     def getInputCube(self):
-        cube = self.bddManager.getTrue()
-        for inp in self._inputVars:
-            cube = self.bddManager.andTo(cube, self._vars[inp])
-        return cube
+        return self.getCachedCube('inputs',
+            [self._vars[inp] for inp in self._inputVars])
 
     def getInputNeg(self):
-        cube = self.bddManager.getTrue()
-        for inp in self._inputVars:
-            cube = self.bddManager.andTo(cube,
-            self.bddManager.not_(self._vars[inp]))
-        return cube
+        return self.bddManager.cube([self._vars[inp]
+            for inp in self._inputVars], [0] * len(self._inputVars))
 
     #here index means the var
+    #indicies in the _vars array, read from the symbol table on request
     def getcInputIndices(self):
-        return self._cInputIndices
+        return self._aig.getcInputIndices()
 
     def getucInputIndices(self):
-        return self._ucInputIndices
+        return self._aig.getucInputIndices()
 
     def getUnContrInputCube(self):
-        cube = self.bddManager.getTrue()
-        for uinp in self._ucInputIndices:
-            cube = self.bddManager.andTo(cube, self._vars[uinp])
-        return cube
+        return self.bddManager.cube([self._vars[uinp]
+            for uinp in self.getucInputIndices()])
 
     def getUnContrInputCubeNeg(self):
-        cube = self.bddManager.getTrue()
-        for uinp in self._ucInputIndices:
-            cube = self.bddManager.andTo(cube, self.bddManager.not_(self._vars[uinp]))
-        return cube
+        indices = self.getucInputIndices()
+        return self.bddManager.cube([self._vars[uinp] for uinp in indices],
+            [0] * len(indices))
+
+    #the phases of a cube from a bit vector, 0 for the bits that are '0'
+    def getBitVectorPhases(self, bitVec, length):
+        return [0 if bitVec[k] == '0' else 1 for k in range(length)]
 
     def getUnContrInputCubeTest(self, bitVec):
-        cube = self.bddManager.getTrue()
-        counter = 0
-        print self._ucInputIndices
-        for uinp in self._ucInputIndices:
-            if(bitVec[counter] == '0'):
-                cube = self.bddManager.andTo(cube,
-                    self.bddManager.not_no_deref(self._vars[uinp]))
-            else:
-                cube = self.bddManager.andTo(cube, self._vars[uinp])
-            counter = counter + 1
-        return cube
+        indices = self.getucInputIndices()
+        return self.bddManager.cube([self._vars[uinp] for uinp in indices],
+            self.getBitVectorPhases(bitVec, len(indices)))
 
     def getPntCubeTest(self, bitVec):
-        cube = self.bddManager.getTrue()
-        counter = 0
-        for lch in self._latches:
-            if(bitVec[counter] == '0'):
-                cube = self.bddManager.andTo(cube,
-                     self.bddManager.not_no_deref(self._vars[lch.getLeftVar()]))
-            else:
-                cube = self.bddManager.andTo(cube, self._vars[lch.getLeftVar()])
-            counter = counter + 1
-        return cube
+        return self.bddManager.cube([self._vars[lch.getLeftVar()]
+            for lch in self._latches],
+            self.getBitVectorPhases(bitVec, len(self._latches)))
 
     def getPrimeCubeTest(self, bitVec):
-        cube = self.bddManager.getTrue()
-        counter = 0
-        for lch in self._latches:
-            if(bitVec[counter] == '0'):
-                cube = self.bddManager.andTo(cube,
-                     self.bddManager.not_no_deref(self._primedVars[lch.getLeftVar()]))
-            else:
-                cube = self.bddManager.andTo(cube, self._primedVars[lch.getLeftVar()])
-            counter = counter + 1
-        return cube
+        return self.bddManager.cube([self._primedVars[lch.getLeftVar()]
+            for lch in self._latches],
+            self.getBitVectorPhases(bitVec, len(self._latches)))
 
     def getPrimeNeg(self):
-        cube = self.bddManager.getTrue()
-        for lch in self._latches:
-            cube = self.bddManager.andTo(cube,
-                 self.bddManager.not_no_deref(self._primedVars[lch.getLeftVar()]))
-        return cube
+        return self.bddManager.cube([self._primedVars[lch.getLeftVar()]
+            for lch in self._latches], [0] * len(self._latches))
 
     def getTransCubeTest(self, bitVec):
-        cube = self.bddManager.getTrue()
-        counter = 0
-        for vr in self.bddManager.vars:
-            if(bitVec[counter] == '0'):
-                cube = self.bddManager.andTo(cube,
-                     self.bddManager.not_no_deref(vr))
-            else:
-                cube = self.bddManager.andTo(cube, vr)
-            counter = counter + 1
-        return cube
+        bddVars = self.bddManager.getVars()
+        return self.bddManager.cube(bddVars,
+            self.getBitVectorPhases(bitVec, len(bddVars)))
 
     def getContrInputCube(self):
-        cube = self.bddManager.getTrue()
-        for cinp in self._cInputIndices:
-            cube = self.bddManager.andTo(cube, self._vars[cinp])
-        return cube
+        return self.bddManager.cube([self._vars[cinp]
+            for cinp in self.getcInputIndices()])
 
     def getOutputBddPrimed(self):
         outPrimed = self.bddManager.replace_no_deref(
@@ -221,9 +235,101 @@ class CompetitionTrnsSys(object):
     def getLatches(self):
         return self._latches
 
+    #the positions of the latches among the given variable indices
+    def getLatchPositions(self, varIndices):
+        positions = dict()
+        for k, lch in enumerate(self._latches):
+            positions[self.bddManager.getVarIndex(
+                self._vars[lch.getLeftVar()])] = k
+        return [positions[i] for i in varIndices if i in positions]
+
+    #the bdd of a literal, bdds is indexed by the non negated literal
+    def getLiteralBdd(self, bdds, lit):
+        if lit < 2:
+            return self.bddManager.getTrue() if lit == 1\
+            else self.bddManager.getNotTrue()
+        bdd = bdds[lit - 1] if self.isVarNegated(lit) else bdds[lit]
+        if bdd is None:
+            raise ValueError('literal ' + str(lit) + ' is not defined')
+        return self.bddManager.not_no_deref(bdd)\
+        if self.isVarNegated(lit) else bdd
+
+    #build the bdd of every and gate of aig exactly once, following the
+    #topological order of the gates, the bdds of the inputs and latches
+    #must already be in bdds
+    #with roots only the gates in their cone of influence are built, gates
+    #that already have a bdd are not built again
+    #the bdd of a gate is released as soon as its last user is built, only
+    #the gates driving the roots (by default the latches), outputs or the
+    #pinned literals are kept
+    #returns the number of gates built
+    def buildAndGates(self, aig, bdds, pinned=(), roots=None):
+        andLhs = aig.andLhs
+        andRhs0 = aig.andRhs0
+        andRhs1 = aig.andRhs1
+        varKinds = aig.varKinds
+        varPositions = aig.varPositions
+        if roots is None:
+            order = aig.getTopologicalOrder()
+            fanouts = aig.getFanoutCounts()
+            roots = aig.latchNexts
+        else:
+            cones = self._cones if aig is self._aig else ConeAnalysis(aig)
+            order = cones.getConeGates(roots,
+                lambda index: bdds[andLhs[index]] is not None)
+            inCone = bytearray(len(andLhs))
+            for index in order:
+                inCone[index] = 1
+            #only the users inside the cone count
+            fanouts = array('i', [0]) * len(andLhs)
+            for index in order:
+                for rhs in (andRhs0[index], andRhs1[index]):
+                    child = aig.getAndGateIndex(rhs)
+                    if child >= 0 and inCone[child]:
+                        fanouts[child] += 1
+        kept = set()
+        for lits in (roots, aig.outputLits, pinned):
+            for lit in lits:
+                kept.add(aig.getAndGateIndex(lit))
+        for index in order:
+            self.governor.check()
+            bdds[andLhs[index]] = self.bddManager.and_no_deref(
+                self.getLiteralBdd(bdds, andRhs0[index]),
+                self.getLiteralBdd(bdds, andRhs1[index]))
+            for rhs in (andRhs0[index], andRhs1[index]):
+                if varKinds[rhs >> 1] != VAR_AND:
+                    continue
+                child = varPositions[rhs >> 1]
+                fanouts[child] -= 1
+                if fanouts[child] == 0 and child not in kept:
+                    #dropping the last reference derefs the bdd
+                    bdds[andLhs[child]] = None
+        return len(order)
+
+    #apply the static order of the variables, with interleaved orders
+    #each latch and its primed variable stay together when reordering
+    def applyVarOrder(self):
+        if self.ordering == 'creation':
+            return
+        varOrdering = VarOrdering(self._aig, self.ordering)
+        interleaved = varOrdering.isInterleaved()
+        getVarIndex = self.bddManager.getVarIndex
+        order = []
+        for lit in varOrdering.getOrder():
+            order.append(getVarIndex(self._vars[lit]))
+            if interleaved and self._primedVars[lit] is not None:
+                order.append(getVarIndex(self._primedVars[lit]))
+        if not interleaved:
+            for lch in self._latches:
+                order.append(getVarIndex(self._primedVars[lch.getLeftVar()]))
+        self.bddManager.setVarOrder(order)
+        if interleaved:
+            for lch in self._latches:
+                self.bddManager.groupVars(
+                    getVarIndex(self._vars[lch.getLeftVar()]), 2)
+
     def getBDDFromAigerFile(self):
         varCounter = 0
-        bddsTobeChecked = []  # int
         intNotTobeDerefd = []  # bdd
         #creating input variables
         for i in self._inputVars:
@@ -240,52 +346,17 @@ class CompetitionTrnsSys(object):
             intNotTobeDerefd.append(newLatch)
             self.nxtTimFct[varCounter] = newLatch
             varCounter += 1
-        #compute AND gates BDDs
-        andGatesQueue = copy.deepcopy( self._andGates)
-        while len(andGatesQueue) > 0:
-            tempAg = andGatesQueue.pop(0)
-            if tempAg is not None and\
-            self._vars[tempAg.getAgVariable()] is None:
-                ll = tempAg.getLeft()  # Literal
-                rl = tempAg.getRight()  # Literal
-                andBdd = None  # bdd
-                if self._vars[ll.getVariable()] is not None and\
-                 self._vars[rl.getVariable()] is not None:
-                    left = self.bddManager.not_no_deref(  # bdd
-                        self._vars[ll.getVariable()])\
-                        if ll.isNegated() else self._vars[ll.getVariable()]
-                    right = self.bddManager.not_no_deref(  # bdd
-                        self._vars[rl.getVariable()])\
-                        if rl.isNegated() else self._vars[rl.getVariable()]
-                    andBdd = self.bddManager.and_no_deref(left, right)
-                    ###if ll.isNegated():
-                    ###    self.bddManager.deref(left)
-                    ###if rl.isNegated():
-                    ###    self.bddManager.deref(right)
-                elif self._vars[ll.getVariable()] is not None and\
-                rl.getLiteralValue() == 1:
-                    andBdd = self.bddManager.not_no_deref(
-                        self._vars[ll.getVariable()])\
-                        if ll.isNegated() else self._vars[ll.getVariable()]
-                elif rl.getLiteralValue() == 0:
-                    andBdd = self.bddManager.getNotTrue()
-                elif ll.getLiteralValue() == 1 and\
-                self._vars[rl.getVariable()] is not None:
-                    andBdd = self.bddManager.not_no_deref(
-                        self._vars[rl.getVariable()])\
-                        if rl.isNegated() else self._vars[rl.getVariable()]
-                elif ll.getLiteralValue() == 0:
-                    andBdd = self.bddManager.getNotTrue()
-                elif ll.getLiteralValue() == 1 and rl.getLiteralValue() == 1:
-                    andBdd = self.bddManager.getTrue()
-                if andBdd is not None:
-                    self._vars[tempAg.getAgVariable()] = andBdd
-                    # bdd.printDot("Test\\"+tempAg.getAgVariable(), and);
-                    bddsTobeChecked.append(tempAg.getAgVariable())
-                else:
-                    andGatesQueue.append(tempAg)
-
-            ###bddsTobeChecked = self.garbageCollect(j, bddsTobeChecked)
+        #the primed variables are created up front as well so that the
+        #whole order is set before any and gate bdd is built
+        for lch in self._latches:
+            primeVar = self.bddManager.createVar()
+            intNotTobeDerefd.append(primeVar)
+            self._primedVars[lch.getLeftVar()] = primeVar
+            #until the latch is live its primed variable stays as it is
+            self.nxtTimFct[self.bddManager.getVarIndex(primeVar)] = primeVar
+        self.applyVarOrder()
+        #compute AND gates BDDs, for the output and the live latches
+        self.addLiveLatches(self._cones.getLiveLatches(), [self._outputVar])
         #if output contains input variable create new variable
         if(self.hasNewOutputVar):
             newOutputVar = self.addNewVariableForOutput()
@@ -293,51 +364,12 @@ class CompetitionTrnsSys(object):
             self.nxtTimFct[varCounter] = newOutputVar
             varCounter += 1
             print('new var was created')
-        #initialise variables for Perm
-        latchesVarsforPerm = [None] * self._nbOfLatches
-        primedVarsforPerm = [None] * self._nbOfLatches
-        permCounter = 0
         #initialise transition function
         self._trnsFct = self.bddManager.getTrue()
-        #for each latch create a variable which is the prime variable
-        #the left coud not be negated but right could be, and it could be 0 or 1
-        #tStart = int(round(time.time()))
-        #leftVar = None
-        #print("start extracting latches " + str(len(self._latches)))
-        #counter = 0
-        for lch in self._latches:
-            #start = int(round(time.time() * 1000))
-            #create primedd var
-            primeVar = self.bddManager.createVar()  # bdd
-            intNotTobeDerefd.append(primeVar)
-            #manage prime vars and Perm
-            self._primedVars[lch.getLeftVar()] = primeVar
-            latchesVarsforPerm[permCounter] = self._vars[lch.getLeftVar()]
-            primedVarsforPerm[permCounter] = primeVar
-            permCounter = permCounter + 1
-            #end of "manage prime vars and Perm"
-            #take into consideration if the righ var was 0 or 1
-            if self._vars[lch.getRightVar()] is None:
-                self._vars[lch.getRightVar()] = self.bddManager.getTrue()\
-                if (lch.getRightVar() == 1) else self.bddManager.getNotTrue()
-
-            self.nxtTimFct[varCounter] = self.bddManager.not_(
-                self._vars[lch.getRightVar() - 1])\
-            if self.isVarNegated(lch.getRightVar())\
-            else self._vars[lch.getRightVar()]
-            varCounter += 1
-        self._toPrimesPerm = self.bddManager.createPermutation(
-            latchesVarsforPerm, primedVarsforPerm)
-        #replace primes py normal ones
-        self._rmvPrimesPerm = self.bddManager.createPermutation(
-            primedVarsforPerm, latchesVarsforPerm)
-        #end of "manage prime vars and Perm"/
         #there must be one output in the aiger files we target
         if(not self.hasNewOutputVar):
             #print('no new var created')
-            outputIndex = self._outputVar
-            outputBDD = self.bddManager.not_(self._vars[outputIndex - 1])\
-            if (outputIndex % 2 == 1) else self._vars[outputIndex]
+            outputBDD = self.getLiteralBdd(self._vars, self._outputVar)
             #the same as before just because we have no controllable inputs
             #so we quantify inputs
             self._outBdd = self.bddManager.exists_no_deref(outputBDD,
@@ -345,6 +377,41 @@ class CompetitionTrnsSys(object):
         #print self.bddManager.satAssignCount(self._trnsFct)
 
 
+    #make the latches at the given positions live, together with the
+    #latches they depend on: build the bdds of their next state functions,
+    #and of the other roots
+    def addLiveLatches(self, positions, roots=()):
+        livePositions = set(self._livePositions)
+        live = self._cones.getLiveLatches(livePositions.union(positions))
+        added = [self._latches[k] for k in live if k not in livePositions]
+        if not added and not roots and self._toPrimesPerm is not None:
+            return
+        self._livePositions = live
+        self._liveLatches = [self._latches[k] for k in live]
+        self._nbOfConeGates += self.buildAndGates(self._aig, self._vars,
+            roots=list(roots) + [lch.getRightVar() for lch in added])
+        self.stats.setValue('gates', 'cone_gates', self._nbOfConeGates)
+        for lch in added:
+            #the right var could be 0 or 1
+            prime = self._primedVars[lch.getLeftVar()]
+            self.nxtTimFct[self.bddManager.getVarIndex(prime)] =\
+                self.getLiteralBdd(self._vars, lch.getRightVar())
+        self.stats.setValue('gates', 'live_latches', len(live))
+        #manage prime vars and Perm
+        latchesVarsforPerm = [self._vars[lch.getLeftVar()]
+            for lch in self._liveLatches]
+        primedVarsforPerm = [self._primedVars[lch.getLeftVar()]
+            for lch in self._liveLatches]
+        self._toPrimesPerm = self.bddManager.createPermutation(
+            latchesVarsforPerm, primedVarsforPerm)
+        #replace primes py normal ones
+        self._rmvPrimesPerm = self.bddManager.createPermutation(
+            primedVarsforPerm, latchesVarsforPerm)
+        #the transition relations and the cubes are built again on request
+        self._trnsRel = None
+        self._monolithicTrnsRel = None
+        self._cubes = dict()
+
     def getInitBitVector(self):
         pntLength = len(self.pntIndices)
         bitVector = '0' * pntLength
@@ -369,34 +436,70 @@ class CompetitionTrnsSys(object):
         return bitVector
 
     #for testing purposes
-    def getAllBitVectors(self, bdd):
-        lst = self.getPointsListForDraw(bdd)
-        newList = []
-        for bddPoint in lst:
-            pntV = self.getFullBitVector(bddPoint)
-            newList.append(pntV)
-        return newList
-
-    def getPointsListForDraw(self, bdd):  # bdd, List<int>
-        temp = None  # bdd
+    def getAllBitVectors(self, bdd, limit=None):
+        return list(self.bddManager.iterMinterms(bdd, limit=limit))
+
+    #the states of a bdd over the latches, as bit vectors over the latches
+    #in the order of pntIndices, at most limit of them
+    def iterPntBitVectors(self, bdd, limit=None):
+        return self.bddManager.iterMinterms(bdd, self.pntIndices, limit)
+
+    #the minterms of the bdd as bdds, the bit vectors are all read before
+    #the first bdd is built
+    def getPointsListForDraw(self, bdd, limit=None):  # bdd, List<int>
+        bddVars = self.bddManager.getVars()
         pointsList = []  # List<bdd>
-        #returns the number of points
-        #if nbOfPoints == 0.0:
-        #    return pointsList
-        counter = 0
-        satAssignment = None
-        while ((bdd != self.bddManager.getFalse()) and
-        (bdd != self.bddManager.getNotOne())):
-            satAssignment = self.bddManager.getMintermBDD(bdd)
-            #print self.getPntBitVector(satAssignment)
-            pointsList.append(satAssignment)
-            temp = self.bddManager.not_no_deref(satAssignment)
-            bdd = self.bddManager.and_no_deref(bdd, temp)
-            self.bddManager.deref(temp)
-            #print counter
-            counter = counter + 1
+        for bitVec in self.getAllBitVectors(bdd, limit):
+            pointsList.append(self.bddManager.cube(bddVars,
+                self.getBitVectorPhases(bitVec, len(bddVars))))
         return pointsList
 
+    def getPartitionedTrnsRel(self):
+        if self._trnsRel is None:
+            latchVars = [self._vars[lch.getLeftVar()]
+                for lch in self._liveLatches]
+            primedVars = [self._primedVars[lch.getLeftVar()]
+                for lch in self._liveLatches]
+            nextFcts = [self.nxtTimFct[self.bddManager.getVarIndex(prime)]
+                for prime in primedVars]
+            inputVars = [self._vars[inp] for inp in self._inputVars]
+            self._trnsRel = PartitionedTrnsRel(self.bddManager, latchVars,
+                primedVars, nextFcts, inputVars, governor=self.governor)
+        return self._trnsRel
+
+    #the conjunction of all latch relations x'_k <-> f_k(x, i)
+    def getMonolithicTrnsRel(self):
+        if self._monolithicTrnsRel is None:
+            relations = []
+            for lch in self._liveLatches:
+                prime = self._primedVars[lch.getLeftVar()]
+                nextFct = self.nxtTimFct[self.bddManager.getVarIndex(prime)]
+                relations.append(
+                    self.bddManager.biimp_no_deref(prime, nextFct))
+                self.governor.check()
+            self._monolithicTrnsRel = self.bddManager.andAll(relations)
+        return self._monolithicTrnsRel
+
+    #the states reachable in one step from the given states
+    def image(self, states):
+        self.governor.check()
+        if self.imageMethod == 'partitioned':
+            nextStates = self.getPartitionedTrnsRel().image(states)
+        else:
+            cube = self.bddManager.and_(self.getLatchesCube(),
+                self.getInputCube())
+            nextStates = self.bddManager.relProduct_no_deref(states,
+                self.getMonolithicTrnsRel(), cube)
+        return self.bddManager.replace(nextStates, self._rmvPrimesPerm)
+
+    #the states from which some input leads into the given states
+    def preImage(self, states):
+        self.governor.check()
+        statesPrimed = self.getPrimedVersion(states)
+        if self.imageMethod == 'partitioned':
+            return self.getPartitionedTrnsRel().preImage(statesPrimed)
+        temp = self.bddManager.vectorCompose(statesPrimed, self.nxtTimFct)
+        return self.bddManager.exists(temp, self.getInputCube())
 
     def getPrimedVersion(self, bdd):
         bddPrimed = self.bddManager.replace(
@@ -404,52 +507,137 @@ class CompetitionTrnsSys(object):
         return bddPrimed
 
     #in each iteration just consider unvisited states
-    #basically what this model checker is doing is it returns
-    #self.levels which contains error paths fro initial state until the
-    #shallower reachable errors
-    def ModelCheck(self):
+    #returns whether no unsafe state is reachable from the initial state
+    def ModelCheck(self, direction='backward'):
+        if direction not in DIRECTIONS:
+            raise ValueError('unknown direction ' + str(direction))
+        self.stats.start('modelcheck')
         try:
-            #print self._vars
-            initCube = self.getInitialPoint()
-            inputCube = self.getInputCube()
-            #we start from the set of unsafe states
-            visitedStates = self._outBdd
-            tobeCheckedStates = self._outBdd
-            initCheck = None  # to check if initial point is in a level
+            if direction == 'auto':
+                searches = [self.forwardSearch(), self.backwardSearch()]
+            elif direction == 'forward':
+                searches = [self.forwardSearch()]
+            else:
+                searches = [self.backwardSearch()]
             while True:
-                # compute newTmp
-                currentLevelPrimed = self.getPrimedVersion(
-                    tobeCheckedStates)
-                # I called it previous level as we are going backword
-                #print 'hi'
-                temp = currentLevelPrimed.VectorCompose(self.nxtTimFct)
-                #print 'temp'
-                previousLevel = self.bddManager.exists(
-                    temp,
-                    inputCube)
-                # check if initial point is in the computed level
-                initCheck = self.bddManager.and_no_deref(previousLevel, initCube)
-                if not initCheck == self.bddManager.getNotTrue():
-                    self.bddManager.deref(initCheck)
-                    return False
-                self.bddManager.deref(initCheck)
-                previousLevel = self.bddManager.and_no_deref(previousLevel,
-                     self.bddManager.not_no_deref(visitedStates))
-                # check if fixed point
-                if(previousLevel == self.bddManager.getNotTrue()):
-                    return True
-                visitedStates = self.bddManager.or_no_deref(visitedStates,
-                    previousLevel)
-                tobeCheckedStates = previousLevel
-                # end of check if fixed point
-
+                for search in searches:
+                    result = next(search)
+                    if result is not None:
+                        return result
+                    self.governor.check()
+        except ResourceOut:
+            raise
         except Exception as ex:
             print(ex)
             return False
+        finally:
+            self.stats.stop('modelcheck')
 
-
-    def ValidateWinningRegion(self, winRegAigFile):
-        winRegion = self.ReadWinningRegionDynamic(winRegAigFile)
+    #the searches yield None after each iteration and the verdict of
+    #ModelCheck once they are done
+    #backward search from the set of unsafe states
+    def backwardSearch(self):
+        initCube = self.getInitialPoint()
+        #the initial state may be unsafe itself
+        initCheck = self.bddManager.and_no_deref(self._outBdd, initCube)
+        if not initCheck == self.bddManager.getNotTrue():
+            yield False
+            return
+        visitedStates = self._outBdd
+        tobeCheckedStates = self._outBdd
+        while True:
+            # I called it previous level as we are going backword
+            previousLevel = self.preImage(tobeCheckedStates)
+            # check if initial point is in the computed level
+            initCheck = self.bddManager.and_no_deref(previousLevel, initCube)
+            if not initCheck == self.bddManager.getNotTrue():
+                yield False
+                return
+            previousLevel = self.bddManager.and_no_deref(previousLevel,
+                 self.bddManager.not_no_deref(visitedStates))
+            # check if fixed point
+            if(previousLevel == self.bddManager.getNotTrue()):
+                yield True
+                return
+            visitedStates = self.bddManager.or_no_deref(visitedStates,
+                previousLevel)
+            tobeCheckedStates = previousLevel
+            yield None
+
+    #forward search from the initial state
+    def forwardSearch(self):
+        reachedStates = self.getInitialPoint()
+        frontier = reachedStates
+        while True:
+            errorCheck = self.bddManager.and_no_deref(frontier, self._outBdd)
+            if not errorCheck == self.bddManager.getNotTrue():
+                yield False
+                return
+            nextStates = self.image(frontier)
+            newReachedStates = self.bddManager.or_no_deref(reachedStates,
+                nextStates)
+            if newReachedStates == reachedStates:
+                yield True
+                return
+            frontier = self.minimiseFrontier(newReachedStates, reachedStates)
+            reachedStates = newReachedStates
+            yield None
+
+    #any set containing the new states and contained in the reached states
+    #is a valid frontier, Restrict gives one that agrees with the reached
+    #states outside the previously reached ones and is often smaller
+    #than the new states themselves
+    def minimiseFrontier(self, reachedStates, previouslyReached):
+        notPreviously = self.bddManager.not_no_deref(previouslyReached)
+        newStates = self.bddManager.and_no_deref(reachedStates, notPreviously)
+        restricted = self.bddManager.restrict(reachedStates, notPreviously)
+        if self.bddManager.nodeCount(restricted) <\
+        self.bddManager.nodeCount(newStates):
+            return restricted
+        return newStates
+
+
+    #with a cofactor, a dict from latch positions to values, the fixed
+    #point is only checked for the states of W in its cube, see
+    #CofactorCheck.py
+    def ValidateWinningRegion(self, winRegAigFile, cofactor=None):
+        self.stats.start('wregion')
+        if isinstance(winRegAigFile, DddmpFile):
+            winRegion = self.ReadWinningRegionDddmp(winRegAigFile)
+        else:
+            winRegion = self.ReadWinningRegionDynamic(winRegAigFile)
+        #the fixed point check needs the next state functions of the
+        #latches the winning region reads
+        self.addLiveLatches(self.getLatchPositions(
+            self.bddManager.support(winRegion)))
+        self.stats.stop('wregion')
+        self.stats.setValue('wregion', 'nodes',
+            self.bddManager.nodeCount(winRegion))
+        self.stats.start('fixpoint')
+        try:
+            return self.checkWinningRegion(winRegion, cofactor)
+        finally:
+            self.stats.stop('fixpoint')
+
+    #the cube of the latch values of a cofactor
+    def getCofactorCube(self, cofactor):
+        positions = sorted(cofactor)
+        return self.bddManager.cube(
+            [self._vars[self._latches[k].getLeftVar()] for k in positions],
+            [cofactor[k] for k in positions])
+
+    #the next state functions cofactored by a cube of latch values, the
+    #pre-images are then only exact inside the cube
+    def cofactorNextStateFcts(self, cube):
+        for lch in self._liveLatches:
+            index = self.bddManager.getVarIndex(
+                self._primedVars[lch.getLeftVar()])
+            self.nxtTimFct[index] = self.bddManager.restrict(
+                self.nxtTimFct[index], cube)
+        self._trnsRel = None
+        self._monolithicTrnsRel = None
+
+    def checkWinningRegion(self, winRegion, cofactor=None):
         #check if init is in winRegion
         initCube = self.getInitialPoint()
         initCheck = self.bddManager.and_no_deref(winRegion, initCube)
@@ -464,11 +652,18 @@ class CompetitionTrnsSys(object):
         #get an image to check if it is a fixed point
         #preimage(!W) & W = 0
         loosingRegion = self.bddManager.not_no_deref(winRegion)
-        preimage = loosingRegion.VectorCompose(self.nxtTimFct)
+        if cofactor is not None:
+            cube = self.getCofactorCube(cofactor)
+            self.cofactorNextStateFcts(cube)
+            winRegion = self.bddManager.and_no_deref(winRegion, cube)
+        preimage = self.preImage(loosingRegion)
+        self.governor.check()
+        self.stats.setValue('fixpoint', 'preimage_nodes',
+            self.bddManager.nodeCount(preimage))
         fixedPntCheck = self.bddManager.and_no_deref(preimage, winRegion)
         if(fixedPntCheck == self.bddManager.getNotTrue()):
             return 'True'
-        print 'False:The winning region is not a fixed point!!'
+        return 'False:The winning region is not a fixed point!!'
         #end of get an image to check if it is a fixed point
 
     #this is not used anymore to give users freedom when choosing
@@ -476,55 +671,12 @@ class CompetitionTrnsSys(object):
     #used in the strategy
     def ReadWinningRegion(self,winRegAigFile):
         #compute the andgates
-        wrInputs = winRegAigFile.getInputVars()
-        forRange = list(range(winRegAigFile.getNbOfAndGates()))
-        wrAndGates = winRegAigFile.getAndGates()
-        wrVars = dict()
-        for andGate in wrAndGates:
-            wrVars[andGate.getAgVariable()] = None
-        for inpt in wrInputs:
+        wrVars = [None] * ((winRegAigFile.getMaxVarIndex() + 1) * 2)
+        for inpt in winRegAigFile.getInputVars():
             wrVars[inpt] = self._vars[inpt]
-        for j in forRange:
-            tempAg = wrAndGates[j]
-            if tempAg is not None and\
-            wrVars[tempAg.getAgVariable()] is None:
-                ll = tempAg.getLeft()  # Literal
-                rl = tempAg.getRight()  # Literal
-                #print wrVars
-                andBdd = None  # bdd
-                #print ll.getVariable()
-                if wrVars[ll.getVariable()] is not None and\
-                 wrVars[rl.getVariable()] is not None:
-                    left = self.bddManager.not_no_deref(  # bdd
-                        wrVars[ll.getVariable()])\
-                        if ll.isNegated() else wrVars[ll.getVariable()]
-                    right = self.bddManager.not_no_deref(  # bdd
-                        wrVars[rl.getVariable()])\
-                        if rl.isNegated() else wrVars[rl.getVariable()]
-                    andBdd = self.bddManager.and_no_deref(left, right)
-                elif wrVars[ll.getVariable()] is not None and\
-                rl.getLiteralValue() == 1:
-                    andBdd = self.bddManager.not_no_deref(
-                        wrVars[ll.getVariable()])\
-                        if ll.isNegated() else wrVars[ll.getVariable()]
-                elif wrVars[ll.getVariable()] is not None and\
-                rl.getLiteralValue() == 0:
-                    andBdd = self.bddManager.getNotTrue()
-                elif ll.getLiteralValue() == 1 and\
-                wrVars[rl.getVariable()] is not None:
-                    andBdd = self.bddManager.not_no_deref(
-                        wrVars[rl.getVariable()])\
-                        if rl.isNegated() else wrVars[rl.getVariable()]
-                elif ll.getLiteralValue() == 0 and\
-                wrVars[rl.getVariable()] is not None:
-                    andBdd = self.bddManager.getNotTrue()
-                if andBdd is not None:
-                    wrVars[tempAg.getAgVariable()] = andBdd
         outputVar = winRegAigFile.getOutputVars()[0]
-        isNegated = outputVar % 2
-        wrBDD = self.bddManager.not_no_deref(wrVars[outputVar - 1])\
-        if isNegated == 1 else wrVars[outputVar]
-        return wrBDD
+        self.buildAndGates(winRegAigFile, wrVars, roots=[outputVar])
+        return self.getLiteralBdd(wrVars, outputVar)
 
 
     def ReadWinningRegionDynamic(self,winRegAigFile):
@@ -538,56 +690,22 @@ class CompetitionTrnsSys(object):
             corr[inpt] = lchIndcs[indx].getLeftVar()
             indx += 1
         #end of input(winning region) Latches(strategy)Correspondance
-        forRange = list(range(winRegAigFile.getNbOfAndGates()))
-        wrAndGates = winRegAigFile.getAndGates()
-        wrVars = dict()
-        for andGate in wrAndGates:
-            wrVars[andGate.getAgVariable()] = None
+        wrVars = [None] * ((winRegAigFile.getMaxVarIndex() + 1) * 2)
         for inpt in wrInputs:
             wrVars[inpt] = self._vars[corr[inpt]]
-        for j in forRange:
-            tempAg = wrAndGates[j]
-            if tempAg is not None and\
-            wrVars[tempAg.getAgVariable()] is None:
-                ll = tempAg.getLeft()  # Literal
-                rl = tempAg.getRight()  # Literal
-                #print wrVars
-                andBdd = None  # bdd
-                #print ll.getVariable()
-                if wrVars[ll.getVariable()] is not None and\
-                 wrVars[rl.getVariable()] is not None:
-                    left = self.bddManager.not_no_deref(  # bdd
-                        wrVars[ll.getVariable()])\
-                        if ll.isNegated() else wrVars[ll.getVariable()]
-                    right = self.bddManager.not_no_deref(  # bdd
-                        wrVars[rl.getVariable()])\
-                        if rl.isNegated() else wrVars[rl.getVariable()]
-                    andBdd = self.bddManager.and_no_deref(left, right)
-                elif wrVars[ll.getVariable()] is not None and\
-                rl.getLiteralValue() == 1:
-                    andBdd = self.bddManager.not_no_deref(
-                        wrVars[ll.getVariable()])\
-                        if ll.isNegated() else wrVars[ll.getVariable()]
-                elif wrVars[ll.getVariable()] is not None and\
-                rl.getLiteralValue() == 0:
-                    andBdd = self.bddManager.getNotTrue()
-                elif ll.getLiteralValue() == 1 and\
-                wrVars[rl.getVariable()] is not None:
-                    andBdd = self.bddManager.not_no_deref(
-                        wrVars[rl.getVariable()])\
-                        if rl.isNegated() else wrVars[rl.getVariable()]
-                elif ll.getLiteralValue() == 0 and\
-                wrVars[rl.getVariable()] is not None:
-                    andBdd = self.bddManager.getNotTrue()
-                if andBdd is not None:
-                    wrVars[tempAg.getAgVariable()] = andBdd
         outputVar = winRegAigFile.getOutputVars()[0]
-        if(outputVar == 1):
-            return self.bddManager.getTrue()
-        isNegated = outputVar % 2
-        wrBDD = self.bddManager.not_no_deref(wrVars[outputVar - 1])\
-        if isNegated == 1 else wrVars[outputVar]
-        return wrBDD
+        self.buildAndGates(winRegAigFile, wrVars, roots=[outputVar])
+        return self.getLiteralBdd(wrVars, outputVar)
+
+    #a winning region given as a DDDMP dump, its variables are composed
+    #with the variables of the latches they stand for
+    def ReadWinningRegionDddmp(self, dddmpFile):
+        composeIndices = [0] * dddmpFile.nbOfVars
+        for varId, k in dddmpFile.getLatchPositions(self._aig).items():
+            composeIndices[varId] = self.bddManager.getVarIndex(
+                self._vars[self._latches[k].getLeftVar()])
+        return self.bddManager.loadDddmp(dddmpFile.filePath, dddmpFile.mode,
+            composeIndices)
 
 
 #    def readTheStrategy(self):
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+from AigerParser import *
+from array import array
+
+
+#structural analysis of an aiger file: the support of a literal is the set
+#of inputs and latches it depends on, its cone of influence the and gates
+#it depends on
+#supports are bitsets (python integers) over the inputs and the latches,
+#bit k is input k and bit nbOfInputs + k is latch k, in the order of the
+#file
+class ConeAnalysis(object):
+
+    def __init__(self, aiger):
+        self._aig = aiger
+        self._nbOfInputs = len(aiger.inputLits)
+        self._outputSupports = None
+        self._nextSupports = None
+
+    #the support of every output and latch next state function, computed
+    #in one pass over the gates: the support of a gate is the union of the
+    #supports of its inputs, it is kept until its last user has been
+    #visited
+    def computeSupports(self):
+        if self._outputSupports is not None:
+            return
+        aig = self._aig
+        #gates usually come after the gates defining their inputs, they are
+        #then visited in the order of the file
+        supports = self.getSupports(range(len(aig.andLhs)))
+        if supports is None:
+            supports = self.getSupports(aig.getTopologicalOrder())
+        self._outputSupports = [supports[lit >> 1] for lit in aig.outputLits]
+        self._nextSupports = [supports[lit >> 1] for lit in aig.latchNexts]
+
+    #the supports of the variables of the outputs and next state functions
+    #visiting the gates in order, None if a gate comes before the gate of
+    #one of its inputs
+    def getSupports(self, order):
+        aig = self._aig
+        andLhs = aig.andLhs
+        andRhs0 = aig.andRhs0
+        andRhs1 = aig.andRhs1
+        varKinds = aig.varKinds
+        #the supports by variable, None for the gates not visited yet
+        supports = [0] * (aig.maxVarIndex + 1)
+        for k, lit in enumerate(aig.inputLits):
+            supports[lit >> 1] = 1 << k
+        for k, lit in enumerate(aig.latchLits):
+            supports[lit >> 1] = 1 << (self._nbOfInputs + k)
+        for lit in andLhs:
+            supports[lit >> 1] = None
+        fanouts = array('i', [0]) * (aig.maxVarIndex + 1)
+        for rhsArray in (andRhs0, andRhs1):
+            for rhs in rhsArray:
+                fanouts[rhs >> 1] += 1
+        for lits in (aig.latchNexts, aig.outputLits):
+            for lit in lits:
+                #never released
+                fanouts[lit >> 1] += 1
+        for index in order:
+            var0 = andRhs0[index] >> 1
+            var1 = andRhs1[index] >> 1
+            left = supports[var0]
+            right = supports[var1]
+            if left is None or right is None:
+                return None
+            support = left | right
+            #share the integer of an input when the union adds nothing
+            if support == left:
+                support = left
+            elif support == right:
+                support = right
+            supports[andLhs[index] >> 1] = support
+            for var in (var0, var1):
+                fanouts[var] -= 1
+                if fanouts[var] == 0 and varKinds[var] == VAR_AND:
+                    supports[var] = 0
+        return supports
+
+    def getOutputSupport(self, index=0):
+        self.computeSupports()
+        return self._outputSupports[index]
+
+    #the support of the next state function of the latch at position
+    def getNextStateSupport(self, position):
+        self.computeSupports()
+        return self._nextSupports[position]
+
+    def getInputMask(self):
+        return (1 << self._nbOfInputs) - 1
+
+    #the positions of the latches in a support, read from its binary
+    #digits in one pass rather than bit by bit
+    def getSupportLatches(self, support):
+        digits = bin(support >> self._nbOfInputs)[:1:-1]
+        return [position for position, digit in enumerate(digits)
+            if digit == '1']
+
+    #the latches the outputs depend on, directly or through other latches,
+    #together with the given latch positions and the latches those depend
+    #on, sorted by position
+    #the closure of the memoised supports, the support of every live latch
+    #is read once
+    def getLiveLatches(self, positions=()):
+        self.computeSupports()
+        live = bytearray(len(self._nextSupports))
+        stack = list(positions)
+        for support in self._outputSupports:
+            stack.extend(self.getSupportLatches(support))
+        while stack:
+            position = stack.pop()
+            if live[position]:
+                continue
+            live[position] = 1
+            stack.extend(self.getSupportLatches(
+                self.getNextStateSupport(position)))
+        return [position for position in range(len(live)) if live[position]]
+
+    #the positions of the and gates in the cone of influence of the
+    #literals, every gate after the gates defining its inputs, the cone
+    #stops at the gates for which stop returns True
+    #raises ValueError on a cycle
+    def getConeGates(self, lits, stop=None):
+        aig = self._aig
+        varKinds = aig.varKinds
+        varPositions = aig.varPositions
+        #0 not visited, 1 inputs being visited, 2 done
+        state = bytearray(len(aig.andLhs))
+        cone = []
+        for lit in lits:
+            if varKinds[lit >> 1] != VAR_AND:
+                continue
+            stack = [varPositions[lit >> 1]]
+            while stack:
+                index = stack[-1]
+                if state[index] == 0:
+                    if stop is not None and stop(index):
+                        state[index] = 2
+                        stack.pop()
+                        continue
+                    state[index] = 1
+                    for rhs in (aig.andRhs0[index], aig.andRhs1[index]):
+                        if varKinds[rhs >> 1] != VAR_AND:
+                            continue
+                        child = varPositions[rhs >> 1]
+                        if state[child] == 1:
+                            raise ValueError('cycle through and gate '
+                                + str(aig.andLhs[child]))
+                        if state[child] == 0:
+                            stack.append(child)
+                else:
+                    if state[index] == 1:
+                        state[index] = 2
+                        cone.append(index)
+                    stack.pop()
+        return cone
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+
+#the defaults of CUDD for the unique table and the computed table
+CUDD_UNIQUE_SLOTS = 256
+CUDD_CACHE_SLOTS = 262144
+
+#the dynamic reordering methods, by their Cudd_ReorderingType value
+#(listed at the end of this file), none disables dynamic reordering
+REORDER_METHODS = {
+    'none': 1,
+    'random': 2,
+    'sift': 4,
+    'sift-converge': 5,
+    'symm-sift': 6,
+    'window3': 9,
+    'group-sift': 14,
+    'group-sift-converge': 15,
+    'annealing': 16,
+    'genetic': 17,
+    'linear': 18,
+    'lazy-sift': 20,
+    'exact': 21}
+
+
+#the settings of the CUDD manager, None keeps the default of CUDD
+#maxMemory is in bytes, nextReordering is the number of live nodes that
+#triggers the first dynamic reordering
+class CuddConfig(object):
+
+    def __init__(self, uniqueSlots=CUDD_UNIQUE_SLOTS,
+        cacheSize=CUDD_CACHE_SLOTS, maxMemory=0, reorderMethod='sift',
+        nextReordering=None, garbageCollection=True):
+        if reorderMethod not in REORDER_METHODS:
+            raise ValueError('unknown reordering method ' + str(reorderMethod))
+        self.uniqueSlots = uniqueSlots
+        self.cacheSize = cacheSize
+        self.maxMemory = maxMemory
+        self.reorderMethod = reorderMethod
+        self.nextReordering = nextReordering
+        self.garbageCollection = garbageCollection
+
+    #a copy with the given settings changed, settings given as None are
+    #left as they are
+    def override(self, **settings):
+        config = CuddConfig(self.uniqueSlots, self.cacheSize, self.maxMemory,
+            self.reorderMethod, self.nextReordering, self.garbageCollection)
+        for name, value in settings.items():
+            if not hasattr(config, name):
+                raise ValueError('unknown setting ' + name)
+            if value is not None:
+                setattr(config, name, value)
+        if config.reorderMethod not in REORDER_METHODS:
+            raise ValueError('unknown reordering method '
+                + str(config.reorderMethod))
+        return config
+
+    def __str__(self):
+        return "[unique slots " + str(self.uniqueSlots)\
+            + " cache " + str(self.cacheSize)\
+            + " max memory " + str(self.maxMemory)\
+            + " reorder " + self.reorderMethod\
+            + " next reordering " + str(self.nextReordering)\
+            + " gc " + str(self.garbageCollection) + "]"
+
+
+#default: the settings AigSyn always used
+#speed: a large computed table, and no reordering before the problem
+#gets big
+#memory: a small computed table and reordering until convergence
+#large-circuit: a computed table sized for millions of nodes, group
+#sifting keeps the latch/primed pairs of the static order together
+#the unique slots are per variable, so they stay small in all presets
+CUDD_PRESETS = {
+    'default': CuddConfig(),
+    'speed': CuddConfig(uniqueSlots=1 << 10, cacheSize=1 << 20,
+        nextReordering=100000),
+    'memory': CuddConfig(cacheSize=1 << 15, reorderMethod='sift-converge'),
+    'large-circuit': CuddConfig(cacheSize=1 << 21,
+        reorderMethod='group-sift', nextReordering=1 << 18)}
+
+
+#'typedef enum {
+#    CUDD_REORDER_SAME,
+#    CUDD_REORDER_NONE,
+#    CUDD_REORDER_RANDOM,
+#    CUDD_REORDER_RANDOM_PIVOT,
+#    CUDD_REORDER_SIFT,
+#    CUDD_REORDER_SIFT_CONVERGE,
+#    CUDD_REORDER_SYMM_SIFT,
+#    CUDD_REORDER_SYMM_SIFT_CONV,
+#    CUDD_REORDER_WINDOW2,
+#    CUDD_REORDER_WINDOW3,
+#    CUDD_REORDER_WINDOW4,
+#    CUDD_REORDER_WINDOW2_CONV,
+#    CUDD_REORDER_WINDOW3_CONV,
+#    CUDD_REORDER_WINDOW4_CONV,
+#    CUDD_REORDER_GROUP_SIFT,
+#    CUDD_REORDER_GROUP_SIFT_CONV,
+#    CUDD_REORDER_ANNEALING,
+#    CUDD_REORDER_GENETIC,
+#    CUDD_REORDER_LINEAR,
+#    CUDD_REORDER_LINEAR_CONVERGE,
+#    CUDD_REORDER_LAZY_SIFT,
+#    CUDD_REORDER_EXACT
+#} Cudd_ReorderingType;
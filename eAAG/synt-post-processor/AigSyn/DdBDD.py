@@ -0,0 +1,249 @@
+#!/usr/bin/env python
+from BDDBase import BDDBase
+from CuddConfig import *
+from dd import cudd
+
+
+#CUDD through the cython binding of the dd package, the bdds are
+#dd.cudd.Function objects and are freed when python drops them
+#the variables are named x0, x1, ... in the order they are created, the
+#index of a variable is the number in its name
+#dd does not expose the groups of variables, the unique slots nor the
+#first reordering threshold of CUDD, those settings are not applied, and
+#any reordering method but none enables sifting
+class DdBDD(BDDBase):
+
+    def __init__(self, config=None):
+        if config is None:
+            config = CUDD_PRESETS['default']
+        self.config = config
+        memory = None
+        if config.maxMemory:
+            memory = config.maxMemory
+        self._bddManager = cudd.BDD(memory_estimate=memory,
+            initial_cache_size=config.cacheSize)
+        self._bddManager.configure(
+            reordering=config.reorderMethod != 'none',
+            garbage_collection=config.garbageCollection)
+        self.varsNum = 0
+        self.vars = []
+        self._names = []
+
+    def getTrue(self):
+        return self._bddManager.true
+
+    def getFalse(self):
+        return self._bddManager.false
+
+    def getNotTrue(self):
+        return ~self._bddManager.true
+
+    def getNotOne(self):
+        return ~self._bddManager.true
+
+    def createVar(self):
+        name = 'x' + str(self.varsNum)
+        self._bddManager.declare(name)
+        newVar = self._bddManager.var(name)
+        self.vars.append(newVar)
+        self._names.append(name)
+        self.varsNum += 1
+        return newVar
+
+    def getVars(self):
+        return self.vars
+
+    #order[level] is the index of the variable at that level and must list
+    #every variable
+    def setVarOrder(self, order):
+        self._bddManager.reorder(dict((self._names[index], level)
+            for level, index in enumerate(order)))
+
+    def groupVars(self, index, size):
+        pass
+
+    def draw(self, bddName, bdd):
+        self._bddManager.dump(bddName + '.pdf', roots=[bdd])
+
+    #python frees the bdds
+    def ref(self, bdd):
+        pass
+
+    def deref(self, bdd):
+        pass
+
+    def andTo(self, left, right):
+        return left & right
+
+    #the conjunction of the bdds, pairwise in a balanced tree
+    def andAll(self, bddList):
+        bdds = list(bddList)
+        if not bdds:
+            return self.getTrue()
+        while len(bdds) > 1:
+            paired = [left & right
+                for left, right in zip(bdds[::2], bdds[1::2])]
+            if len(bdds) % 2:
+                paired.append(bdds[-1])
+            bdds = paired
+        return bdds[0]
+
+    #the conjunction of the variables, negated where phases has a 0, built
+    #by CUDD in one call
+    def cube(self, bddVars, phases=None):
+        if phases is None:
+            phases = [1] * len(bddVars)
+        assignment = dict()
+        for var, phase in zip(bddVars, phases):
+            if assignment.get(var.var, bool(phase)) != bool(phase):
+                return self.getFalse()
+            assignment[var.var] = bool(phase)
+        return self._bddManager.cube(assignment)
+
+    def and_no_deref(self, left, right):
+        return left & right
+
+    def and_(self, left, right):
+        return left & right
+
+    def orTo(self, left, right):
+        return left | right
+
+    def or_no_deref(self, left, right):
+        return left | right
+
+    def or_(self, left, right):
+        return left | right
+
+    def not_no_deref(self, bdd):
+        return ~bdd
+
+    def not_(self, bdd):
+        return ~bdd
+
+    def biimpTo(self, left, right):
+        return left.equiv(right)
+
+    def biimp_no_deref(self, left, right):
+        return left.equiv(right)
+
+    def biimp(self, left, right):
+        return left.equiv(right)
+
+    #the names of the variables of a cube
+    def getCubeNames(self, cube):
+        return self._bddManager.support(cube)
+
+    def relProduct_no_deref(self, leftBDD, rightBDD, cube):
+        return cudd.and_exists(leftBDD, rightBDD, self.getCubeNames(cube))
+
+    def relProductTo(self, leftBDD, rightBDD, cube):
+        return self.relProduct_no_deref(leftBDD, rightBDD, cube)
+
+    def relProduct(self, leftBDD, rightBDD, cube):
+        return self.relProduct_no_deref(leftBDD, rightBDD, cube)
+
+    def exists_no_deref(self, bdd, cube):
+        return self._bddManager.exist(self.getCubeNames(cube), bdd)
+
+    def exists(self, bdd, cube):
+        return self.exists_no_deref(bdd, cube)
+
+    def forAll_no_deref(self, bdd, cube):
+        return self._bddManager.forall(self.getCubeNames(cube), bdd)
+
+    def forAll(self, bdd, cube):
+        return self.forAll_no_deref(bdd, cube)
+
+    def createDdArray(self, length):
+        return [None] * length
+
+    #the renaming swapping the variables of from_ and to
+    def createPermutation(self, from_, to):
+        renaming = dict()
+        for fromVar, toVar in zip(from_, to):
+            renaming[fromVar.var] = toVar.var
+            renaming[toVar.var] = fromVar.var
+        return [renaming, None, len(from_)]
+
+    #the indices of the variables the bdd depends on
+    def support(self, bdd):
+        return sorted(int(name[1:])
+            for name in self._bddManager.support(bdd))
+
+    def getVarIndex(self, var):
+        return int(var.var[1:])
+
+    def nodeCount(self, bdd):
+        return len(bdd)
+
+    #the number of nodes of several bdds, shared nodes counted once
+    def sharingSize(self, bdds):
+        if not bdds:
+            return 0
+        return cudd.count_nodes(bdds)
+
+    #the counters of the manager, as PyCuddBDD.getStats
+    def getStats(self):
+        stats = self._bddManager.statistics()
+        return {'peak_live_nodes': stats.get('peak_live_nodes', 0),
+            'live_nodes': stats.get('n_nodes', 0),
+            'reorderings': stats.get('n_reorderings', 0),
+            'reordering_time': stats.get('reordering_time', 0.0),
+            'cache_hits': stats.get('cache_hits', 0),
+            'cache_lookups': stats.get('cache_lookups', 0),
+            'memory': stats.get('mem', 0)}
+
+    #a small bdd that agrees with bdd wherever care holds
+    def restrict(self, bdd, care):
+        return cudd.restrict(bdd, care)
+
+    #substitute every variable i of the bdd by vector[i], all at once
+    def vectorCompose(self, bdd, vector):
+        substitution = dict()
+        for name, var, function in zip(self._names, self.vars, vector):
+            if function != var:
+                substitution[name] = function
+        if not substitution:
+            return bdd
+        return self._bddManager.let(substitution, bdd)
+
+    def replace_no_deref(self, bdd, perm):
+        #[renaming, None, length]
+        return self._bddManager.let(perm[0], bdd)
+
+    def replace(self, bdd, perm):
+        return self.replace_no_deref(bdd, perm)
+
+    def getSatAssign(self, bdd):
+        pass
+
+    #the values of all the variables in one satisfying assignment
+    def getMinterm(self, bdd):
+        return self._bddManager.pick(bdd, care_vars=self._names)
+
+    #returns a BDD that represents a single satisfying assignment
+    def getMintermBDD(self, bdd):
+        assignment = self.getMinterm(bdd)
+        if assignment is None:
+            return self.getFalse()
+        return self._bddManager.cube(assignment)
+
+    def getMintermBitVector(self, bdd):
+        assignment = self.getMinterm(bdd)
+        if assignment is None:
+            return '0' * self.varsNum
+        return ''.join('1' if assignment[name] else '0'
+            for name in self._names)
+
+    #the assignments of dd's cube generator over the support of the bdd
+    def iterCubes(self, bdd):
+        support = self._bddManager.support(bdd)
+        for assignment in self._bddManager.pick_iter(bdd, care_vars=support):
+            values = ['-'] * self.varsNum
+            for name, value in assignment.items():
+                values[int(name[1:])] = '1' if value else '0'
+            yield ''.join(values)
+
+    def satAssignCount(self, bdd):
+        return float(self._bddManager.count(bdd, nvars=self.varsNum))
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+from AigerParser import *
+
+#a winning region can be given as a DDDMP dump of its bdd instead of an
+#aiger circuit, as BDD based solvers write it with Dddmp_cuddBddStore,
+#in text or binary mode, with a single root
+#only the header is read here, the bdd is loaded by CUDD
+#the variables of the dump are latches of the strategy: with
+#.suppvarnames the names of the latches in the symbol table of the
+#strategy, without names variable id k is latch k, as the inputs of an
+#aiger winning region
+
+
+#whether a file starts like a DDDMP dump
+def isDddmpFile(filePath):
+    with open(filePath, 'rb') as dddmpFile:
+        return dddmpFile.readline().startswith(b'.ver DDDMP')
+
+
+class DddmpFile(object):
+
+    def __init__(self, filePath):
+        self.filePath = filePath
+        self.mode = None  # 'A' for text, 'B' for binary
+        self.nbOfVars = 0
+        self.nbOfRoots = 0
+        self.ids = []  # the variable ids of the support
+        self.suppVarNames = None  # the names of the support, if any
+
+    #the position of the latch of the strategy aig of every variable id of
+    #the support
+    def getLatchPositions(self, aig):
+        positions = dict()
+        if self.suppVarNames is None:
+            for varId in self.ids:
+                if varId >= aig.getNbOfLatches():
+                    raise ValueError('the winning region reads variable '
+                        + str(varId) + ' but the strategy has '
+                        + str(aig.getNbOfLatches()) + ' latches')
+                positions[varId] = varId
+            return positions
+        byName = dict((name, k) for k, name in
+            enumerate(aig.getLatchNames()) if name is not None)
+        for varId, name in zip(self.ids, self.suppVarNames):
+            if name not in byName:
+                raise ValueError('the strategy has no latch named ' + name)
+            positions[varId] = byName[name]
+        return positions
+
+
+class DddmpFileParser(object):
+
+    def __init__(self, filePath):
+        self._filePath = filePath
+        self.dddmpFile = DddmpFile(filePath)
+
+    #the header is a line per key up to .nodes, in both modes
+    def readHeader(self):
+        header = dict()
+        with open(self._filePath, 'rb') as dddmpFile:
+            for line in dddmpFile:
+                fields = line.decode('ascii', 'replace').split()
+                if not fields:
+                    continue
+                if fields[0] == '.nodes':
+                    return header
+                header[fields[0]] = fields[1:]
+        raise ValueError('the DDDMP file ' + self._filePath +
+            ' has no nodes')
+
+    def parse(self):
+        header = self.readHeader()
+        dddmpFile = self.dddmpFile
+        try:
+            dddmpFile.mode = header['.mode'][0]
+            dddmpFile.nbOfVars = int(header['.nvars'][0])
+            dddmpFile.nbOfRoots = int(header['.nroots'][0])
+            dddmpFile.ids = [int(varId) for varId in header.get('.ids', [])]
+        except (KeyError, IndexError):
+            raise ValueError('invalid DDDMP header in ' + self._filePath)
+        if any(varId >= dddmpFile.nbOfVars for varId in dddmpFile.ids):
+            raise ValueError('invalid DDDMP header in ' + self._filePath)
+        if dddmpFile.mode not in ('A', 'B'):
+            raise ValueError('unknown DDDMP mode ' + dddmpFile.mode)
+        if dddmpFile.nbOfRoots != 1:
+            raise ValueError('the DDDMP file ' + self._filePath +
+                ' must have one root')
+        if '.suppvarnames' in header:
+            dddmpFile.suppVarNames = header['.suppvarnames']
+            if len(dddmpFile.suppVarNames) != len(dddmpFile.ids):
+                raise ValueError('invalid DDDMP header in ' + self._filePath)
+        return dddmpFile
+
+
+#a winning region file, aiger or DDDMP
+def parseWinningRegion(filePath):
+    if isDddmpFile(filePath):
+        return DddmpFileParser(filePath).parse()
+    return AigerFileParser(filePath).parse()
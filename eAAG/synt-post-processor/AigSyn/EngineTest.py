@@ -0,0 +1,320 @@
+#!/usr/bin/env python
+from AigerParser import *
+from CuddConfig import *
+from BddEngines import *
+import argparse
+import random
+import sys
+import time
+
+#conformance and performance of the bdd engines: every engine gets the
+#same random formulas and every operation of BDDBase the transition system
+#uses is compared against truth tables, then the engines are timed on
+#random operations and, if given, on the check of a strategy and its
+#winning region
+#the results are key=value lines, engine_name=value, the exit status is 1
+#when an engine fails a check
+
+argParser = argparse.ArgumentParser(
+    description='Conformance and performance check of the bdd engines')
+argParser.add_argument('--engines', default=','.join(ENGINE_NAMES),
+    help='comma separated engines to check, the unavailable ones are '
+    'skipped (default: all)')
+argParser.add_argument('--vars', type=int, default=6,
+    help='number of variables of the conformance formulas (default: 6)')
+argParser.add_argument('--rounds', type=int, default=100,
+    help='number of random formulas per check (default: 100)')
+argParser.add_argument('--ops', type=int, default=20000,
+    help='number of random operations timed (default: 20000)')
+argParser.add_argument('--seed', type=int, default=0,
+    help='seed of the random formulas (default: 0)')
+argParser.add_argument('--bench', nargs=2, metavar=('STRATEGY', 'WREGION'),
+    help='also time the check of a strategy and its winning region')
+args = argParser.parse_args()
+
+
+class ConformanceError(Exception):
+    pass
+
+
+#truth tables are tuples of booleans, entry a is the value for the
+#assignment whose bit i is the value of variable i
+class TruthTables(object):
+
+    def __init__(self, nbOfVars):
+        self.nbOfVars = nbOfVars
+        self.size = 1 << nbOfVars
+
+    def var(self, i):
+        return tuple(bool((a >> i) & 1) for a in range(self.size))
+
+    def apply(self, op, *tables):
+        return tuple(op(*values) for values in zip(*tables))
+
+    def exists(self, table, indices):
+        result = []
+        for a in range(self.size):
+            value = False
+            for b in range(self.size):
+                if table[b] and all((a >> i) & 1 == (b >> i) & 1
+                    for i in range(self.nbOfVars) if i not in indices):
+                    value = True
+                    break
+            result.append(value)
+        return tuple(result)
+
+    def compose(self, table, vectorTables):
+        result = []
+        for a in range(self.size):
+            b = 0
+            for i, vectorTable in enumerate(vectorTables):
+                if vectorTable[a]:
+                    b |= 1 << i
+            result.append(table[b])
+        return tuple(result)
+
+    def support(self, table):
+        return [i for i in range(self.nbOfVars)
+            if any(table[a] != table[a ^ (1 << i)]
+                for a in range(self.size))]
+
+
+#checks an engine against the truth tables
+class EngineConformance(object):
+
+    def __init__(self, engine, nbOfVars, rng):
+        self.engine = engine
+        self.tables = TruthTables(nbOfVars)
+        self.rng = rng
+        self.checks = 0
+        #a random variable order, set before any bdd is built
+        order = list(range(nbOfVars))
+        rng.shuffle(order)
+        self.vars = [engine.createVar() for i in range(nbOfVars)]
+        engine.setVarOrder(order)
+        self._minterms = []
+        for a in range(self.tables.size):
+            minterm = engine.getTrue()
+            for i, var in enumerate(self.vars):
+                if not (a >> i) & 1:
+                    var = engine.not_no_deref(var)
+                minterm = engine.and_no_deref(minterm, var)
+            self._minterms.append(minterm)
+
+    #the truth table of a bdd, through the interface only
+    def getTable(self, bdd):
+        engine = self.engine
+        return tuple(engine.and_no_deref(bdd, minterm) !=
+            engine.getNotTrue() for minterm in self._minterms)
+
+    def expect(self, name, bdd, table):
+        self.checks += 1
+        if self.getTable(bdd) != table:
+            raise ConformanceError(name)
+
+    #a random formula as (bdd, truth table)
+    def randomFormula(self, depth=4):
+        engine = self.engine
+        if depth == 0 or self.rng.random() < 0.2:
+            choice = self.rng.randrange(len(self.vars) + 2)
+            if choice == len(self.vars):
+                return engine.getTrue(), tuple([True] * self.tables.size)
+            if choice == len(self.vars) + 1:
+                return engine.getNotTrue(), tuple([False] * self.tables.size)
+            return self.vars[choice], self.tables.var(choice)
+        left, leftTable = self.randomFormula(depth - 1)
+        right, rightTable = self.randomFormula(depth - 1)
+        op = self.rng.randrange(4)
+        if op == 0:
+            return engine.and_no_deref(left, right), self.tables.apply(
+                lambda x, y: x and y, leftTable, rightTable)
+        if op == 1:
+            return engine.or_no_deref(left, right), self.tables.apply(
+                lambda x, y: x or y, leftTable, rightTable)
+        if op == 2:
+            return engine.biimp_no_deref(left, right), self.tables.apply(
+                lambda x, y: x == y, leftTable, rightTable)
+        return engine.not_no_deref(left), self.tables.apply(
+            lambda x: not x, leftTable)
+
+    def randomIndices(self):
+        return set(i for i in range(len(self.vars))
+            if self.rng.random() < 0.4)
+
+    def getCube(self, indices):
+        return self.engine.andAll([self.vars[i] for i in sorted(indices)])
+
+    def run(self, rounds):
+        engine = self.engine
+        tables = self.tables
+        missing = getMissingMethods(type(engine))
+        if missing:
+            raise ConformanceError('missing ' + ' '.join(missing))
+        for i, var in enumerate(self.vars):
+            self.checks += 1
+            if engine.getVarIndex(var) != i:
+                raise ConformanceError('getVarIndex')
+        self.expect('getTrue', engine.getTrue(), tuple([True] * tables.size))
+        self.expect('getNotTrue', engine.getNotTrue(),
+            tuple([False] * tables.size))
+        for k in range(rounds):
+            self.runRound()
+
+    def runRound(self):
+        engine = self.engine
+        tables = self.tables
+        f, fTable = self.randomFormula()
+        g, gTable = self.randomFormula()
+        self.expect('formula', f, fTable)
+        self.expect('andTo', engine.andTo(f, g), tables.apply(
+            lambda x, y: x and y, fTable, gTable))
+        self.expect('orTo', engine.orTo(f, g), tables.apply(
+            lambda x, y: x or y, fTable, gTable))
+        self.expect('not_', engine.not_(f), tables.apply(
+            lambda x: not x, fTable))
+        self.expect('biimp', engine.biimp(f, g), tables.apply(
+            lambda x, y: x == y, fTable, gTable))
+        indices = self.randomIndices()
+        cube = self.getCube(indices)
+        self.expect('exists', engine.exists_no_deref(f, cube),
+            tables.exists(fTable, indices))
+        phases = [self.rng.randrange(2) for i in sorted(indices)]
+        cubeTable = tuple(all(bool((a >> i) & 1) == bool(phase)
+            for i, phase in zip(sorted(indices), phases))
+            for a in range(tables.size))
+        self.expect('cube', engine.cube([self.vars[i]
+            for i in sorted(indices)], phases), cubeTable)
+        notTable = tables.apply(lambda x: not x, fTable)
+        self.expect('forAll', engine.forAll_no_deref(f, cube),
+            tables.apply(lambda x: not x, tables.exists(notTable, indices)))
+        self.expect('relProduct', engine.relProduct_no_deref(f, g, cube),
+            tables.exists(tables.apply(lambda x, y: x and y, fTable,
+            gTable), indices))
+        #restrict only has to agree with f on the care set
+        self.checks += 1
+        restricted = engine.restrict(f, g)
+        if self.getTable(engine.and_no_deref(restricted, g)) !=\
+            tables.apply(lambda x, y: x and y, fTable, gTable):
+            raise ConformanceError('restrict')
+        vector = [self.randomFormula(2) for var in self.vars]
+        composeVector = engine.createDdArray(len(self.vars))
+        for i, (bdd, table) in enumerate(vector):
+            composeVector[i] = bdd
+        self.expect('vectorCompose', engine.vectorCompose(f, composeVector),
+            tables.compose(fTable, [table for bdd, table in vector]))
+        self.runRoundReplace(f, fTable)
+        self.checks += 1
+        if engine.support(f) != tables.support(fTable):
+            raise ConformanceError('support')
+        self.checks += 1
+        if engine.satAssignCount(f) != float(sum(fTable)):
+            raise ConformanceError('satAssignCount')
+        self.runRoundMinterm(f, fTable)
+        self.checks += 1
+        if engine.sharingSize([f, g]) < max(engine.nodeCount(f),
+            engine.nodeCount(g)):
+            raise ConformanceError('sharingSize')
+
+    #swap the first half of the variables with the second
+    def runRoundReplace(self, f, fTable):
+        half = len(self.vars) // 2
+        perm = self.engine.createPermutation(self.vars[:half],
+            self.vars[half:2 * half])
+        swapped = []
+        for i in range(len(self.vars)):
+            if i < half:
+                i += half
+            elif i < 2 * half:
+                i -= half
+            swapped.append(self.tables.var(i))
+        self.expect('replace', self.engine.replace_no_deref(f, perm),
+            self.tables.compose(fTable, swapped))
+
+    def runRoundMinterm(self, f, fTable):
+        engine = self.engine
+        tables = self.tables
+        if not any(fTable):
+            return
+        self.checks += 1
+        mintermTable = self.getTable(engine.getMintermBDD(f))
+        if sum(mintermTable) != 1 or not fTable[mintermTable.index(True)]:
+            raise ConformanceError('getMintermBDD')
+        self.checks += 1
+        minterms = list(engine.iterMinterms(f))
+        if sorted(minterms) != sorted(''.join(str((a >> i) & 1)
+            for i in range(len(self.vars)))
+            for a in range(tables.size) if fTable[a]):
+            raise ConformanceError('iterMinterms')
+        self.checks += 1
+        bitVector = engine.getMintermBitVector(f)
+        a = sum(1 << i for i, bit in enumerate(bitVector) if bit == '1')
+        if not fTable[a]:
+            raise ConformanceError('getMintermBitVector')
+
+
+#random ands, ors and negations over 20 variables, each operation is one
+#call into the engine
+def timeOperations(engine, nbOfOps, rng):
+    bdds = [engine.createVar() for i in range(20)]
+    start = time.time()
+    for k in range(nbOfOps):
+        left = bdds[rng.randrange(len(bdds))]
+        right = bdds[rng.randrange(len(bdds))]
+        op = rng.randrange(3)
+        if op == 0:
+            bdd = engine.and_no_deref(left, right)
+        elif op == 1:
+            bdd = engine.or_no_deref(left, right)
+        else:
+            bdd = engine.not_no_deref(left)
+        #keep the pool small so that the bdds stay small
+        if len(bdds) < 64:
+            bdds.append(bdd)
+        else:
+            bdds[20 + rng.randrange(44)] = bdd
+    return time.time() - start
+
+
+def timeCheck(engine, strategyFile, wregionFile):
+    from CompetitionTrnsSys import CompetitionTrnsSys
+    start = time.time()
+    aig = AigerFileParser(strategyFile).parse()
+    winRegAig = AigerFileParser(wregionFile).parse()
+    trnsSys = CompetitionTrnsSys(aig, engine)
+    result = trnsSys.ValidateWinningRegion(winRegAig).split(':')[0]
+    return result, time.time() - start
+
+
+failed = False
+for name in args.engines.split(','):
+    if not isEngineAvailable(name):
+        print name + '_available=False'
+        continue
+    print name + '_available=True'
+    rng = random.Random(args.seed)
+    #one manager at a time, CUDD can not have two
+    engine = createBddEngine(name)
+    conformance = EngineConformance(engine, args.vars, rng)
+    start = time.time()
+    try:
+        conformance.run(args.rounds)
+        print name + '_conformance=ok'
+    except ConformanceError as ex:
+        print name + '_conformance=failed:' + str(ex)
+        failed = True
+    print name + '_checks=' + str(conformance.checks)
+    print name + '_conformance_time=%.3f' % (time.time() - start)
+    conformance = None
+    engine = None
+    engine = createBddEngine(name)
+    print name + '_ops_time=%.3f' % timeOperations(engine, args.ops, rng)
+    if args.bench is not None:
+        engine = None
+        engine = createBddEngine(name)
+        result, elapsed = timeCheck(engine, args.bench[0], args.bench[1])
+        print name + '_check=' + result
+        print name + '_check_time=%.3f' % elapsed
+    engine = None
+
+if failed:
+    sys.exit(1)
@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+from AigerParser import *
+from AigerSimulator import AigerSimulator
+from PhaseStats import PhaseStats
+from ResourceGovernor import ResourceGovernor
+import numpy
+
+#strategies with few latches and inputs are checked on explicit states:
+#the strategy is simulated once over every valuation of its latches and
+#inputs, which gives the table of its next states and of its error
+#output, the sets of states are then boolean arrays indexed by the
+#valuation of the latches, latch k being bit k of the index
+#the tables have 2 ** (latches + inputs) entries
+EXPLICIT_MAX_LATCHES = 20
+EXPLICIT_MAX_BITS = 22
+
+#the strategies CompetitionTest.py checks on explicit states by default:
+#building the tables simulates every and gate over every valuation, about
+#a second for 2 ** 32 gate valuations, the bdds of larger strategies are
+#usually built faster
+EXPLICIT_MAX_WORK = 1 << 31
+
+#the valuations are simulated in chunks of at most CHUNK_WORDS 64 bit
+#words, fewer if the rows of the simulator, one per variable, would take
+#more than SIMULATION_WORDS words
+CHUNK_WORDS = 4096
+SIMULATION_WORDS = 1 << 22
+
+#the words of the first 6 bits of a valuation, bit b of word w is the
+#valuation 64 * w + b
+LOW_BIT_WORDS = [0xAAAAAAAAAAAAAAAA, 0xCCCCCCCCCCCCCCCC, 0xF0F0F0F0F0F0F0F0,
+    0xFF00FF00FF00FF00, 0xFFFF0000FFFF0000, 0xFFFFFFFF00000000]
+
+
+#whether the tables of a strategy fit in memory
+def fitsExplicit(nbOfLatches, nbOfInputs):
+    return nbOfLatches <= EXPLICIT_MAX_LATCHES and\
+        nbOfLatches + nbOfInputs <= EXPLICIT_MAX_BITS
+
+
+#whether a strategy is small enough to be checked on explicit states
+#rather than with bdds
+def prefersExplicit(nbOfLatches, nbOfInputs, nbOfAndGates):
+    return fitsExplicit(nbOfLatches, nbOfInputs) and\
+        (nbOfAndGates + 1) << (nbOfLatches + nbOfInputs) <= EXPLICIT_MAX_WORK
+
+
+#the bits of every valuation of nbOfBits variables, one row per variable,
+#in chunks of the valuations first .. first + count - 1
+#yields the rows, first and count of each chunk
+def enumerateValuations(nbOfBits, nbOfWords):
+    nbOfValuations = 1 << nbOfBits
+    totalWords = max(1, nbOfValuations >> 6)
+    for firstWord in range(0, totalWords, nbOfWords):
+        words = numpy.arange(firstWord, firstWord + nbOfWords,
+            dtype=numpy.uint64)
+        rows = numpy.empty((nbOfBits, nbOfWords), dtype=numpy.uint64)
+        for k in range(nbOfBits):
+            if k < 6:
+                rows[k] = LOW_BIT_WORDS[k]
+            else:
+                #all ones in the words whose index has bit k - 6
+                rows[k] = numpy.uint64(0) - ((words >> numpy.uint64(k - 6))
+                    & numpy.uint64(1))
+        first = firstWord << 6
+        yield rows, first, min(nbOfWords << 6, nbOfValuations - first)
+
+
+#the bits of the first count traces of rows, one boolean row per row,
+#there may be no row, as for the next states of a strategy without latches
+def unpackRows(rows, count):
+    shifts = numpy.arange(64, dtype=numpy.uint64)
+    bits = (rows[:, :, None] >> shifts) & numpy.uint64(1)
+    return bits.reshape((rows.shape[0], rows.shape[1] * 64))[:, :count]\
+        .astype(numpy.bool_)
+
+
+#the number of words to simulate at once for nbOfBits variables
+def getChunkWords(aig, nbOfBits):
+    words = max(1, (1 << nbOfBits) >> 6)
+    limit = min(CHUNK_WORDS,
+        max(1, SIMULATION_WORDS // (aig.maxVarIndex + 1)))
+    while words > limit:
+        words >>= 1
+    return words
+
+
+#the checks of CompetitionTrnsSys.ValidateWinningRegion and ModelCheck on
+#explicit states, with the same results
+class ExplicitCompetitionChecker(object):
+
+    def __init__(self, aiger, stats=None, governor=None):
+        if stats is None:
+            stats = PhaseStats(None)
+        if governor is None:
+            governor = ResourceGovernor(None)
+        self.stats = stats
+        self.governor = governor
+        self._aig = aiger
+        self._nbOfLatches = len(aiger.latchLits)
+        self._nbOfInputs = len(aiger.inputLits)
+        if not fitsExplicit(self._nbOfLatches, self._nbOfInputs):
+            raise ValueError('the strategy is too large for the explicit '
+                'checker')
+        self.stats.start('gates')
+        self.buildTables()
+        self.stats.stop('gates')
+        self.stats.setValue('gates', 'states', 1 << self._nbOfLatches)
+        self.stats.setValue('gates', 'error_states',
+            int(self._errorStates.sum()))
+
+    #the next state and the error output of every state and input, the
+    #valuation of a state and an input is state + (input << latches)
+    def buildTables(self):
+        aig = self._aig
+        nbOfLatches = self._nbOfLatches
+        nbOfBits = nbOfLatches + self._nbOfInputs
+        nbOfValuations = 1 << nbOfBits
+        nextStates = numpy.zeros(nbOfValuations, dtype=numpy.uint32)
+        bad = numpy.zeros(nbOfValuations, dtype=numpy.bool_)
+        nbOfWords = getChunkWords(aig, nbOfBits)
+        simulator = AigerSimulator(aig, nbOfWords)
+        for rows, first, count in enumerateValuations(nbOfBits, nbOfWords):
+            simulator.evaluate(rows[nbOfLatches:], rows[:nbOfLatches])
+            bad[first:first + count] = unpackRows(
+                simulator.getOutput()[None, :], count)[0]
+            nextBits = unpackRows(simulator.getNextState(), count)
+            chunk = nextStates[first:first + count]
+            for k in range(nbOfLatches):
+                chunk |= nextBits[k].astype(numpy.uint32) << k
+            self.governor.check()
+        #one row per input valuation, one column per state
+        shape = (1 << self._nbOfInputs, 1 << nbOfLatches)
+        self._nextStates = nextStates.reshape(shape)
+        #the states raising the error output for some input
+        self._errorStates = bad.reshape(shape).any(axis=0)
+
+    #the states of the winning region, its inputs are the first latches of
+    #the strategy, in the order of the files, as in ReadWinningRegionDynamic
+    def getWinningRegion(self, winRegAigFile):
+        nbOfWrInputs = len(winRegAigFile.inputLits)
+        if nbOfWrInputs > self._nbOfLatches:
+            raise ValueError('the winning region has more inputs than the '
+                'strategy has latches')
+        if len(winRegAigFile.latchLits) > 0:
+            raise ValueError('the winning region has latches')
+        winRegion = numpy.zeros(1 << nbOfWrInputs, dtype=numpy.bool_)
+        nbOfWords = getChunkWords(winRegAigFile, nbOfWrInputs)
+        simulator = AigerSimulator(winRegAigFile, nbOfWords)
+        for rows, first, count in enumerateValuations(nbOfWrInputs,
+            nbOfWords):
+            simulator.evaluate(rows, None)
+            winRegion[first:first + count] = unpackRows(
+                simulator.getOutput()[None, :], count)[0]
+            self.governor.check()
+        #the latches the winning region does not read are free
+        states = numpy.arange(1 << self._nbOfLatches, dtype=numpy.uint32)
+        return winRegion[states & numpy.uint32((1 << nbOfWrInputs) - 1)]
+
+    def ValidateWinningRegion(self, winRegAigFile):
+        self.stats.start('wregion')
+        winRegion = self.getWinningRegion(winRegAigFile)
+        self.stats.stop('wregion')
+        self.stats.setValue('wregion', 'states', int(winRegion.sum()))
+        self.stats.start('fixpoint')
+        try:
+            return self.checkWinningRegion(winRegion)
+        finally:
+            self.stats.stop('fixpoint')
+
+    def checkWinningRegion(self, winRegion):
+        if not winRegion[0]:
+            return 'False:initial state is not in the winning region!'
+        if (winRegion & self._errorStates).any():
+            return 'False:Winning region contains an error state!'
+        #every successor of a state of W, for every input, is in W
+        successors = self._nextStates[:, winRegion]
+        if winRegion[successors].all():
+            return 'True'
+        return 'False:The winning region is not a fixed point!!'
+
+    #breadth first search from the initial state, the direction is
+    #accepted for the interface of CompetitionTrnsSys, on explicit states
+    #the forward search is the cheaper one
+    #returns whether no unsafe state is reachable from the initial state
+    def ModelCheck(self, direction='forward'):
+        self.stats.start('modelcheck')
+        try:
+            reached = numpy.zeros(1 << self._nbOfLatches, dtype=numpy.bool_)
+            reached[0] = True
+            frontier = numpy.zeros(1, dtype=numpy.uint32)
+            while len(frontier) > 0:
+                if self._errorStates[frontier].any():
+                    return False
+                successors = numpy.unique(self._nextStates[:, frontier])
+                frontier = successors[~reached[successors]]
+                reached[frontier] = True
+                self.governor.check()
+            self.stats.setValue('modelcheck', 'reached_states',
+                int(reached.sum()))
+            return True
+        finally:
+            self.stats.stop('modelcheck')
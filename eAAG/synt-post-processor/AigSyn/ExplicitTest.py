@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+from AigerParser import *
+from BddEngines import *
+from CompetitionTrnsSys import CompetitionTrnsSys
+from ExplicitCompetitionChecker import ExplicitCompetitionChecker
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+
+#conformance of the explicit checker: random small strategies and winning
+#regions are checked by ExplicitCompetitionChecker and by the bdd
+#transition system, which must give the same results for
+#ValidateWinningRegion and ModelCheck
+#strategy k has k % (max latches + 1) latches, so that strategies without
+#latches are always among them
+#the results are key=value lines, the exit status is 1 when a result
+#differs
+
+argParser = argparse.ArgumentParser(
+    description='Conformance check of the explicit checker')
+argParser.add_argument('--engine', choices=ENGINE_NAMES, default='python',
+    help='bdd engine of the reference checks (default: python)')
+argParser.add_argument('--cases', type=int, default=200,
+    help='number of random strategies (default: 200)')
+argParser.add_argument('--latches', type=int, default=4,
+    help='maximal number of latches of a strategy (default: 4)')
+argParser.add_argument('--seed', type=int, default=0,
+    help='seed of the random strategies (default: 0)')
+args = argParser.parse_args()
+
+if not isEngineAvailable(args.engine):
+    argParser.error('the bdd engine ' + args.engine + ' is not available')
+
+
+#an aag file of random and gates over inputs and latches, with a single
+#output, the literals of the gates are those of the gates before them
+def writeRandomAiger(filePath, rng, nbOfInputs, nbOfLatches, nbOfAndGates):
+    maxVarIndex = nbOfInputs + nbOfLatches + nbOfAndGates
+    lines = ['aag %d %d %d 1 %d' % (maxVarIndex, nbOfInputs, nbOfLatches,
+        nbOfAndGates)]
+    for i in range(nbOfInputs):
+        lines.append(str(2 * (i + 1)))
+    for l in range(nbOfLatches):
+        lines.append('%d %d' % (2 * (nbOfInputs + l + 1),
+            rng.randrange(2 * maxVarIndex + 2)))
+    lines.append(str(rng.randrange(2 * maxVarIndex + 2)))
+    for a in range(nbOfAndGates):
+        lhs = 2 * (nbOfInputs + nbOfLatches + a + 1)
+        lines.append('%d %d %d' % (lhs, rng.randrange(lhs), rng.randrange(lhs)))
+    with open(filePath, 'w') as aigerFile:
+        aigerFile.write('\n'.join(lines) + '\n')
+
+
+def checkCase(rng, nbOfLatches, directory):
+    strategyFile = os.path.join(directory, 'strategy.aag')
+    wregionFile = os.path.join(directory, 'wregion.aag')
+    writeRandomAiger(strategyFile, rng, rng.randint(0, 3), nbOfLatches,
+        rng.randint(0, 8))
+    writeRandomAiger(wregionFile, rng, rng.randint(0, nbOfLatches), 0,
+        rng.randint(0, 4))
+    explicit = ExplicitCompetitionChecker(
+        AigerFileParser(strategyFile).parse())
+    engine = createBddEngine(args.engine)
+    trnsSys = CompetitionTrnsSys(AigerFileParser(strategyFile).parse(),
+        engine)
+    results = [
+        ('wregion', explicit.ValidateWinningRegion(
+            AigerFileParser(wregionFile).parse()),
+            trnsSys.ValidateWinningRegion(
+            AigerFileParser(wregionFile).parse())),
+        ('forward', explicit.ModelCheck('forward'),
+            trnsSys.ModelCheck('forward')),
+        ('backward', explicit.ModelCheck('backward'),
+            trnsSys.ModelCheck('backward'))]
+    #one manager at a time, CUDD can not have two
+    trnsSys = None
+    engine = None
+    return [(name, expected, result)
+        for name, result, expected in results if result != expected]
+
+
+rng = random.Random(args.seed)
+directory = tempfile.mkdtemp()
+mismatches = 0
+try:
+    for k in range(args.cases):
+        for name, expected, result in checkCase(rng,
+            k % (args.latches + 1), directory):
+            mismatches += 1
+            print 'mismatch=case %d %s: bdd %s, explicit %s' % (k, name,
+                expected, result)
+finally:
+    shutil.rmtree(directory)
+print 'cases=' + str(args.cases)
+print 'mismatches=' + str(mismatches)
+
+if mismatches > 0:
+    sys.exit(1)
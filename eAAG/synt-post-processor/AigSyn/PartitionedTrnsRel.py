@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+from ResourceGovernor import ResourceGovernor
+
+
+#the transition relation T(x, i, x') = AND_k (x'_k <-> f_k(x, i)) kept as
+#a list of clusters instead of a single bdd, each cluster is the
+#conjunction of the relations of latches with a similar support
+#pre-images conjoin the clusters one by one (AndAbstract) and quantify
+#every primed variable and input as soon as no later cluster depends on it,
+#images do the same with the latches and inputs
+class PartitionedTrnsRel(object):
+
+    def __init__(self, bddManager, latchVars, primedVars, nextFcts,
+        inputVars, clusterLimit=5000, governor=None):
+        self.bddManager = bddManager
+        #a cluster grows until its bdd has more nodes than clusterLimit
+        self.clusterLimit = clusterLimit
+        if governor is None:
+            governor = ResourceGovernor(bddManager)
+        self.governor = governor
+        self._inputIndices = set(bddManager.getVarIndex(v) for v in inputVars)
+        self._primedVars = dict()  # index -> bdd
+        for var in primedVars:
+            self._primedVars[bddManager.getVarIndex(var)] = var
+        self._inputVars = dict()  # index -> bdd
+        for var in inputVars:
+            self._inputVars[bddManager.getVarIndex(var)] = var
+        self._latchVars = dict()  # index -> bdd
+        for var in latchVars:
+            self._latchVars[bddManager.getVarIndex(var)] = var
+        self._clusters = []  # bdd
+        self._supports = []  # set of var indices
+        self._preCubes = []  # bdd, quantified after the matching cluster
+        self._postCubes = []  # bdd, the same for images
+        self.buildClusters(latchVars, primedVars, nextFcts)
+        self.schedulePreImage()
+        self.schedulePostImage()
+
+    def getClusters(self):
+        return self._clusters
+
+    #latches are sorted by the support of their next state function so
+    #that latches reading the same variables end up next to each other,
+    #then consecutive latches are merged while the cluster stays small
+    def buildClusters(self, latchVars, primedVars, nextFcts):
+        parts = []
+        for k in range(len(primedVars)):
+            support = self.bddManager.support(nextFcts[k])
+            relation = self.bddManager.biimp_no_deref(primedVars[k],
+                nextFcts[k])
+            parts.append((sorted(support), k, relation))
+        parts.sort(key=lambda part: (part[0], part[1]))
+        cluster = None
+        for support, k, relation in parts:
+            self.governor.check()
+            if cluster is not None:
+                merged = self.bddManager.and_no_deref(cluster, relation)
+                if self.bddManager.nodeCount(merged) <= self.clusterLimit:
+                    cluster = merged
+                    continue
+                self.addCluster(cluster)
+            cluster = relation
+        if cluster is not None:
+            self.addCluster(cluster)
+
+    def addCluster(self, cluster):
+        self._clusters.append(cluster)
+        self._supports.append(set(self.bddManager.support(cluster)))
+
+    #orders the clusters greedily, next comes the cluster after which the
+    #most inputs can be quantified while introducing the fewest new ones,
+    #and computes the cubes quantified after each cluster
+    def schedulePreImage(self):
+        remaining = list(range(len(self._clusters)))
+        inputSupports = [support & self._inputIndices
+            for support in self._supports]
+        #in how many of the remaining clusters each input occurs
+        occurrences = dict()
+        for support in inputSupports:
+            for i in support:
+                occurrences[i] = occurrences.get(i, 0) + 1
+        introduced = set()
+        order = []
+        while remaining:
+            best = None
+            bestScore = None
+            for j in remaining:
+                quantifiable = len([i for i in inputSupports[j]
+                    if occurrences[i] == 1])
+                score = quantifiable - len(inputSupports[j] - introduced)
+                if bestScore is None or score > bestScore:
+                    best = j
+                    bestScore = score
+            remaining.remove(best)
+            for i in inputSupports[best]:
+                occurrences[i] -= 1
+            introduced |= inputSupports[best]
+            order.append(best)
+        self._clusters = [self._clusters[j] for j in order]
+        self._supports = [self._supports[j] for j in order]
+        self._preCubes = self.getQuantificationCubes(
+            [self._primedVars, self._inputVars])
+
+    #images use the same order of the clusters
+    def schedulePostImage(self):
+        self._postCubes = self.getQuantificationCubes(
+            [self._latchVars, self._inputVars])
+        #latches no cluster depends on are quantified right away
+        used = set()
+        for support in self._supports:
+            used |= support
+        unused = [self._latchVars[i] for i in sorted(self._latchVars)
+            if i not in used]
+        if unused and self._postCubes:
+            self._postCubes[0] = self.bddManager.andTo(self._postCubes[0],
+                self.bddManager.cube(unused))
+
+    #for each cluster the cube of the variables of the given kinds that
+    #no later cluster depends on
+    def getQuantificationCubes(self, varsByIndex):
+        cubes = []
+        later = set()
+        lastUse = [None] * len(self._supports)
+        for j in reversed(range(len(self._supports))):
+            lastUse[j] = self._supports[j] - later
+            later |= self._supports[j]
+        for j in range(len(self._supports)):
+            cubeVars = []
+            for kind in varsByIndex:
+                cubeVars += [kind[i] for i in sorted(lastUse[j]) if i in kind]
+            cubes.append(self.bddManager.cube(cubeVars))
+        return cubes
+
+    #states(x') is over primed variables, the result is over the
+    #latches: exists i, x'. states(x') & T(x, i, x')
+    def preImage(self, statesPrimed):
+        result = statesPrimed
+        for j in range(len(self._clusters)):
+            self.governor.check()
+            result = self.bddManager.relProduct_no_deref(result,
+                self._clusters[j], self._preCubes[j])
+        return result
+
+    #states(x) is over the latches, the result is over primed variables:
+    #exists i, x. states(x) & T(x, i, x')
+    def image(self, states):
+        result = states
+        for j in range(len(self._clusters)):
+            self.governor.check()
+            result = self.bddManager.relProduct_no_deref(result,
+                self._clusters[j], self._postCubes[j])
+        return result
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+import time
+
+#the phases of a winning region check, in the order they are printed
+PHASES = ('parse', 'gates', 'cnf', 'wregion', 'fixpoint', 'modelcheck')
+
+
+#statistics of the phases of a check, the manager counters are read when a
+#phase starts and stops and the difference is kept, a phase run several
+#times (parsing two files) accumulates
+#the peak of live nodes can not be reset in CUDD, it is the peak since the
+#manager was created, read when the phase stops
+#without a bdd manager (the SAT backend) only the times are kept
+class PhaseStats(object):
+
+    def __init__(self, bddManager):
+        self.bddManager = bddManager
+        self._values = dict()  # phase -> dict(name -> value)
+        self._started = dict()  # phase -> (time, counters)
+
+    def getCounters(self):
+        if self.bddManager is None:
+            return None
+        return self.bddManager.getStats()
+
+    def start(self, phase):
+        self._started[phase] = (time.time(), self.getCounters())
+
+    def stop(self, phase):
+        startTime, before = self._started.pop(phase)
+        after = self.getCounters()
+        values = self._values.setdefault(phase, dict())
+        values['time'] = values.get('time', 0.0) + time.time() - startTime
+        if after is None:
+            return
+        for name in ('reorderings', 'reordering_time', 'cache_hits',
+            'cache_lookups'):
+            values[name] = values.get(name, 0) + after[name] - before[name]
+        values['peak_live_nodes'] = after['peak_live_nodes']
+
+    #record a bdd size (or any other number) of a phase
+    def setValue(self, phase, name, value):
+        self._values.setdefault(phase, dict())[name] = value
+
+    def getValue(self, phase, name):
+        return self._values[phase][name]
+
+    #key=value lines, prefix_phase_name=value, for the phases that ran
+    def getLines(self, prefix='AigSyn'):
+        lines = []
+        for phase in PHASES:
+            if phase not in self._values:
+                continue
+            values = dict(self._values[phase])
+            lookups = values.pop('cache_lookups', 0)
+            hits = values.pop('cache_hits', 0)
+            if lookups > 0:
+                values['cache_hit_rate'] = float(hits) / lookups
+            for name in sorted(values):
+                value = values[name]
+                if isinstance(value, float):
+                    value = '%.3f' % value
+                lines.append(prefix + '_' + phase + '_' + name + '='
+                    + str(value))
+        return lines
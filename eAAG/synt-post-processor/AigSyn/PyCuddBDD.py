@@ -1,20 +1,49 @@
 #!/usr/bin/env python
 from BDDBase import BDDBase
+from CuddConfig import *
+import os.path
 import sys
-sys.path.append("../pycudd")
+#the binding is next to the AigSyn directory, wherever it is run from
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+    "..", "pycudd"))
 import pycudd
 from subprocess import call
 import time
 
+#the group type of MakeTreeNode letting the reordering move the group
+#as a whole
+MTR_DEFAULT = 0
+
+#the characters of the values in the cubes of CUDD
+CUBE_VALUES = '01-'
+
+#the roots of a DDDMP dump are loaded in the order of the file and its
+#variables are composed with the variables of the given indices
+DDDMP_ROOT_MATCHLIST = 1
+DDDMP_VAR_COMPOSEIDS = 4
+
 
 class PyCuddBDD(BDDBase):
 
-    def __init__(self):
-        self._bddManager = pycudd.DdManager()
+    def __init__(self, config=None):
+        if config is None:
+            config = CUDD_PRESETS['default']
+        self.config = config
+        self._bddManager = pycudd.DdManager(0, 0, config.uniqueSlots,
+            config.cacheSize, config.maxMemory)
         self._bddManager.SetDefault()
-        self._bddManager.AutodynEnable(4)
+        if config.reorderMethod == 'none':
+            self._bddManager.AutodynDisable()
+        else:
+            self._bddManager.AutodynEnable(
+                REORDER_METHODS[config.reorderMethod])
+        if config.nextReordering is not None:
+            self._bddManager.SetNextReordering(config.nextReordering)
+        if not config.garbageCollection:
+            self._bddManager.DisableGarbageCollection()
         self.varsNum = 0
         self.vars = []
+        self._permutations = dict()  # (from indices, to indices) -> perm
 
     def getTrue(self):
         return self._bddManager.ReadOne()
@@ -34,6 +63,24 @@ class PyCuddBDD(BDDBase):
         self.varsNum += 1
         return newVar
 
+    #the variables in the order they were created
+    def getVars(self):
+        return self.vars
+
+    #move the variables to the given order, order[level] is the index of
+    #the variable at that level and must list every variable
+    def setVarOrder(self, order):
+        permutation = pycudd.IntArray(len(order))
+        for level, index in enumerate(order):
+            permutation[level] = index
+        if not self._bddManager.ShuffleHeap(permutation):
+            raise RuntimeError('could not apply the variable order')
+
+    #keep the size variables starting at the level of the variable index
+    #together when reordering
+    def groupVars(self, index, size):
+        self._bddManager.MakeTreeNode(index, size, MTR_DEFAULT)
+
     def draw(self, bddName, bdd):
         bdd.DumpDot()
         time.sleep(3)
@@ -55,11 +102,32 @@ class PyCuddBDD(BDDBase):
         self.deref(left)
         return temp
 
+    #the conjunction of the bdds, pairwise in a balanced tree so that the
+    #intermediate results stay small
     def andAll(self, bddList):
-        bddAll = self.getTrue()
-        for bdd in bddList:
-            bddAll = self.andTo(bddAll, bdd)
-        return bddAll
+        bdds = list(bddList)
+        if not bdds:
+            return self.getTrue()
+        while len(bdds) > 1:
+            paired = [left & right
+                for left, right in zip(bdds[::2], bdds[1::2])]
+            if len(bdds) % 2:
+                paired.append(bdds[-1])
+            bdds = paired
+        return bdds[0]
+
+    #the conjunction of the variables, negated where phases has a 0, built
+    #by CUDD in one call
+    def cube(self, bddVars, phases=None):
+        length = len(bddVars)
+        if length == 0:
+            return self.getTrue()
+        varArray = pycudd.DdArray(length)
+        phaseArray = pycudd.IntArray(length)
+        for i, var in enumerate(bddVars):
+            varArray[i] = var
+            phaseArray[i] = 1 if phases is None else phases[i]
+        return self._bddManager.ComputeCube(varArray, phaseArray, length)
 
     def and_no_deref(self, left, right):
         return left & right
@@ -145,19 +213,75 @@ class PyCuddBDD(BDDBase):
     def createDdArray(self, length):
         return pycudd.DdArray(length)
 
+    #the permutations are kept by the indices of their variables, the
+    #arrays of one are built once
     def createPermutation(self, from_, to):
+        key = (tuple(var.NodeReadIndex() for var in from_),
+            tuple(var.NodeReadIndex() for var in to))
+        perm = self._permutations.get(key)
+        if perm is not None:
+            return perm
         length = len(from_)
         fromArray = pycudd.DdArray(length)
         toArray = pycudd.DdArray(length)
-        i = 0
-        for var in from_:
+        for i, var in enumerate(from_):
             fromArray[i] = var
-            i = i + 1
-        i = 0
-        for var in to:
+        for i, var in enumerate(to):
             toArray[i] = var
-            i = i + 1
-        return [fromArray, toArray, length]
+        perm = [fromArray, toArray, length]
+        self._permutations[key] = perm
+        return perm
+
+    #the indices of the variables the bdd depends on
+    def support(self, bdd):
+        #the first entry of SupportIndex is the return code
+        supportIndex = bdd.SupportIndex()
+        return [i for i in range(len(supportIndex) - 1) if supportIndex[i + 1]]
+
+    def getVarIndex(self, var):
+        return var.NodeReadIndex()
+
+    def nodeCount(self, bdd):
+        return bdd.DagSize()
+
+    #the number of nodes of several bdds, shared nodes counted once
+    def sharingSize(self, bdds):
+        if not bdds:
+            return 0
+        bddArray = pycudd.DdArray(len(bdds))
+        for i, bdd in enumerate(bdds):
+            bddArray[i] = bdd
+        return self._bddManager.SharingSize(bddArray, len(bdds))
+
+    #the counters of the manager, the reordering time is in seconds and
+    #the peak of live nodes is the peak since the manager was created
+    def getStats(self):
+        manager = self._bddManager
+        return {'peak_live_nodes': manager.ReadPeakLiveNodeCount(),
+            'live_nodes': manager.ReadNodeCount(),
+            'reorderings': manager.ReadReorderings(),
+            'reordering_time': manager.ReadReorderingTime() / 1000.0,
+            'cache_hits': manager.ReadCacheHits(),
+            'cache_lookups': manager.ReadCacheLookUps(),
+            'memory': manager.ReadMemoryInUse()}
+
+    #a small bdd that agrees with bdd wherever care holds
+    def restrict(self, bdd, care):
+        return bdd.Restrict(care)
+
+    def loadDddmp(self, filePath, mode, composeIndices):
+        composeIds = pycudd.IntArray(len(composeIndices))
+        for k, index in enumerate(composeIndices):
+            composeIds[k] = index
+        roots = pycudd.DdArray(1)
+        if roots.ArrayLoad(DDDMP_ROOT_MATCHLIST, None, DDDMP_VAR_COMPOSEIDS,
+            None, None, composeIds, ord(mode), filePath) != 1:
+            raise ValueError('cannot load the DDDMP file ' + filePath)
+        return roots[0]
+
+    #substitute every variable i of the bdd by vector[i]
+    def vectorCompose(self, bdd, vector):
+        return bdd.VectorCompose(vector)
 
     def replace_no_deref(self, bdd, perm):
         #[fromArray, toArray, length]
@@ -184,49 +308,19 @@ class PyCuddBDD(BDDBase):
         return bdd.PickOneMinterm(varArray, self.varsNum)
 
     def getAllVarNegative(self):
-        cube = self._bddManager.ReadOne()
-        for vr in self.vars:
-            cube = self.and_no_deref(cube, self.not_no_deref(vr))
-        return cube
+        return self.cube(self.vars, [0] * self.varsNum)
 
+    #the first cube of the bdd with the free variables at 0
     def getMintermBitVector(self, bdd):
-        satAsBDD = self.getMintermBDD(bdd)
-        bitVec = ''
-        for vr in self.vars:
-            temp = satAsBDD & vr
-            if(temp == satAsBDD):
-                bitVec += '1'
-            else:
-                bitVec += '0'
-            self.deref(temp)
-        return bitVec
+        for cube in self.iterCubes(bdd):
+            return cube.replace('-', '0')
+        return '0' * self.varsNum
+
+    #the cubes of CUDD's cube generator, whose values are 0, 1 and 2 for
+    #the free variables
+    def iterCubes(self, bdd):
+        for cube in pycudd.ForeachCubeIterator(bdd):
+            yield ''.join(CUBE_VALUES[value] for value in cube[:self.varsNum])
 
     def satAssignCount(self, bdd):
         return bdd.CountMinterm(self.varsNum)
-
-
-
-#'typedef enum {
-#    CUDD_REORDER_SAME,
-#    CUDD_REORDER_NONE,
-#    CUDD_REORDER_RANDOM,
-#    CUDD_REORDER_RANDOM_PIVOT,
-#    CUDD_REORDER_SIFT,
-#    CUDD_REORDER_SIFT_CONVERGE,
-#    CUDD_REORDER_SYMM_SIFT,
-#    CUDD_REORDER_SYMM_SIFT_CONV,
-#    CUDD_REORDER_WINDOW2,
-#    CUDD_REORDER_WINDOW3,
-#    CUDD_REORDER_WINDOW4,
-#    CUDD_REORDER_WINDOW2_CONV,
-#    CUDD_REORDER_WINDOW3_CONV,
-#    CUDD_REORDER_WINDOW4_CONV,
-#    CUDD_REORDER_GROUP_SIFT,
-#    CUDD_REORDER_GROUP_SIFT_CONV,
-#    CUDD_REORDER_ANNEALING,
-#    CUDD_REORDER_GENETIC,
-#    CUDD_REORDER_LINEAR,
-#    CUDD_REORDER_LINEAR_CONVERGE,
-#    CUDD_REORDER_LAZY_SIFT,
-#    CUDD_REORDER_EXACT
-#} Cudd_ReorderingType;
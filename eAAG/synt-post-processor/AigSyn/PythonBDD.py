@@ -0,0 +1,497 @@
+#!/usr/bin/env python
+from BDDBase import BDDBase
+from subprocess import call
+
+#the terminal nodes
+FALSE = 0
+TRUE = 1
+
+#an operation cache is dropped when it gets larger than this
+CACHE_LIMIT = 1 << 18
+
+
+#a reduced ordered bdd package in plain python, for tiny circuits and for
+#machines without CUDD
+#a bdd is the integer of its root node, nodes are never freed and there
+#is no dynamic reordering, the variable order can only be changed while
+#no bdd but the variables exists
+#the recursions go one level deeper per variable, the circuits must stay
+#well below the recursion limit of python in number of variables
+class PythonBDD(BDDBase):
+
+    def __init__(self, config=None):
+        #the settings of CUDD do not apply
+        self.config = config
+        #per node, the terminals have the variable -1
+        self._nodeVars = [-1, -1]
+        self._lows = [FALSE, TRUE]
+        self._highs = [FALSE, TRUE]
+        self._unique = dict()  # (var, low, high) -> node
+        self._levels = []  # per variable
+        self._caches = dict()  # operation -> dict
+        self._cacheLookups = 0
+        self._cacheHits = 0
+        self.varsNum = 0
+        self.vars = []
+
+    #the node of (var, low, high), created if it does not exist
+    def makeNode(self, var, low, high):
+        if low == high:
+            return low
+        key = (var, low, high)
+        node = self._unique.get(key)
+        if node is None:
+            node = len(self._nodeVars)
+            self._nodeVars.append(var)
+            self._lows.append(low)
+            self._highs.append(high)
+            self._unique[key] = node
+        return node
+
+    def getLevel(self, node):
+        var = self._nodeVars[node]
+        if var < 0:
+            return self.varsNum
+        return self._levels[var]
+
+    #the cofactors of node for the variable at level
+    def getCofactors(self, node, level):
+        if self.getLevel(node) != level:
+            return node, node
+        return self._lows[node], self._highs[node]
+
+    def getCache(self, operation):
+        cache = self._caches.get(operation)
+        if cache is None or len(cache) > CACHE_LIMIT:
+            cache = self._caches[operation] = dict()
+        return cache
+
+    def lookUp(self, cache, key):
+        self._cacheLookups += 1
+        result = cache.get(key)
+        if result is not None:
+            self._cacheHits += 1
+        return result
+
+    def getTrue(self):
+        return TRUE
+
+    def getFalse(self):
+        return FALSE
+
+    def getNotTrue(self):
+        return FALSE
+
+    def getNotOne(self):
+        return FALSE
+
+    def createVar(self):
+        self._levels.append(self.varsNum)
+        newVar = self.makeNode(self.varsNum, FALSE, TRUE)
+        self.vars.append(newVar)
+        self.varsNum += 1
+        return newVar
+
+    def getVars(self):
+        return self.vars
+
+    #order[level] is the index of the variable at that level and must list
+    #every variable
+    def setVarOrder(self, order):
+        if len(self._nodeVars) != 2 + self.varsNum:
+            raise RuntimeError('could not apply the variable order')
+        if sorted(order) != list(range(self.varsNum)):
+            raise RuntimeError('could not apply the variable order')
+        for level, index in enumerate(order):
+            self._levels[index] = level
+
+    #there is no reordering, nothing to keep together
+    def groupVars(self, index, size):
+        pass
+
+    def draw(self, bddName, bdd):
+        lines = ['digraph bdd {']
+        for node in self.getNodes([bdd]):
+            if node <= TRUE:
+                lines.append('  n%d [shape=box,label="%d"];' % (node, node))
+                continue
+            lines.append('  n%d [label="x%d"];' % (node,
+                self._nodeVars[node]))
+            lines.append('  n%d -> n%d [style=dashed];' % (node,
+                self._lows[node]))
+            lines.append('  n%d -> n%d;' % (node, self._highs[node]))
+        lines.append('}')
+        dotFile = open("out.dot", 'w')
+        dotFile.write('\n'.join(lines) + '\n')
+        dotFile.close()
+        call(["dot", "-Tjpg", "out.dot", "-o", bddName + ".jpg"])
+
+    #nodes are never freed
+    def ref(self, bdd):
+        pass
+
+    def deref(self, bdd):
+        pass
+
+    #if f then g else h
+    def ite(self, f, g, h):
+        if f == TRUE:
+            return g
+        if f == FALSE:
+            return h
+        if g == h:
+            return g
+        if g == TRUE and h == FALSE:
+            return f
+        cache = self.getCache('ite')
+        key = (f, g, h)
+        result = self.lookUp(cache, key)
+        if result is not None:
+            return result
+        level = min(self.getLevel(f), self.getLevel(g), self.getLevel(h))
+        f0, f1 = self.getCofactors(f, level)
+        g0, g1 = self.getCofactors(g, level)
+        h0, h1 = self.getCofactors(h, level)
+        var = f if self.getLevel(f) == level else\
+            g if self.getLevel(g) == level else h
+        result = self.makeNode(self._nodeVars[var], self.ite(f0, g0, h0),
+            self.ite(f1, g1, h1))
+        cache[key] = result
+        return result
+
+    def andTo(self, left, right):
+        return self.ite(left, right, FALSE)
+
+    #the conjunction of the bdds, pairwise in a balanced tree
+    def andAll(self, bddList):
+        bdds = list(bddList)
+        if not bdds:
+            return TRUE
+        while len(bdds) > 1:
+            paired = [self.ite(left, right, FALSE)
+                for left, right in zip(bdds[::2], bdds[1::2])]
+            if len(bdds) % 2:
+                paired.append(bdds[-1])
+            bdds = paired
+        return bdds[0]
+
+    #the conjunction of the variables, negated where phases has a 0, built
+    #from the bottom level up one node per variable
+    def cube(self, bddVars, phases=None):
+        if phases is None:
+            phases = [1] * len(bddVars)
+        literals = sorted(zip((self.getLevel(var) for var in bddVars),
+            (self._nodeVars[var] for var in bddVars), phases), reverse=True)
+        cube = TRUE
+        for level, var, phase in literals:
+            #a variable twice with both phases is unsatisfiable
+            if self.getLevel(cube) == level:
+                if (self._highs[cube] != FALSE) != bool(phase):
+                    return FALSE
+                continue
+            if phase:
+                cube = self.makeNode(var, FALSE, cube)
+            else:
+                cube = self.makeNode(var, cube, FALSE)
+        return cube
+
+    def and_no_deref(self, left, right):
+        return self.ite(left, right, FALSE)
+
+    def and_(self, left, right):
+        return self.ite(left, right, FALSE)
+
+    def orTo(self, left, right):
+        return self.ite(left, TRUE, right)
+
+    def or_no_deref(self, left, right):
+        return self.ite(left, TRUE, right)
+
+    def or_(self, left, right):
+        return self.ite(left, TRUE, right)
+
+    def not_no_deref(self, bdd):
+        return self.ite(bdd, FALSE, TRUE)
+
+    def not_(self, bdd):
+        return self.ite(bdd, FALSE, TRUE)
+
+    def biimpTo(self, left, right):
+        return self.ite(left, right, self.not_no_deref(right))
+
+    def biimp_no_deref(self, left, right):
+        return self.ite(left, right, self.not_no_deref(right))
+
+    def biimp(self, left, right):
+        return self.ite(left, right, self.not_no_deref(right))
+
+    #the variables of a cube, as a set of indices
+    def getCubeVars(self, cube):
+        cubeVars = set()
+        while cube > TRUE:
+            cubeVars.add(self._nodeVars[cube])
+            cube = self._highs[cube] if self._lows[cube] == FALSE\
+                else self._lows[cube]
+        return cubeVars
+
+    #exists the variables of cube. left & right
+    def andExists(self, left, right, cube, cubeVars):
+        if left == FALSE or right == FALSE:
+            return FALSE
+        if left == TRUE and right == TRUE:
+            return TRUE
+        if left == TRUE:
+            return self.existsVars(right, cube, cubeVars)
+        if right == TRUE or left == right:
+            return self.existsVars(left, cube, cubeVars)
+        if left > right:
+            left, right = right, left
+        cache = self.getCache('andExists')
+        key = (left, right, cube)
+        result = self.lookUp(cache, key)
+        if result is not None:
+            return result
+        level = min(self.getLevel(left), self.getLevel(right))
+        left0, left1 = self.getCofactors(left, level)
+        right0, right1 = self.getCofactors(right, level)
+        var = self._nodeVars[left if self.getLevel(left) == level else right]
+        low = self.andExists(left0, right0, cube, cubeVars)
+        if var in cubeVars:
+            if low == TRUE:
+                result = TRUE
+            else:
+                result = self.or_no_deref(low,
+                    self.andExists(left1, right1, cube, cubeVars))
+        else:
+            result = self.makeNode(var, low,
+                self.andExists(left1, right1, cube, cubeVars))
+        cache[key] = result
+        return result
+
+    def existsVars(self, bdd, cube, cubeVars):
+        if bdd <= TRUE:
+            return bdd
+        cache = self.getCache('exists')
+        key = (bdd, cube)
+        result = self.lookUp(cache, key)
+        if result is not None:
+            return result
+        var = self._nodeVars[bdd]
+        low = self.existsVars(self._lows[bdd], cube, cubeVars)
+        if var in cubeVars:
+            if low == TRUE:
+                result = TRUE
+            else:
+                result = self.or_no_deref(low,
+                    self.existsVars(self._highs[bdd], cube, cubeVars))
+        else:
+            result = self.makeNode(var, low,
+                self.existsVars(self._highs[bdd], cube, cubeVars))
+        cache[key] = result
+        return result
+
+    def relProduct_no_deref(self, leftBDD, rightBDD, cube):
+        return self.andExists(leftBDD, rightBDD, cube,
+            self.getCubeVars(cube))
+
+    def relProductTo(self, leftBDD, rightBDD, cube):
+        return self.relProduct_no_deref(leftBDD, rightBDD, cube)
+
+    def relProduct(self, leftBDD, rightBDD, cube):
+        return self.relProduct_no_deref(leftBDD, rightBDD, cube)
+
+    def exists_no_deref(self, bdd, cube):
+        return self.existsVars(bdd, cube, self.getCubeVars(cube))
+
+    def exists(self, bdd, cube):
+        return self.exists_no_deref(bdd, cube)
+
+    def forAll_no_deref(self, bdd, cube):
+        return self.not_no_deref(self.exists_no_deref(
+            self.not_no_deref(bdd), cube))
+
+    def forAll(self, bdd, cube):
+        return self.forAll_no_deref(bdd, cube)
+
+    def createDdArray(self, length):
+        return [None] * length
+
+    def createPermutation(self, from_, to):
+        return [list(from_), list(to), len(from_)]
+
+    #the nodes reachable from the bdds, terminals included
+    def getNodes(self, bdds):
+        visited = set()
+        stack = list(bdds)
+        while stack:
+            node = stack.pop()
+            if node in visited:
+                continue
+            visited.add(node)
+            if node > TRUE:
+                stack.append(self._lows[node])
+                stack.append(self._highs[node])
+        return visited
+
+    #the indices of the variables the bdd depends on
+    def support(self, bdd):
+        return sorted(set(self._nodeVars[node]
+            for node in self.getNodes([bdd]) if node > TRUE))
+
+    def getVarIndex(self, var):
+        return self._nodeVars[var]
+
+    def nodeCount(self, bdd):
+        return len(self.getNodes([bdd]))
+
+    #the number of nodes of several bdds, shared nodes counted once
+    def sharingSize(self, bdds):
+        if not bdds:
+            return 0
+        return len(self.getNodes(bdds))
+
+    #the counters CUDD has, nodes are never freed so every node is live
+    def getStats(self):
+        nbOfNodes = len(self._nodeVars)
+        return {'peak_live_nodes': nbOfNodes,
+            'live_nodes': nbOfNodes,
+            'reorderings': 0,
+            'reordering_time': 0.0,
+            'cache_hits': self._cacheHits,
+            'cache_lookups': self._cacheLookups,
+            'memory': 0}
+
+    #a small bdd that agrees with bdd wherever care holds, the restrict
+    #operator of Coudert and Madre
+    def restrict(self, bdd, care):
+        if care == FALSE:
+            return FALSE
+        if care == TRUE or bdd <= TRUE:
+            return bdd
+        if bdd == care:
+            return TRUE
+        cache = self.getCache('restrict')
+        key = (bdd, care)
+        result = self.lookUp(cache, key)
+        if result is not None:
+            return result
+        level = self.getLevel(bdd)
+        if self.getLevel(care) < level:
+            #care depends on a variable bdd does not, abstract it
+            result = self.restrict(bdd, self.or_no_deref(self._lows[care],
+                self._highs[care]))
+        else:
+            bdd0, bdd1 = self.getCofactors(bdd, level)
+            care0, care1 = self.getCofactors(care, level)
+            if care0 == FALSE:
+                result = self.restrict(bdd1, care1)
+            elif care1 == FALSE:
+                result = self.restrict(bdd0, care0)
+            else:
+                result = self.makeNode(self._nodeVars[bdd],
+                    self.restrict(bdd0, care0), self.restrict(bdd1, care1))
+        cache[key] = result
+        return result
+
+    #substitute every variable i of the bdd by vector[i], all at once
+    def vectorCompose(self, bdd, vector):
+        return self.compose(bdd, vector, dict())
+
+    def compose(self, bdd, vector, cache):
+        if bdd <= TRUE:
+            return bdd
+        result = cache.get(bdd)
+        if result is not None:
+            return result
+        result = self.ite(vector[self._nodeVars[bdd]],
+            self.compose(self._highs[bdd], vector, cache),
+            self.compose(self._lows[bdd], vector, cache))
+        cache[bdd] = result
+        return result
+
+    #swap the variables of perm, [from, to, length]
+    def replace_no_deref(self, bdd, perm):
+        vector = list(self.vars)
+        for fromVar, toVar in zip(perm[0], perm[1]):
+            vector[self._nodeVars[fromVar]] = toVar
+            vector[self._nodeVars[toVar]] = fromVar
+        return self.vectorCompose(bdd, vector)
+
+    def replace(self, bdd, perm):
+        return self.replace_no_deref(bdd, perm)
+
+    def getSatAssign(self, bdd):
+        pass
+
+    #per variable 1 or 0 for one satisfying assignment, None for an
+    #unsatisfiable bdd, the variables the path does not test are 0
+    def getMinterm(self, bdd):
+        if bdd == FALSE:
+            return None
+        values = [0] * self.varsNum
+        while bdd > TRUE:
+            if self._highs[bdd] != FALSE:
+                values[self._nodeVars[bdd]] = 1
+                bdd = self._highs[bdd]
+            else:
+                bdd = self._lows[bdd]
+        return values
+
+    #returns a BDD that represents a single satisfying assignment
+    def getMintermBDD(self, bdd):
+        values = self.getMinterm(bdd)
+        if values is None:
+            return FALSE
+        cube = TRUE
+        for vr, value in zip(self.vars, values):
+            if not value:
+                vr = self.not_no_deref(vr)
+            cube = self.and_no_deref(cube, vr)
+        return cube
+
+    def getMintermBitVector(self, bdd):
+        values = self.getMinterm(bdd)
+        if values is None:
+            return '0' * self.varsNum
+        return ''.join(str(value) for value in values)
+
+    #the paths to the true terminal, low edges first
+    def iterCubes(self, bdd):
+        path = []  # (var, value) of the edges to the node
+        stack = [(bdd, 0, None, None)]  # node, length of its path, edge
+        while stack:
+            node, length, var, value = stack.pop()
+            del path[length:]
+            if var is not None:
+                path.append((var, value))
+                length += 1
+            if node == FALSE:
+                continue
+            if node == TRUE:
+                values = ['-'] * self.varsNum
+                for var, value in path:
+                    values[var] = value
+                yield ''.join(values)
+                continue
+            var = self._nodeVars[node]
+            stack.append((self._highs[node], length, var, '1'))
+            stack.append((self._lows[node], length, var, '0'))
+
+    #the number of assignments to all the variables satisfying the bdd
+    def satAssignCount(self, bdd):
+        return float(self.countPaths(bdd, dict()) << self.getLevel(bdd))
+
+    #the number of assignments to the variables from the level of bdd on
+    def countPaths(self, bdd, cache):
+        if bdd <= TRUE:
+            return bdd
+        result = cache.get(bdd)
+        if result is not None:
+            return result
+        level = self.getLevel(bdd)
+        result = 0
+        for child in (self._lows[bdd], self._highs[bdd]):
+            result += self.countPaths(child, cache) <<\
+                (self.getLevel(child) - level - 1)
+        cache[bdd] = result
+        return result
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+import os
+import resource
+import time
+
+#the exit status of CompetitionTest.py when a budget is used up
+RESOURCE_OUT_STATUS = 3
+
+
+class ResourceOut(Exception):
+    pass
+
+
+#gives up a check once it used its budget of cpu time, live nodes or
+#memory, the caller can then hand the rest of its time to another checker
+#instead of being killed by ulimit
+#check is called between bdd operations, the budgets are looked at every
+#interval seconds only so that it can be called for every gate
+#CUDD's own node limit can not be used, pycudd hands the NULL it returns
+#on to the next operation, which crashes
+#the cpu time is that of the process since it started, the memory its peak
+#resident size
+class ResourceGovernor(object):
+
+    def __init__(self, bddManager, timeBudget=None, nodeBudget=None,
+        memoryBudget=None, interval=0.1):
+        self.bddManager = bddManager
+        self.timeBudget = timeBudget  # cpu seconds
+        self.nodeBudget = nodeBudget  # live nodes
+        self.memoryBudget = memoryBudget  # bytes
+        self.interval = interval
+        self._nextCheck = 0.0
+        self._limited = timeBudget is not None or nodeBudget is not None\
+            or memoryBudget is not None
+
+    def getCpuTime(self):
+        times = os.times()
+        return times[0] + times[1]
+
+    def check(self):
+        if not self._limited:
+            return
+        now = time.time()
+        if now < self._nextCheck:
+            return
+        self._nextCheck = now + self.interval
+        if self.timeBudget is not None and\
+            self.getCpuTime() > self.timeBudget:
+            raise ResourceOut('the time budget of ' + str(self.timeBudget) +
+                ' seconds is used up')
+        if self.nodeBudget is not None and self.bddManager is not None and\
+            self.bddManager.getStats()['live_nodes'] > self.nodeBudget:
+            raise ResourceOut('the budget of ' + str(self.nodeBudget) +
+                ' live nodes is used up')
+        #ru_maxrss is in kilobytes
+        if self.memoryBudget is not None and resource.getrusage(
+            resource.RUSAGE_SELF).ru_maxrss * 1024 > self.memoryBudget:
+            raise ResourceOut('the memory budget of ' +
+                str(self.memoryBudget // (1024 * 1024)) + ' MB is used up')
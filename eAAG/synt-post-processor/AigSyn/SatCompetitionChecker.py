@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+from AigerParser import *
+from AigerCnf import AigerCnfEncoder
+from CdclSolver import CdclSolver
+from PhaseStats import PhaseStats
+
+
+#the checks of CompetitionTrnsSys.ValidateWinningRegion as SAT queries,
+#the strategy, the winning region W(x) and W over the next state
+#functions W(f(x, i)) are encoded once into one incremental solver,
+#each check is a call with its own assumptions:
+#init in W: W(x) & x = 0 must be satisfiable
+#W & Bad = 0: W(x) & bad(x, i) must be unsatisfiable
+#W is a fixed point: W(x) & !W(f(x, i)) must be unsatisfiable
+class SatCompetitionChecker(object):
+
+    def __init__(self, aiger, stats=None):
+        if stats is None:
+            stats = PhaseStats(None)
+        self.stats = stats
+        self._aig = aiger
+        self.solver = CdclSolver()
+        self._true = self.solver.newVar()
+        self.solver.addClause([self._true])
+        self.stats.start('cnf')
+        self._strategy = AigerCnfEncoder(aiger, self.solver, self._true)
+        for inpt in aiger.getInputVars():
+            self._strategy.setLiteral(inpt, self.solver.newVar())
+        self._latchLits = []  # solver literals of the latches
+        for lit in aiger.latchLits:
+            latchLit = self.solver.newVar()
+            self._strategy.setLiteral(lit, latchLit)
+            self._latchLits.append(latchLit)
+        #there must be one output in the aiger files we target
+        self._badLit = self._strategy.getLiteral(aiger.getOutputVars()[0])
+        self.stats.stop('cnf')
+
+    #the inputs of the winning region are the latches of the strategy,
+    #in the order of the files, as in ReadWinningRegionDynamic
+    def encodeWinningRegion(self, winRegAigFile):
+        wrInputs = winRegAigFile.getInputVars()
+        if len(wrInputs) > len(self._latchLits):
+            raise ValueError('the winning region has more inputs than the '
+                'strategy has latches')
+        current = AigerCnfEncoder(winRegAigFile, self.solver, self._true)
+        following = AigerCnfEncoder(winRegAigFile, self.solver, self._true)
+        for k, inpt in enumerate(wrInputs):
+            current.setLiteral(inpt, self._latchLits[k])
+            following.setLiteral(inpt,
+                self._strategy.getLiteral(self._aig.latchNexts[k]))
+        outputVar = winRegAigFile.getOutputVars()[0]
+        return current.getLiteral(outputVar), following.getLiteral(outputVar)
+
+    def ValidateWinningRegion(self, winRegAigFile):
+        self.stats.start('cnf')
+        winLit, nextWinLit = self.encodeWinningRegion(winRegAigFile)
+        self.stats.stop('cnf')
+        self.stats.setValue('cnf', 'vars', self.solver.nbOfVars)
+        self.stats.setValue('cnf', 'clauses', self.solver.getNbOfClauses())
+        self.stats.start('fixpoint')
+        try:
+            return self.checkWinningRegion(winLit, nextWinLit)
+        finally:
+            self.stats.stop('fixpoint')
+            self.stats.setValue('fixpoint', 'conflicts', self.solver.conflicts)
+            self.stats.setValue('fixpoint', 'decisions', self.solver.decisions)
+            self.stats.setValue('fixpoint', 'propagations',
+                self.solver.propagations)
+
+    def checkWinningRegion(self, winLit, nextWinLit):
+        initial = [lit ^ 1 for lit in self._latchLits]
+        if not self.solver.solve([winLit] + initial):
+            return 'False:initial state is not in the winning region!'
+        if self.solver.solve([winLit, self._badLit]):
+            return 'False:Winning region contains an error state!'
+        if self.solver.solve([winLit, nextWinLit ^ 1]):
+            return 'False:The winning region is not a fixed point!!'
+        return 'True'
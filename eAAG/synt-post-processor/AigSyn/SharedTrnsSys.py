@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+from AigerParser import *
+from CompetitionTrnsSys import CompetitionTrnsSys
+from VarOrdering import VarOrdering
+from array import array
+
+#the strategies of one benchmark have the same uncontrollable inputs, the
+#latches of the specification first and most of its and gates, only the
+#logic of the solver differs
+#the strategies of a benchmark are checked one after the other in a single
+#manager: the inputs and latches at the same position get the same
+#variables, and the bdd of an and gate is kept from one strategy to the
+#next when both have a gate with the same structure over those variables,
+#the next state functions of the latches of the specification are then
+#built once per benchmark
+
+
+#numbers the and gates of several aiger files so that two gates computing
+#the same and over the same variables get the same node, whatever their
+#literals in the files
+#an edge is 2 * node + 1 if negated, node 0 is the constant false, so the
+#edges of the constants are the aiger literals 0 and 1
+class StructuralHash(object):
+
+    def __init__(self):
+        self._varNodes = dict()  # variable index -> node
+        self._andNodes = dict()  # (edge, edge) -> node
+        self._nextNode = 1
+        self._used = set()  # nodes seen since the last release
+
+    def getNewNode(self):
+        node = self._nextNode
+        self._nextNode += 1
+        return node
+
+    def getVarNode(self, varIndex):
+        node = self._varNodes.get(varIndex)
+        if node is None:
+            node = self.getNewNode()
+            self._varNodes[varIndex] = node
+        return node
+
+    def getAndNode(self, left, right):
+        key = (left, right) if left <= right else (right, left)
+        node = self._andNodes.get(key)
+        if node is None:
+            node = self.getNewNode()
+            self._andNodes[key] = node
+        self._used.add(node)
+        return node
+
+    #the edge of the positive literal of every variable of aig, the leaves
+    #are the variables of their bdds in bdds, -1 for the variables without
+    #a bdd and the gates over them
+    def getEdges(self, aig, getVarIndex, bdds):
+        edges = array('i', [-1]) * (aig.getMaxVarIndex() + 1)
+        edges[0] = 0
+        for lit in list(aig.inputLits) + list(aig.latchLits):
+            if bdds[lit] is not None:
+                edges[lit >> 1] = 2 * self.getVarNode(getVarIndex(bdds[lit]))
+        andLhs = aig.andLhs
+        andRhs0 = aig.andRhs0
+        andRhs1 = aig.andRhs1
+        for index in aig.getTopologicalOrder():
+            left = edges[andRhs0[index] >> 1]
+            right = edges[andRhs1[index] >> 1]
+            if left >= 0 and right >= 0:
+                edges[andLhs[index] >> 1] = 2 * self.getAndNode(
+                    left ^ (andRhs0[index] & 1), right ^ (andRhs1[index] & 1))
+        return edges
+
+    def isUsed(self, node):
+        return node in self._used
+
+    #forget the gates not seen since the last release
+    def release(self):
+        self._andNodes = dict((key, node)
+            for key, node in self._andNodes.items() if node in self._used)
+        self._used = set()
+
+
+#the manager of a benchmark: its variables by position, created on demand,
+#and the bdds of the gates by node
+#the order of the variables is the static order of the first strategy,
+#the variables of the positions it does not have are added at the bottom,
+#the dynamic reorderings carry over from one strategy to the next
+#the bdds of the gates a strategy did not use are released once it is
+#checked, so the cache holds the gates of the last strategy, those of the
+#specification among them
+class SharedBdds(object):
+
+    def __init__(self, bdd):
+        self.bddManager = bdd
+        self.inputVars = []  # by position
+        self.latchVars = []  # by position
+        self.primedVars = []  # by position
+        self.structure = StructuralHash()
+        self._bdds = dict()  # node -> bdd
+
+    #create the variables of the positions that have none, each latch with
+    #its primed variable right after it, returns the number of latches added
+    def addVars(self, nbOfInputs, nbOfLatches):
+        while len(self.inputVars) < nbOfInputs:
+            self.inputVars.append(self.bddManager.createVar())
+        added = max(0, nbOfLatches - len(self.latchVars))
+        while len(self.latchVars) < nbOfLatches:
+            self.latchVars.append(self.bddManager.createVar())
+            self.primedVars.append(self.bddManager.createVar())
+        return added
+
+    def getBdd(self, node):
+        return self._bdds.get(node)
+
+    def setBdd(self, node, bdd):
+        self._bdds[node] = bdd
+
+    def getNbOfBdds(self):
+        return len(self._bdds)
+
+    #called once a strategy is checked
+    def release(self):
+        self._bdds = dict((node, bdd) for node, bdd in self._bdds.items()
+            if self.structure.isUsed(node))
+        self.structure.release()
+
+
+#a CompetitionTrnsSys whose variables and gate bdds come from a SharedBdds
+class SharedCompetitionTrnsSys(CompetitionTrnsSys):
+
+    def __init__(self, aiger, shared, imageMethod='monolithic',
+        ordering='interleave', stats=None, governor=None):
+        self.shared = shared
+        self._edges = dict()  # id(aig) -> edges, see StructuralHash
+        self._nbOfCachedGates = 0  # gates taken from the cache
+        CompetitionTrnsSys.__init__(self, aiger, shared.bddManager,
+            imageMethod, ordering, stats, governor)
+
+    def getBDDFromAigerFile(self):
+        fresh = not self.bddManager.getVars()
+        added = self.shared.addVars(self._nbOfInputs, self._nbOfLatches)
+        for inp, var in zip(self._inputVars, self.shared.inputVars):
+            self._vars[inp] = var
+        for lch, var, primeVar in zip(self._latches, self.shared.latchVars,
+            self.shared.primedVars):
+            self._vars[lch.getLeftVar()] = var
+            self._primedVars[lch.getLeftVar()] = primeVar
+        #the bit vectors are over every variable of the manager
+        getVarIndex = self.bddManager.getVarIndex
+        self.inputIndicies = [getVarIndex(self._vars[inp])
+            for inp in self._inputVars]
+        self.pntIndices = [getVarIndex(self._vars[lch.getLeftVar()])
+            for lch in self._latches]
+        #the variables of the other strategies stay as they are
+        bddVars = self.bddManager.getVars()
+        self.nxtTimFct = self.bddManager.createDdArray(len(bddVars))
+        for var in bddVars:
+            self.nxtTimFct[getVarIndex(var)] = var
+        if fresh:
+            self.applyVarOrder()
+        elif added and VarOrdering(self._aig, self.ordering).isInterleaved():
+            for var in self.shared.latchVars[-added:]:
+                self.bddManager.groupVars(getVarIndex(var), 2)
+        self.addLiveLatches(self._cones.getLiveLatches(), [self._outputVar])
+        self._trnsFct = self.bddManager.getTrue()
+        outputBDD = self.getLiteralBdd(self._vars, self._outputVar)
+        self._outBdd = self.bddManager.exists_no_deref(outputBDD,
+            self.getInputCube())
+
+    #the gates with a bdd in the cache are taken from it and not built, the
+    #gates whose bdds are kept once built, the roots, are added to it
+    #the other gates are released as they are built, keeping them would
+    #cost more in reordering than building them again
+    def buildAndGates(self, aig, bdds, pinned=(), roots=None):
+        edges = self._edges.get(id(aig))
+        if edges is None:
+            edges = self.shared.structure.getEdges(aig,
+                self.bddManager.getVarIndex, bdds)
+            self._edges[id(aig)] = edges
+        andLhs = aig.andLhs
+        cached = set()
+        for index in range(len(andLhs)):
+            lhs = andLhs[index]
+            if bdds[lhs] is None and edges[lhs >> 1] >= 0:
+                bdds[lhs] = self.shared.getBdd(edges[lhs >> 1] >> 1)
+                if bdds[lhs] is not None:
+                    cached.add(index)
+        count = CompetitionTrnsSys.buildAndGates(self, aig, bdds, pinned,
+            roots)
+        for index in range(len(andLhs)):
+            lhs = andLhs[index]
+            if bdds[lhs] is not None and edges[lhs >> 1] >= 0:
+                self.shared.setBdd(edges[lhs >> 1] >> 1, bdds[lhs])
+        for lit in roots or ():
+            if aig.getAndGateIndex(lit) in cached:
+                self._nbOfCachedGates += 1
+        self.stats.setValue('gates', 'cached_gates', self._nbOfCachedGates)
+        return count
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+
+from AigerParser import *
+import argparse
+import sys
+import os.path
+
+#numpy is optional, without it nothing is simulated
+try:
+    from AigerSimulator import StrategySimulation
+except ImportError:
+    StrategySimulation = None
+
+#random simulation of a strategy (and its winning region) before the
+#model checking, prints False, the reason and a counterexample when it
+#finds an error, otherwise Unknown as simulation proves nothing
+argParser = argparse.ArgumentParser(
+    description='Random simulation pre-pass for SYNTCOMP strategies')
+argParser.add_argument('strategy')
+argParser.add_argument('wregion', nargs='?')
+argParser.add_argument('--steps', type=int, default=64,
+    help='length of the simulated traces (default: 64)')
+argParser.add_argument('--words', type=int, default=16,
+    help='64 bit words per signal, the number of traces / 64 '
+    '(default: 16)')
+argParser.add_argument('--time-limit', type=float, metavar='SECONDS',
+    help='stop simulating after this many seconds')
+argParser.add_argument('--seed', type=int, default=0,
+    help='seed of the random inputs (default: 0)')
+args = argParser.parse_args()
+
+if StrategySimulation is None:
+    print 'Unknown'
+    sys.exit('numpy is not available, nothing was simulated')
+
+for fileName in (args.strategy, args.wregion):
+    if fileName is not None and not os.path.isfile(fileName):
+        print 'Unknown'
+        sys.exit(fileName + ' cannot be found!')
+
+try:
+    aig = AigerFileParser(args.strategy).parse()
+    winRegAig = None
+    if args.wregion is not None:
+        winRegAig = AigerFileParser(args.wregion).parse()
+    simulation = StrategySimulation(aig, winRegAig, args.words, args.seed)
+    result = simulation.run(args.steps, args.time_limit)
+except Exception as ex:
+    #the model checkers report malformed files
+    print 'Unknown'
+    sys.exit('An Error happenned during the simulation: ' + str(ex))
+
+if result is None:
+    print 'Unknown'
+    print 'no error in ' + str(simulation.steps) + ' steps of '\
+        + str(args.words * 64) + ' random traces'
+else:
+    for line in result:
+        print line
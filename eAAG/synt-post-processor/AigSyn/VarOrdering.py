@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+from AigerParser import *
+from array import array
+import heapq
+
+#the static variable orders, applied before any and gate bdd is built
+#creation: inputs, latches and primed variables in the order of the file
+#dfs: inputs and latches in depth first fan-in order from the output and
+#the next state functions, primed variables after them
+#interleave: the dfs order with every primed variable right after its latch
+#support: latches with a shared support are placed next to each other,
+#every primed variable right after its latch
+ORDERINGS = ('creation', 'dfs', 'interleave', 'support')
+
+
+#computes the order of the inputs and latches of an aiger file from its
+#structure only, no bdd is needed
+class VarOrdering(object):
+
+    def __init__(self, aiger, ordering='interleave'):
+        if ordering not in ORDERINGS:
+            raise ValueError('unknown variable ordering ' + str(ordering))
+        self._aig = aiger
+        self.ordering = ordering
+
+    #whether each primed variable goes right after its latch
+    def isInterleaved(self):
+        return self.ordering in ('interleave', 'support')
+
+    #the input and latch literals from the top to the bottom of the order
+    def getOrder(self):
+        if self.ordering == 'creation':
+            return list(self._aig.inputLits) + list(self._aig.latchLits)
+        if self.ordering == 'support':
+            return self.getSupportOrder()
+        return self.getFaninOrder()
+
+    #the inputs and latches reached from root in depth first order, the
+    #left input of an and gate is visited before the right one, variables
+    #whose entry in visited is mark are skipped, the others get marked
+    def getFanin(self, root, visited, mark=1):
+        aig = self._aig
+        varKinds = aig.varKinds
+        varPositions = aig.varPositions
+        found = []
+        stack = [root >> 1]
+        while stack:
+            var = stack.pop()
+            if visited[var] == mark:
+                continue
+            visited[var] = mark
+            kind = varKinds[var]
+            if kind == VAR_AND:
+                index = varPositions[var]
+                #the right input is pushed first to be visited last
+                stack.append(aig.andRhs1[index] >> 1)
+                stack.append(aig.andRhs0[index] >> 1)
+            elif kind != VAR_CONSTANT:
+                found.append(var << 1)
+        return found
+
+    #the output cone comes first, every latch placed in the order brings
+    #the cone of its next state function after it, so latches depending on
+    #each other stay close
+    def getFaninOrder(self):
+        aig = self._aig
+        visited = bytearray(aig.maxVarIndex + 1)
+        order = []
+        roots = list(aig.outputLits)
+        i = 0
+        while True:
+            while i < len(roots):
+                for lit in self.getFanin(roots[i], visited):
+                    order.append(lit)
+                    if aig.varKinds[lit >> 1] == VAR_LATCH:
+                        position = aig.varPositions[lit >> 1]
+                        roots.append(aig.latchNexts[position])
+                i += 1
+            #latches nobody reads, and the inputs only they read
+            unvisited = [lit for lit in aig.latchLits if not visited[lit >> 1]]
+            if not unvisited:
+                break
+            roots.append(unvisited[0])
+        for lit in aig.inputLits:
+            if not visited[lit >> 1]:
+                order.append(lit)
+        return order
+
+    #the next state functions are placed one by one, always the one with
+    #the most support variables already placed, its remaining support
+    #variables and its latch go next
+    def getSupportOrder(self):
+        aig = self._aig
+        nbOfLatches = len(aig.latchLits)
+        placed = bytearray(aig.maxVarIndex + 1)
+        order = []
+
+        def place(lits):
+            for lit in lits:
+                if not placed[lit >> 1]:
+                    placed[lit >> 1] = 1
+                    order.append(lit)
+                    for k in readers.get(lit >> 1, ()):
+                        overlaps[k] += 1
+                        heapq.heappush(heap, (-overlaps[k], k))
+
+        supports = []
+        readers = dict()  # var -> latch positions reading it
+        #marked with the latch position + 1
+        visited = array('i', [0]) * (aig.maxVarIndex + 1)
+        for k in range(nbOfLatches):
+            support = self.getFanin(aig.latchNexts[k], visited, k + 1)
+            supports.append(support)
+            for lit in support:
+                readers.setdefault(lit >> 1, []).append(k)
+        overlaps = [0] * nbOfLatches
+        heap = [(0, k) for k in range(nbOfLatches)]
+        done = bytearray(nbOfLatches)
+        for lit in aig.outputLits:
+            place(self.getFanin(lit, bytearray(aig.maxVarIndex + 1)))
+        while heap:
+            overlap, k = heapq.heappop(heap)
+            #stale entries of latches whose overlap grew since
+            if done[k] or -overlap != overlaps[k]:
+                continue
+            done[k] = 1
+            place(supports[k])
+            place([aig.latchLits[k]])
+        place(aig.inputLits)
+        return order
@@ -1,15 +1,28 @@
 #!/usr/bin/env python2.7
 
 import argparse
+import itertools
 import sys
+import warnings
 from argparse import FileType
+from array import array
 
+# the structural checks of the and gates are vectorised with numpy when it
+# is available, and done gate by gate otherwise
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
-def parse_header(spec_lines):
+# the and gates are read in blocks of this many lines
+BLOCK_LINES = 1 << 16
+
+
+def parse_header(header_line):
     #      M I L O A
     # aag 25 6 0 1 19
     #  0  1  2 3 4 5
-    header_tokens = spec_lines[0].strip().split()
+    header_tokens = header_line.strip().split()
     M = int(header_tokens[1])
     nof_inputs = int(header_tokens[2])
     L = int(header_tokens[3])
@@ -17,13 +30,145 @@ def parse_header(spec_lines):
     A = int(header_tokens[5])
     assert M == L + nof_inputs + A, \
         'M is not the sum of I, L, A'
-    return nof_inputs, nof_outputs
+    return M, nof_inputs, L, nof_outputs, A
+
+
+def read_definition(lines, widths, kind):
+    # the literals of the next definition line, widths are the allowed
+    # numbers of literals
+    l = next(lines, None)
+    assert l is not None, 'Missing ' + kind + ' definitions'
+    tokens = l.split()
+    assert len(tokens) in widths, 'Invalid ' + kind + ' definition ' + \
+        l.strip()
+    return [int(t) for t in tokens]
+
+
+def get_tokens_per_line(text, nof_lines):
+    data = text if isinstance(text, bytes) else \
+        text.encode('latin-1', 'replace')
+    data = numpy.frombuffer(data, dtype=numpy.uint8)
+    newlines = data == 10
+    blanks = newlines | (data == 32) | (data == 9) | (data == 13)
+    # a token starts at a non blank byte after a blank one
+    starts = ~blanks
+    starts[1:] &= blanks[:-1]
+    line_ids = numpy.cumsum(newlines) - newlines
+    return numpy.bincount(line_ids[starts], minlength=nof_lines)
 
 
-def get_inputs(spec_lines):
-    nof_inputs, _ = parse_header(spec_lines)
-    input_lines = spec_lines[1:nof_inputs+1]
-    return set(int(l.strip()) for l in input_lines)
+def read_and_gates_numpy(lines, nof_ands, max_literal):
+    # the and gates as rows lhs rhs0 rhs1, every block of lines is parsed
+    # by numpy at once
+    dtype = numpy.int32 if max_literal < 2 ** 31 else numpy.int64
+    gates = numpy.empty((nof_ands, 3), dtype=dtype)
+    for first in range(0, nof_ands, BLOCK_LINES):
+        count = min(BLOCK_LINES, nof_ands - first)
+        block = list(itertools.islice(lines, count))
+        assert len(block) == count, 'Missing and gate definitions'
+        text = ''.join(block)
+        with warnings.catch_warnings():
+            # numpy warns about text it cannot parse, the count tells
+            warnings.simplefilter('ignore')
+            values = numpy.fromstring(text, dtype=numpy.int64, sep=' ')
+        assert values.size == 3 * count and \
+            (get_tokens_per_line(text, count) == 3).all(), \
+            'Invalid and gate definition'
+        assert ((values >= 0) & (values <= max_literal)).all(), \
+            'And gate literal out of range'
+        gates[first:first + count] = values.reshape((count, 3))
+    return gates[:, 0], gates[:, 1], gates[:, 2]
+
+
+def read_and_gates_python(lines, nof_ands, max_literal):
+    lhs = array('l')
+    rhs0 = array('l')
+    rhs1 = array('l')
+    for _ in range(nof_ands):
+        gate = read_definition(lines, (3,), 'and gate')
+        assert min(gate) >= 0 and max(gate) <= max_literal, \
+            'And gate literal out of range'
+        lhs.append(gate[0])
+        rhs0.append(gate[1])
+        rhs1.append(gate[2])
+    return lhs, rhs0, rhs1
+
+
+def check_literals(inputs, latches, outputs, max_literal):
+    for lit in inputs:
+        assert lit % 2 == 0 and 2 <= lit <= max_literal, \
+            'Invalid input literal ' + str(lit)
+    for latch in latches:
+        assert latch[0] % 2 == 0 and 2 <= latch[0] <= max_literal, \
+            'Invalid latch literal ' + str(latch[0])
+        assert 0 <= latch[1] <= max_literal, \
+            'Latch next-state literal out of range'
+        # an aiger 1.9 reset value
+        assert len(latch) < 3 or latch[2] in (0, 1, latch[0]), \
+            'Invalid latch reset value'
+    for lit in outputs:
+        assert 0 <= lit <= max_literal, 'Output literal out of range'
+
+
+def find_cycle(lhs, rhs0, rhs1):
+    # the left hand side of an and gate on a cycle, None if there is none,
+    # by a depth first search over the gates
+    gate_of = dict((lit >> 1, index) for index, lit in enumerate(lhs))
+    state = bytearray(len(lhs))  # 0 new, 1 on the stack, 2 done
+    for root in range(len(lhs)):
+        if state[root]:
+            continue
+        stack = [root]
+        while stack:
+            index = stack[-1]
+            if state[index] == 0:
+                state[index] = 1
+                for rhs in (rhs0[index], rhs1[index]):
+                    child = gate_of.get(rhs >> 1)
+                    if child is None or state[child] == 2:
+                        continue
+                    if state[child] == 1:
+                        return lhs[child]
+                    stack.append(child)
+            else:
+                state[index] = 2
+                stack.pop()
+    return None
+
+
+def check_and_gates_numpy(max_var, inputs, latches, lhs, rhs0, rhs1):
+    assert not (lhs & 1).any() and (lhs >= 2).all(), \
+        'Invalid and gate literal'
+    defined = numpy.concatenate((
+        numpy.array(inputs, dtype=numpy.int64) >> 1,
+        numpy.array([latch[0] for latch in latches], dtype=numpy.int64) >> 1,
+        lhs >> 1))
+    assert not defined.size or \
+        numpy.bincount(defined, minlength=max_var + 1).max() <= 1, \
+        'Literal defined more than once'
+    # gates whose inputs come before them, as in the binary format, need
+    # no search for cycles
+    lhs_vars = lhs >> 1
+    if ((rhs0 >> 1) < lhs_vars).all() and ((rhs1 >> 1) < lhs_vars).all():
+        return
+    cycle = find_cycle(lhs.tolist(), rhs0.tolist(), rhs1.tolist())
+    assert cycle is None, 'Cycle through and gate ' + str(cycle)
+
+
+def check_and_gates_python(max_var, inputs, latches, lhs, rhs0, rhs1):
+    for lit in lhs:
+        assert lit % 2 == 0 and lit >= 2, 'Invalid and gate literal'
+    seen = bytearray(max_var + 1)
+    for lit in itertools.chain(inputs, (latch[0] for latch in latches),
+                               lhs):
+        assert not seen[lit >> 1], 'Literal defined more than once'
+        seen[lit >> 1] = 1
+    for index in range(len(lhs)):
+        if rhs0[index] >> 1 >= lhs[index] >> 1 or \
+                rhs1[index] >> 1 >= lhs[index] >> 1:
+            cycle = find_cycle(lhs, rhs0, rhs1)
+            assert cycle is None, 'Cycle through and gate ' + str(cycle)
+            return
 
 
 def is_input_symbol_table(l):
@@ -39,76 +184,75 @@ def is_input_symbol_table(l):
     return False
 
 
-def get_input_symbols(spec_lines):
-    start = None
-    end = None
-    for i, l in enumerate(spec_lines):
-        if l.strip()[0] == 'i' and not start:
-            start = i
-        if l.strip() == 'c':
-            end = i
-            break
+def check_metadata_line(l, in_comment):
+    # returns whether the line is inside a metadata block after it
+    if '#!SYNTCOMP' in l:
+        assert not in_comment, 'Invalid nesting of metadata labels'
+        return True
+    elif '#.' in l:
+        assert in_comment, 'Metadata end-label does not have a start'
+        return False
+    return in_comment
+
 
-    symbol_table_lines = spec_lines[start:end]
-    symbol_table = [l for l in symbol_table_lines if is_input_symbol_table(l)]
-    return symbol_table
+def check_structure(M, inputs, latches, outputs, ands):
+    # the literals are in range, every variable is defined once and the
+    # and gates have no cycles, with as many definitions as variables in
+    # the header, so that every literal used, in particular the next
+    # states of the latches, is defined
+    max_literal = 2 * M + 1
+    check_literals(inputs, latches, outputs, max_literal)
+    if numpy is not None:
+        check_and_gates_numpy(M, inputs, latches, *ands)
+    else:
+        check_and_gates_python(M, inputs, latches, *ands)
 
 
-def get_control_inputs(orig_spec_lines):
+def scan_spec(spec_file):
+    # a single pass over the lines of an aag file: the header, the
+    # definitions, the input symbols up to the comment section and the
+    # metadata labels, the and gates are kept in compact arrays for the
+    # structural checks
+    lines = iter(spec_file)
+    M, nof_inputs, L, nof_outputs, A = parse_header(next(lines, ''))
+    max_literal = 2 * M + 1
+    inputs = [read_definition(lines, (1,), 'input')[0]
+              for _ in range(nof_inputs)]
+    latches = [read_definition(lines, (2, 3), 'latch') for _ in range(L)]
+    outputs = [read_definition(lines, (1,), 'output')[0]
+               for _ in range(nof_outputs)]
+    if numpy is not None:
+        ands = read_and_gates_numpy(lines, A, max_literal)
+    else:
+        ands = read_and_gates_python(lines, A, max_literal)
+    check_structure(M, inputs, latches, outputs, ands)
     control_inputs = set()
-    input_symbols = get_input_symbols(orig_spec_lines)
-    for s in input_symbols:
-        # i0 i_1
-        # i1 controllable_1
-        tokens = s.strip().split()
-        if tokens[1].startswith('controllable'):
-            input_index = int(tokens[0][1:])
-            input_literal = int(orig_spec_lines[1+input_index])
-            control_inputs.add(input_literal)
-    return control_inputs
-
-
-def get_index_of_last_definition(spec_lines):
-    for i, l in enumerate(spec_lines):
-        if l.strip().startswith('i'):
-            return i
-    assert 0
-
-
-def get_uncontrol_definitions(control_inputs, spec_lines):
-    # TODO: what happens if some signal is short-circuited?
-    uncontrol_definitions = set()
-
-    nof_inputs, nof_outputs = parse_header(spec_lines)
-    definitions_only = spec_lines[(nof_inputs + nof_outputs):
-                                  get_index_of_last_definition(spec_lines)]
-    for d in definitions_only:
-        int_tokens = set(int(x) for x in d.strip().split())
-        if int_tokens.isdisjoint(control_inputs):
-            uncontrol_definitions.add(d)
-    return uncontrol_definitions
-
-
-def check_valid_metadata(spec_lines):
     in_comment = False
-    for l in spec_lines:
-        if '#!SYNTCOMP' in l:
-            assert not in_comment, 'Invalid nesting of metadata labels'
-            in_comment = True
-            continue
-        elif '#.' in l:
-            assert in_comment, 'Metadata end-label does not have a start'
-            in_comment = False
+    in_symbol_table = True
+    for l in lines:
+        if '#' in l:
+            in_comment = check_metadata_line(l, in_comment)
+        if not in_symbol_table or l.lstrip()[:1].isdigit():
             continue
+        if l.strip() == 'c':
+            in_symbol_table = False
+        elif is_input_symbol_table(l):
+            # i0 i_1
+            # i1 controllable_1
+            tokens = l.strip().split()
+            if len(tokens) > 1 and tokens[1].startswith('controllable'):
+                input_index = int(tokens[0][1:])
+                assert input_index < nof_inputs, \
+                    'Symbol of an undefined input'
+                control_inputs.add(inputs[input_index])
     assert not in_comment, 'Metadata labels not closed'
+    return set(inputs), control_inputs, nof_outputs
 
 
-def main(original_lines):
-    check_valid_metadata(original_lines)
-    orig_all_inputs = get_inputs(original_lines)
-    orig_control_inputs = get_control_inputs(original_lines)
+def main(original_file):
+    orig_all_inputs, orig_control_inputs, nof_outputs = \
+        scan_spec(original_file)
     orig_uncontrol_inputs = orig_all_inputs.difference(orig_control_inputs)
-    nof_inputs, nof_outputs = parse_header(original_lines)
 
     assert nof_outputs == 1, \
         'More than one output defined!'
@@ -122,4 +266,4 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument('original', type=FileType())
     args = parser.parse_args(sys.argv[1:])
-    main(list(args.original.readlines()))
+    main(args.original)